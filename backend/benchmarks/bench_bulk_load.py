@@ -0,0 +1,185 @@
+"""
+Rows/sec benchmark for db.bulk_load against the row-at-a-time seeding path.
+
+Generates N synthetic transactions (1M by default) and loads them into a
+scratch table `bulk_load_bench`, which is dropped afterwards. The table has
+the secondary indexes a transactions table carries, so the index deferral
+shows up. Measures:
+- one cursor.execute per row, the way the seeders used to (on a sample)
+- batched executemany, indexes kept and deferred
+- LOAD DATA LOCAL INFILE with indexes deferred (needs local_infile=ON)
+MongoDB, into a scratch `bulk_load_bench` collection:
+- find_one + insert_one per document (on a sample)
+- insert_many(ordered=False)
+- bulk_write upserts, first inserting, then all matching existing documents
+
+MySQL runs when MYSQL_HOST is set and MongoDB when MONGO_URI is set. The
+client-side cost of writing the LOAD DATA file is always measured.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bulk_load [rows] [batch_size]
+"""
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.bulk_load import (
+    bulk_load_mysql, insert_documents, mysql_connection, upsert_documents, write_infile
+)
+from settings import get_settings
+
+TABLE = "bulk_load_bench"
+COLUMNS = ["id", "client_id", "transaction_type", "amount", "asset_type", "stock_symbol", "transaction_date"]
+ASSETS = ["Stocks", "Real Estate", "Mutual Funds", "Bonds", "Gold", "International Stocks"]
+SYMBOLS = ["RELIANCE", "TCS", "INFOSYS", "HDFC_MF", "GOLD_ETF", "GOVT_BOND", "US_TECH", "REALTY"]
+
+# The row-at-a-time baselines only run on this many rows
+SAMPLE_ROWS = 20_000
+
+CREATE_TABLE = f"""
+    CREATE TABLE {TABLE} (
+        id INT PRIMARY KEY,
+        client_id INT NOT NULL,
+        transaction_type VARCHAR(10) NOT NULL,
+        amount DECIMAL(15, 2) NOT NULL,
+        asset_type VARCHAR(50),
+        stock_symbol VARCHAR(20),
+        transaction_date DATE,
+        INDEX idx_client (client_id),
+        INDEX idx_type_date (transaction_type, transaction_date),
+        INDEX idx_asset (asset_type)
+    )
+"""
+
+
+def make_rows(count, seed=11):
+    rng = random.Random(seed)
+    start = datetime.date(2015, 1, 1)
+    return [
+        (i, rng.randrange(1, 50_000), rng.choice(("Buy", "Sell")), round(rng.uniform(1e3, 5e7), 2),
+         rng.choice(ASSETS), rng.choice(SYMBOLS), start + datetime.timedelta(days=rng.randrange(3650)))
+        for i in range(1, count + 1)
+    ]
+
+
+def report(label, rows, elapsed):
+    print(f"  {label:<40} {rows:>9,} rows  {elapsed:8.2f} s  {rows / elapsed:>12,.0f} rows/s")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def reset_table(connection):
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(CREATE_TABLE)
+    cursor.close()
+
+
+def bench_infile_writer(rows, batch_size):
+    with open(os.devnull, "w", encoding="utf-8") as handle:
+        elapsed, count = timed(lambda: write_infile(handle, rows, batch_size))
+    report("LOAD DATA file writing (client only)", count, elapsed)
+
+
+def bench_mysql(rows, batch_size):
+    connection = mysql_connection(local_infile=True)
+    try:
+        reset_table(connection)
+        sample = rows[:SAMPLE_ROWS]
+        statement = f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES ({', '.join(['%s'] * len(COLUMNS))})"
+
+        def row_at_a_time():
+            cursor = connection.cursor()
+            for row in sample:
+                cursor.execute(statement, row)
+            connection.commit()
+            cursor.close()
+
+        elapsed, _ = timed(row_at_a_time)
+        report("execute per row (sample)", len(sample), elapsed)
+
+        runs = [
+            ("executemany, indexes kept", "executemany", False),
+            ("executemany, indexes deferred", "executemany", True),
+            ("LOAD DATA INFILE, indexes deferred", "infile", True),
+        ]
+        for label, method, defer in runs:
+            reset_table(connection)
+            try:
+                elapsed, count = timed(lambda: bulk_load_mysql(
+                    connection, TABLE, COLUMNS, rows, method=method, batch_size=batch_size, defer_indexes=defer
+                ))
+            except Exception as e:
+                print(f"  {label:<40} failed: {e}")
+                continue
+            report(label, count, elapsed)
+    finally:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.close()
+        connection.close()
+
+
+def bench_mongo(rows, batch_size):
+    from pymongo import MongoClient
+
+    settings = get_settings()
+    client = MongoClient(settings.mongo_uri)
+    collection = client[settings.mongo_db][TABLE]
+    documents = [dict(zip(COLUMNS, row[:6]), name=f"Client {row[0]}") for row in rows]
+    try:
+        collection.drop()
+        collection.create_index("name", unique=True)
+
+        def row_at_a_time():
+            for document in documents[:SAMPLE_ROWS]:
+                if not collection.find_one({"name": document["name"]}):
+                    collection.insert_one(dict(document))
+
+        elapsed, _ = timed(row_at_a_time)
+        report("find_one + insert_one (sample)", SAMPLE_ROWS, elapsed)
+
+        collection.delete_many({})
+        elapsed, counts = timed(lambda: insert_documents(collection, (dict(d) for d in documents), batch_size))
+        report("insert_many(ordered=False)", counts["inserted"], elapsed)
+
+        collection.delete_many({})
+        elapsed, counts = timed(lambda: upsert_documents(collection, documents, key="name", batch_size=batch_size))
+        report("bulk_write upserts, all new", counts["inserted"], elapsed)
+        elapsed, counts = timed(lambda: upsert_documents(collection, documents, key="name", batch_size=batch_size))
+        report("bulk_write upserts, all existing", counts["matched"], elapsed)
+    finally:
+        collection.drop()
+        client.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    settings = get_settings()
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else settings.bulk_batch_size
+    rows = make_rows(count)
+    print(f"{count:,} rows, batches of {batch_size:,}")
+
+    bench_infile_writer(rows, batch_size)
+    if settings.mysql_host:
+        print("MySQL")
+        bench_mysql(rows, batch_size)
+    else:
+        print("MySQL skipped (MYSQL_HOST not set)")
+    if settings.mongo_uri:
+        print("MongoDB")
+        bench_mongo(rows, batch_size)
+    else:
+        print("MongoDB skipped (MONGO_URI not set)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark of chart shaping for high-cardinality results.
+
+Builds a per-label chart from 1M result rows at increasing label
+cardinality: a dict-accumulating group-by that ships every label (what
+the canned charts assume), charts.shape_chart over row dicts (the same
+kind of dict group-by, then top-N plus "Other", capped payload) and
+shape_chart over a NumPy column batch, which groups with hashed labels,
+np.unique and bincount. Row dicts cost about the same either way, bound by
+dict hashing; the win there is the serialised payload size, which is what
+Chart.js has to render.
+
+Usage (from backend/):
+    python -m benchmarks.bench_charts [rows]
+"""
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import orjson
+
+from charts import _payload, shape_chart
+
+CARDINALITIES = [10, 1_000, 100_000]
+
+
+def make_rows(count, cardinality, seed=11):
+    rng = random.Random(seed)
+    return [
+        {"stock_symbol": f"SYM{rng.randrange(cardinality):06d}", "amount": rng.uniform(1e5, 5e9)}
+        for _ in range(count)
+    ]
+
+
+def every_label_chart(rows):
+    totals = defaultdict(float)
+    for row in rows:
+        totals[row["stock_symbol"]] += row["amount"]
+    labels = sorted(totals, key=totals.get, reverse=True)
+    values = [round(totals[name] * 1e-7, 2) for name in labels]
+    return _payload("pie", labels, values, "Holdings by Stock (₹ Crores)", False)
+
+
+def to_batch(rows):
+    return {
+        "stock_symbol": np.array([row["stock_symbol"] for row in rows]),
+        "amount": np.array([row["amount"] for row in rows]),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for cardinality in CARDINALITIES:
+        rows = make_rows(count, cardinality)
+        batch = to_batch(rows)
+        label = "Holdings by Stock (₹ Crores)"
+        naive_ms, naive = timed(lambda: every_label_chart(rows))
+        shaped_ms, shaped = timed(lambda: shape_chart("pie", rows, "stock_symbol", "amount", label, scale=1e-7))
+        batch_ms, from_batch = timed(lambda: shape_chart("pie", batch, "stock_symbol", "amount", label, scale=1e-7))
+
+        # Same grand total either way; "Other" absorbs the tail
+        assert abs(sum(naive["datasets"][0]["data"]) - sum(shaped["datasets"][0]["data"])) < cardinality * 0.01
+        assert from_batch == shaped
+
+        print(f"{count:,} rows, {cardinality:,} labels")
+        for name, elapsed, chart in (("every label", naive_ms, naive), ("shape_chart(rows)", shaped_ms, shaped),
+                                     ("shape_chart(columns)", batch_ms, from_batch)):
+            dump_ms, payload = timed(lambda: orjson.dumps(chart))
+            print(f"  {name + ':':<22}{elapsed:8.1f} ms build  {dump_ms:7.1f} ms serialise  "
+                  f"{len(chart['labels']):>7,} slices  {len(payload) / 1024:9.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark for the federated planner: semi-join pushdown versus fetching
+both sides in full and joining in memory.
+
+Runs self-contained: the portfolio side is SQLite behind the real
+MySQLPortfolioSource SQL builder, and the client side is an in-memory list
+filtered with the same filter MongoDBTool would send to Mongo.
+
+Usage (from backend/):
+    python -m benchmarks.bench_federated [clients] [holdings_per_client]
+"""
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.federated import FederatedPlanner, MySQLPortfolioSource, hash_join
+from db.mongo_connect import MongoDBTool, add_search_fields
+
+CITIES = ["Mumbai", "Delhi", "Chennai", "Bangalore", "Pune", "Hyderabad", "Kolkata", "Jaipur"]
+RISKS = ["High", "Moderate", "Conservative"]
+ASSETS = ["Stocks", "Real Estate", "Mutual Funds", "Bonds", "Gold"]
+
+
+def _equals(value, condition):
+    if isinstance(condition, re.Pattern):
+        return isinstance(value, str) and condition.search(value) is not None
+    return value == condition
+
+
+def _matches(document, search_filter):
+    for key, condition in search_filter.items():
+        value = document.get(key)
+        if isinstance(condition, dict):
+            if "$in" in condition:
+                values = value if isinstance(value, list) else [value]
+                if not any(_equals(item, wanted) for item in values for wanted in condition["$in"]):
+                    return False
+            if "$lt" in condition and not value < condition["$lt"]:
+                return False
+            if "$gt" in condition and not value > condition["$gt"]:
+                return False
+        elif not _equals(value, condition):
+            return False
+    return True
+
+
+class ListClientSource:
+    """In-memory stand-in for MongoClientSource"""
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.parser = MongoDBTool.__new__(MongoDBTool)
+
+    def estimate(self, query):
+        search_filter = self.parser._parse_search_query(query)
+        return sum(1 for p in self.profiles if _matches(p, search_filter))
+
+    def fetch(self, query, client_ids=None):
+        search_filter = self.parser._parse_search_query(query)
+        wanted = set(client_ids) if client_ids is not None else None
+        return [
+            dict(p) for p in self.profiles
+            if (wanted is None or p["client_id"] in wanted) and _matches(p, search_filter)
+        ]
+
+
+class SQLiteTool:
+    """Stand-in for MySQLTool._execute_sql over SQLite"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _execute_sql(self, query, params=None):
+        cursor = self.connection.execute(query.replace("%s", "?"), params or ())
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+class SQLitePortfolioSource(MySQLPortfolioSource):
+    def estimate(self, filters):
+        where, params = self._where(filters)
+        return self.tool._execute_sql(f"SELECT COUNT(*) AS n FROM portfolios {where}", params)[0]["n"]
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rng = random.Random(11)
+
+    profiles = [
+        add_search_fields({
+            "client_id": i,
+            "name": f"Client {i}",
+            "city": rng.choice(CITIES),
+            "risk_appetite": rng.choice(RISKS),
+            "investment_preferences": rng.sample(ASSETS, 2),
+        })
+        for i in range(1, clients + 1)
+    ]
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE portfolios (id INTEGER PRIMARY KEY, client_id INT, asset_type TEXT, amount REAL, stock_symbol TEXT)")
+    connection.executemany(
+        "INSERT INTO portfolios (client_id, asset_type, amount, stock_symbol) VALUES (?, ?, ?, ?)",
+        ((i, rng.choice(ASSETS), rng.uniform(1e5, 1e9), None) for i in range(1, clients + 1) for _ in range(per_client))
+    )
+    connection.execute("CREATE INDEX idx_portfolios_client ON portfolios (client_id)")
+
+    client_source = ListClientSource(profiles)
+    portfolio_source = SQLitePortfolioSource(SQLiteTool(connection))
+    planner = FederatedPlanner(client_source=client_source, portfolio_source=portfolio_source)
+
+    for query in ["high risk mumbai clients", "clients in mumbai", "conservative clients"]:
+        start = time.perf_counter()
+        result = planner.top_portfolios(query, limit=10)
+        planned = time.perf_counter() - start
+
+        start = time.perf_counter()
+        naive = hash_join(client_source.fetch(query), portfolio_source.fetch({}), 10)
+        full = time.perf_counter() - start
+
+        assert [r["amount"] for r in result["rows"]] == [r["amount"] for r in naive]
+        plan = result["plan"]
+        print(f"{query!r}: driver={plan.driver} pushed_ids={plan.pushed_ids} "
+              f"planner {planned * 1000:.1f} ms vs full fetch {full * 1000:.1f} ms "
+              f"({full / planned:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark of ResponseFormatter's query classification: the single-pass
+feature bitset versus the original per-decision keyword scans.
+
+The corpus is the example queries from the frontend and README plus
+rewordings of them, each paired with a long agent response (several KB of
+analysis text, some with a markdown table). `legacy_decisions` keeps the
+original scan logic for comparison; both paths must agree on every input.
+
+Usage (from backend/):
+    python -m benchmarks.bench_formatter [rounds]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from canned_responses import CELEBRITY_STRATEGY_TEXT, GENERAL_ANALYSIS_TEXT, SPORTS_REAL_ESTATE_TEXT
+from formatter import ResponseFormatter, extract_features
+
+QUERIES = [
+    "Give me the breakup of portfolio values per relationship manager",
+    "Show me the asset allocation distribution across all portfolios",
+    "What's the geographic distribution of our celebrity clients?",
+    "Show me the risk appetite distribution among clients",
+    "What are the top five portfolios of our wealth members?",
+    "Tell me the top relationship managers in my firm",
+    "Which clients are the highest holders of stocks?",
+    "Show me all client profiles from Mumbai",
+    "Why do sports personalities prefer real estate investments?",
+    "Explain the investment strategy for celebrity wealth management",
+    "What are the emerging trends in celebrity portfolio management?",
+    "How do we manage risk for high-profile client portfolios?",
+    "What are the recent transactions for John Doe?",
+    "List all clients with their risk appetite",
+    "Show me portfolio distribution by asset type",
+    "Compare growth of equity vs real estate holdings over time",
+    "What strategy would you recommend for a conservative actor?",
+    "How has the client base grown this year?",
+]
+
+TABLE = "\n".join(
+    ["| client | asset | amount |", "|---|---|---|"]
+    + [f"| Client {i} | Stocks | {i * 1000:,} |" for i in range(40)]
+)
+RESPONSES = [
+    SPORTS_REAL_ESTATE_TEXT * 3,
+    CELEBRITY_STRATEGY_TEXT * 3,
+    GENERAL_ANALYSIS_TEXT * 3 + "\n" + TABLE,
+    "Portfolio review notes. " * 400,
+]
+
+_LEGACY_PATTERNS = [
+    r'\d+\.\s+\w+.*:\s*[\d,]+',
+    r'\w+:\s*[\d,]+.*\w+:\s*[\d,]+',
+    r'\|\s*\w+\s*\|\s*\w+\s*\|',
+]
+
+
+def legacy_decisions(query, response):
+    """The original cascade: each decision rescans the query, regexes compiled per call"""
+    query = query.lower()
+    chart_keywords = [
+        "distribution", "breakdown", "allocation", "percentage", "proportion",
+        "trend", "growth", "comparison", "analysis", "share", "split",
+        "pie", "chart", "graph", "visual", "show me", "compare",
+        "across", "between", "among", "portfolio values per", "breakup"
+    ]
+    strong = ["breakup of portfolio values", "distribution", "allocation across", "breakdown", "percentage", "share of"]
+    if any(indicator in query.lower() for indicator in strong) or \
+            sum(1 for keyword in chart_keywords if keyword in query) >= 2 or \
+            any(word in query for word in ["breakup", "distribution", "allocation"]):
+        if any(word in query for word in ["breakup", "distribution", "allocation", "share"]):
+            return "chart", "pie"
+        if any(word in query for word in ["trend", "growth", "over time", "timeline"]):
+            return "chart", "line"
+        return "chart", "bar"
+
+    table_keywords = [
+        "top", "list", "show me all", "which clients", "ranking",
+        "performance", "managers", "clients", "portfolios",
+        "highest", "lowest", "compare managers", "relationship managers"
+    ]
+    if not any(avoid in query for avoid in ["breakup", "distribution", "allocation", "percentage"]) and (
+            any(keyword in query for keyword in table_keywords) or
+            any(re.search(pattern, response) for pattern in _LEGACY_PATTERNS)):
+        query_lower = query.lower()
+        for word, category in (("portfolio", "portfolio_ranking"), ("manager", "rm_performance"),
+                               ("client", "client_profiles"), ("stock", "stock_holdings")):
+            if word in query_lower:
+                return "table", category
+        return "table", "general_metrics"
+
+    query_lower = query.lower()
+    for words, category in (
+        (["top", "highest", "best", "ranking"], "ranking_analysis"),
+        (["compare", "comparison", "vs", "versus"], "comparative_analysis"),
+        (["trend", "growth", "pattern"], "trend_analysis"),
+        (["why", "explain", "reason"], "explanatory_analysis"),
+        (["strategy", "recommend", "suggest"], "strategic_recommendation"),
+    ):
+        if any(word in query_lower for word in words):
+            return "text", category
+    return "text", "general_inquiry"
+
+
+def bitset_decisions(formatter, query, response):
+    features = extract_features(query.lower())
+    if formatter._should_be_chart(features):
+        return "chart", formatter._determine_chart_type(features)
+    if formatter._should_be_table(features, response):
+        return "table", formatter._categorize_table(features)
+    return "text", formatter._categorize_query(features)
+
+
+def timed(fn, pairs, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query, response in pairs:
+            fn(query, response)
+    return (time.perf_counter() - start) / (rounds * len(pairs)) * 1e6
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    formatter = ResponseFormatter()
+    queries = QUERIES + [query.upper() for query in QUERIES] + [f"please {query.lower()} thanks" for query in QUERIES]
+    pairs = [(query, response) for query in queries for response in RESPONSES]
+
+    for query, response in pairs:
+        assert legacy_decisions(query, response) == bitset_decisions(formatter, query, response), query
+
+    legacy = timed(legacy_decisions, pairs, rounds)
+    bitset = timed(lambda q, r: bitset_decisions(formatter, q, r), pairs, rounds)
+    full = timed(lambda q, r: formatter.format_response({"response": r}, q), pairs, rounds)
+    print(f"{len(pairs)} query/response pairs, responses {min(map(len, RESPONSES))}-{max(map(len, RESPONSES))} chars")
+    print(f"legacy keyword scans:   {legacy:8.2f} us/decision")
+    print(f"feature bitset:         {bitset:8.2f} us/decision ({legacy / bitset:.1f}x)")
+    print(f"format_response (full): {full:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
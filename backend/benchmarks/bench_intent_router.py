@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for the compiled intent router.
+
+Compares per-query routing cost of IntentRouter against the naive
+"one substring scan per keyword" cascade as the number of intents grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_intent_router
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import Intent, IntentRouter
+
+QUERIES = [
+    "Show me the asset allocation distribution across all clients",
+    "Give me a breakup of portfolio values per relationship manager",
+    "What are the top five portfolios of our wealth members?",
+    "Which clients are the highest holders of RELIANCE stock?",
+    "Why do sports personalities prefer real estate investments?",
+    "Explain the investment strategy for celebrities with volatile income",
+    "How is the market doing today?",
+]
+
+
+def _synthetic_intents(count: int, rng: random.Random):
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    intents = []
+    for i in range(count):
+        phrase = "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 14)))
+        category = ("chart", "table", "text")[i % 3]
+        intents.append(Intent(f"intent_{i}", category, ((phrase, f"{phrase} {i}"),)))
+    return intents
+
+
+def _naive_route(query: str, intents) -> str:
+    query_lower = query.lower()
+    for intent in intents:
+        if all(any(p in query_lower for p in group) for group in intent.requires):
+            return intent.name
+    return "general_text"
+
+
+def _time_per_query(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES)) * 1e6
+
+
+def main():
+    rng = random.Random(42)
+    rounds = 200
+    print(f"{'intents':>8} {'phrases':>8} {'router us/q':>12} {'naive us/q':>12}")
+    for count in (10, 100, 1000, 5000):
+        intents = _synthetic_intents(count, rng)
+        router = IntentRouter(intents)
+        routed = _time_per_query(router.route, rounds)
+        naive = _time_per_query(lambda q: _naive_route(q, intents), max(1, rounds // 10))
+        print(f"{count:>8} {router.phrase_count:>8} {routed:>12.2f} {naive:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Offline load test for the model client layer using the stub backend.
+
+Fires N concurrent agent queries at a one-slot StubBackend with
+micro-batching off (max_batch_size=1) and on, and reports wall time,
+throughput, latency percentiles, batch sizes and prefix cache hits. Also
+measures time to first token for a streamed answer.
+
+Usage (from backend/):
+    python -m benchmarks.bench_llm_client [N] [max_batch_size]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_agent import SYSTEM_PROMPT
+from llm_client import LLMClient, Prompt, StubBackend
+
+QUERIES = [
+    "Which clients in Mumbai have a high risk appetite?",
+    "Summarize the real estate exposure of sports personalities",
+    "How is AUM split across relationship managers?",
+    "What did our top clients buy last quarter?",
+]
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct), len(values) - 1)]
+
+
+async def load(count, max_batch_size):
+    client = LLMClient(StubBackend(), max_batch_size=max_batch_size, max_wait_ms=5, timeout=300)
+    prompts = [Prompt(SYSTEM_PROMPT, f"{QUERIES[i % len(QUERIES)]} (#{i})") for i in range(count)]
+
+    start = time.perf_counter()
+    completions = await asyncio.gather(*(client.complete(prompt) for prompt in prompts))
+    wall = time.perf_counter() - start
+
+    latencies = [completion.latency_ms for completion in completions]
+    stats = client.stats()
+    print(f"max_batch_size={max_batch_size:3d}: {wall:6.2f} s, {count / wall:7.1f} req/s, "
+          f"p50 {_percentile(latencies, 0.5):7.1f} ms, p95 {_percentile(latencies, 0.95):7.1f} ms, "
+          f"avg batch {stats['avg_batch_size']}, prefix hits {stats['prefix_hits']}/{stats['requests']}")
+
+    start = time.perf_counter()
+    first = None
+    async for _ in client.stream(prompts[0]):
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    await client.close()
+    return first, total
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    asyncio.run(load(count, 1))
+    first, total = asyncio.run(load(count, batch_size))
+    print(f"streaming: first token {first * 1000:.1f} ms, full answer {total * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
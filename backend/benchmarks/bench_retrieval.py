@@ -0,0 +1,101 @@
+"""
+Recall/latency benchmark for retrieval.VectorIndex.
+
+Builds memory-mapped float32 and int8 indexes over clustered synthetic unit
+vectors (so neighbours are meaningful), then reports per-query and batched
+top-k latency and the int8 index's recall@k against the exact float32
+result. Also times incremental add/delete and the HashingVectorizer.
+
+Usage (from backend/):
+    python -m benchmarks.bench_retrieval [sizes] [dim] [k]
+    python -m benchmarks.bench_retrieval 100000,1000000 256 10
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embeddings import HashingVectorizer
+from retrieval import VectorIndex, client_document
+
+CHUNK = 100000
+QUERIES = 100
+
+
+def _clustered(rng, centers, count):
+    labels = rng.integers(0, len(centers), count)
+    vectors = centers[labels] + rng.normal(scale=0.6, size=(count, centers.shape[1])).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _time(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def bench(size, dim, k, workdir):
+    rng = np.random.default_rng(size)
+    centers = rng.normal(size=(1000, dim)).astype(np.float32) / np.sqrt(dim)
+    exact = VectorIndex(dim, "float32", path=os.path.join(workdir, f"f32_{size}"), capacity=size)
+    quantized = VectorIndex(dim, "int8", path=os.path.join(workdir, f"i8_{size}"), capacity=size)
+
+    build = {"float32": 0.0, "int8": 0.0}
+    sample = None
+    for start in range(0, size, CHUNK):
+        vectors = _clustered(rng, centers, min(CHUNK, size - start))
+        ids = np.arange(start, start + len(vectors))
+        for name, index in (("float32", exact), ("int8", quantized)):
+            elapsed, _ = _time(lambda: index.add(ids, vectors))
+            build[name] += elapsed
+        if sample is None:
+            sample = vectors[:QUERIES]
+
+    queries = sample + rng.normal(scale=0.05, size=sample.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    truth_ids = exact.search(queries, k)[0]
+    print(f"\n{size:,} vectors x {dim} dims, k={k}")
+    for name, index in (("float32", exact), ("int8", quantized)):
+        single, _ = _time(lambda: index.search(queries[0], k), repeat=5)
+        batched, (found, _) = _time(lambda: index.search(queries, k))
+        recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth_ids)])
+        footprint = index.capacity * dim * index.dtype.itemsize / 2 ** 20
+        print(f"  {name:7s} build {build[name]:6.2f} s  matrix {footprint:7.1f} MiB  "
+              f"1 query {single * 1000:7.1f} ms  {QUERIES} queries {batched * 1000:7.1f} ms "
+              f"({batched / QUERIES * 1000:.2f} ms/query)  recall@{k} {recall:.3f}")
+
+    extra = _clustered(rng, centers, 1000)
+    added, _ = _time(lambda: quantized.add(np.arange(size, size + 1000), extra))
+    deleted, _ = _time(lambda: quantized.delete(range(0, size, max(size // 1000, 1))))
+    print(f"  incremental: add 1000 in {added * 1000:.1f} ms, delete 1000 in {deleted * 1000:.1f} ms")
+
+
+def main():
+    sizes = [int(value) for value in (sys.argv[1] if len(sys.argv) > 1 else "100000,1000000").split(",")]
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    vectorizer = HashingVectorizer()
+    texts = [
+        client_document({"name": f"Client {i}", "profession": "Actor", "city": "Mumbai", "age": 30 + i % 40,
+                         "risk_appetite": "High", "investment_preferences": ["Stocks", "Gold"],
+                         "relationship_manager": "Priya Sharma"})
+        for i in range(2000)
+    ]
+    elapsed, _ = _time(lambda: vectorizer.transform(texts))
+    print(f"HashingVectorizer({vectorizer.dim}): {len(texts) / elapsed:,.0f} documents/s")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            bench(size, dim, k, workdir)
+
+
+if __name__ == "__main__":
+    main()
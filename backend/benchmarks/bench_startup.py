@@ -0,0 +1,107 @@
+"""
+Cold-start budget for the API worker.
+
+Measures, each in a fresh interpreter:
+- import time of `main` (median of several runs), with FastAPI's own
+  import cost reported separately
+- time from spawning uvicorn to the first successful GET /health
+
+Fails (exit code 1) when either exceeds its budget or when importing
+`main` loads a heavy dependency that should only load on first use, so
+import cost cannot creep back in unnoticed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [max_import_ms] [max_health_ms]
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just by loading the app
+LAZY_MODULES = ["numpy", "pandas", "pymongo", "bson", "mysql.connector", "aiomysql", "openai", "uvicorn"]
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import fastapi
+framework = time.perf_counter()
+import main
+done = time.perf_counter()
+loaded = [name for name in {lazy!r} if name in sys.modules]
+print(framework - start, done - start, ",".join(loaded))
+"""
+
+
+def _run_probe():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE.format(lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    ).stdout.strip().splitlines()[-1]
+    framework, total, loaded = (output.split(" ") + [""])[:3]
+    return float(framework) * 1000, float(total) * 1000, [name for name in loaded.split(",") if name]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_health(timeout=30.0):
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer /health in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    max_import_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    max_health_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 3000
+
+    runs = [_run_probe() for _ in range(5)]
+    framework_ms = statistics.median(run[0] for run in runs)
+    import_ms = statistics.median(run[1] for run in runs)
+    loaded = sorted({name for run in runs for name in run[2]})
+    health_ms = statistics.median(time_to_health() for _ in range(3))
+
+    print(f"import main:        {import_ms:7.1f} ms (fastapi {framework_ms:.1f} ms, app modules {import_ms - framework_ms:.1f} ms)"
+          f"  budget {max_import_ms:.0f} ms")
+    print(f"first /health:      {health_ms:7.1f} ms  budget {max_health_ms:.0f} ms")
+    print(f"eager heavy modules: {', '.join(loaded) or 'none'}")
+
+    failures = []
+    if import_ms > max_import_ms:
+        failures.append(f"import time {import_ms:.0f} ms over budget")
+    if health_ms > max_health_ms:
+        failures.append(f"time to /health {health_ms:.0f} ms over budget")
+    if loaded:
+        failures.append(f"importing main loads {', '.join(loaded)}")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the /query response path: per-request validation and encoding
+versus serving the payloads frozen at startup.
+
+Runs the handler work in-process (routing, validation, encoding) so the
+numbers isolate the server-side cost from HTTP overhead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_static_payloads
+"""
+import copy
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization
+from canned_responses import CANNED_RESPONSES
+from main import QueryResponse, frozen_responses, query_router
+
+QUERIES = [
+    "Show me the asset allocation distribution",
+    "Give me a breakup of portfolio values per relationship manager",
+    "What are the top five portfolios of our wealth members?",
+    "Show me client profiles of the highest holders",
+    "Why do sports personalities prefer real estate investments?",
+    "What is the market outlook?",
+]
+
+
+def legacy_path(query: str) -> bytes:
+    response_data = copy.deepcopy(CANNED_RESPONSES[query_router.route(query).intent])
+    return QueryResponse(
+        type=response_data["type"],
+        data=response_data["data"],
+        metadata=response_data.get("metadata", {})
+    ).model_dump_json().encode("utf-8")
+
+
+def frozen_path(query: str) -> bytes:
+    return frozen_responses[query_router.route(query).intent]
+
+
+def requests_per_second(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            fn(query)
+    return rounds * len(QUERIES) / (time.perf_counter() - start)
+
+
+def main_benchmark():
+    logging.disable(logging.CRITICAL)
+    rounds = 2000
+    legacy = requests_per_second(legacy_path, rounds)
+    frozen = requests_per_second(frozen_path, rounds)
+    print(f"encoder: {'orjson' if serialization.orjson else 'json'}")
+    print(f"legacy (build + validate + encode): {legacy:>10.0f} req/s")
+    print(f"frozen payload table:               {frozen:>10.0f} req/s")
+    print(f"speedup: {frozen / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main_benchmark()
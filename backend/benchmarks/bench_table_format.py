@@ -0,0 +1,80 @@
+"""
+Benchmark of the columnar table wire format against the list-of-dicts one.
+
+A 10k-row table shaped like the portfolio ranking (rank, client, INR
+amount strings, asset, RM, share) is encoded both ways. Reports encode
+time and payload size raw, gzip and brotli. Also times columnar_body,
+which is the path /query takes to re-shape an already encoded response.
+
+Usage (from backend/):
+    python -m benchmarks.bench_table_format [rows]
+"""
+import gzip
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_caching import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from serialization import columnar_body, columnar_payload, decode_json, encode_json
+
+ASSETS = ["Stocks", "Real Estate", "Mutual Funds", "Bonds", "International Stocks"]
+MANAGERS = ["Amit Sharma", "Priya Patel", "Rohit Singh", "Neha Gupta"]
+
+
+def make_payload(count, seed=5):
+    rng = random.Random(seed)
+    rows = [
+        {
+            "rank": rank,
+            "client_name": f"Client {rng.randrange(100_000):05d}",
+            "portfolio_value": f"₹{rng.randrange(10, 2000) / 10:g} Cr",
+            "primary_asset": rng.choice(ASSETS),
+            "rm": rng.choice(MANAGERS),
+            "percentage_of_portfolio": f"{rng.random() * 100:.1f}%",
+        }
+        for rank in range(1, count + 1)
+    ]
+    return {"type": "table", "data": rows,
+            "metadata": {"source": "benchmark", "query_type": "portfolio_ranking", "record_count": count}}
+
+
+def best_of(fn, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def sizes(body):
+    compressed = {"gzip": len(gzip.compress(body, compresslevel=GZIP_LEVEL))}
+    if brotli is not None:
+        compressed["br"] = len(brotli.compress(body, quality=BROTLI_QUALITY))
+    return len(body), compressed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    payload = make_payload(count)
+
+    records_ms, records = best_of(lambda: encode_json(payload))
+    columnar_ms, columnar = best_of(lambda: encode_json(columnar_payload(payload)))
+    reshape_ms, _ = best_of(lambda: columnar_body(records))
+
+    restored = decode_json(columnar)["data"]
+    assert [dict(zip(restored["columns"], row)) for row in restored["rows"]] == payload["data"]
+
+    print(f"{count:,}-row table")
+    for name, elapsed, body in (("records", records_ms, records), ("columnar", columnar_ms, columnar)):
+        raw, compressed = sizes(body)
+        packed = "  ".join(f"{encoding} {size / 1024:7.1f} KB" for encoding, size in compressed.items())
+        print(f"  {name:<9} encode {elapsed:6.2f} ms  raw {raw / 1024:7.1f} KB  {packed}")
+    print(f"  columnar_body from an encoded records body: {reshape_ms:.2f} ms (once per cached body)")
+
+
+if __name__ == "__main__":
+    main()
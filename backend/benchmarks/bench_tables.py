@@ -0,0 +1,115 @@
+"""
+Benchmark of the columnar table builder against per-row Python formatting.
+
+Rows are shaped like MySQLTool's portfolio query (client_id, asset_type,
+Decimal amount, stock_symbol) and are also fed as a NumPy column batch.
+`per_row_table` is the straightforward dict-at-a-time version: sort,
+rank, format each Decimal as crore/lakh and compute each row's share of
+its client's total. Both must produce the same table.
+
+Usage (from backend/):
+    python -m benchmarks.bench_tables [sizes...]
+"""
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from tables import CRORE, LAKH, TABLE_SPECS, build_table
+
+ASSETS = ["Stocks", "Mutual Funds", "Real Estate", "Bonds", "Gold"]
+SYMBOLS = ["RELIANCE", "TCS", "INFY", "HDFC", "US_TECH", None]
+
+
+def make_rows(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "client_id": rng.randrange(max(count // 20, 1)),
+            "asset_type": rng.choice(ASSETS),
+            "amount": Decimal(rng.randrange(1_000_000, 200_000_000_000)) / 100,
+            "stock_symbol": rng.choice(SYMBOLS),
+        }
+        for _ in range(count)
+    ]
+
+
+def per_row_inr(amount):
+    value = float(amount)
+    crores = round(abs(value) / CRORE, 1)
+    unit, scaled = ("Cr", crores) if crores >= 1 else ("L", round(abs(value) / LAKH, 1))
+    text = f"{scaled:,.1f}".removesuffix(".0")
+    return f"{'-' if value < 0 else ''}₹{text} {unit}"
+
+
+def per_row_table(rows):
+    totals = defaultdict(float)
+    for row in rows:
+        totals[str(row["client_id"])] += float(row["amount"])
+    ordered = sorted(rows, key=lambda row: -float(row["amount"]))
+    table, previous, rank = [], None, 0
+    for position, row in enumerate(ordered, 1):
+        amount = float(row["amount"])
+        if amount != previous:
+            rank, previous = position, amount
+        total = totals[str(row["client_id"])]
+        table.append({
+            "rank": rank,
+            "client_id": row["client_id"],
+            "primary_asset": row["asset_type"],
+            "stock_symbol": row["stock_symbol"],
+            "portfolio_value": per_row_inr(amount),
+            "percentage_of_portfolio": f"{round(amount / total * 100, 1) if total else 0.0:.1f}%",
+        })
+    return table
+
+
+def to_batch(rows):
+    return {
+        "client_id": np.array([row["client_id"] for row in rows]),
+        "asset_type": np.array([row["asset_type"] for row in rows], dtype=object),
+        "amount": np.array([float(row["amount"]) for row in rows]),
+        "stock_symbol": np.array([row["stock_symbol"] for row in rows], dtype=object),
+    }
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000]
+    spec = TABLE_SPECS["portfolio_ranking"]
+    for size in sizes:
+        rows = make_rows(size)
+        batch = to_batch(rows)
+        repeat = 5 if size <= 100_000 else 1
+
+        per_row_ms, expected = best_of(lambda: per_row_table(rows), repeat)
+        rows_ms, from_rows = best_of(lambda: build_table(rows, spec), repeat)
+        batch_ms, from_batch = best_of(lambda: build_table(batch, spec), repeat)
+        top_ms, _ = best_of(lambda: build_table(batch, spec, limit=100), repeat)
+
+        assert from_rows == expected, "row input disagrees with per-row formatting"
+        assert [row["portfolio_value"] for row in from_batch] == [row["portfolio_value"] for row in expected]
+
+        print(f"{size:>9,} rows")
+        print(f"  per-row Python:        {per_row_ms:9.1f} ms")
+        print(f"  build_table(rows):     {rows_ms:9.1f} ms ({per_row_ms / rows_ms:.1f}x)")
+        print(f"  build_table(columns):  {batch_ms:9.1f} ms ({per_row_ms / batch_ms:.1f}x)")
+        print(f"  columns, top 100:      {top_ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark of the transaction time-series path on a synthetic series.
+
+The series is a random walk of transaction amounts, one point a minute
+(10M points is about 19 years), with occasional large spikes. Measures:
+- day / week / month bucketing of the raw points
+- NumPy LTTB straight from the raw points down to the chart size
+- the whole series_chart path (auto frequency, then LTTB)
+
+`python_lttb` is the textbook pure-Python loop. It runs on a 1M-point
+prefix, where the NumPy version must pick exactly the same indices.
+
+Usage (from backend/):
+    python -m benchmarks.bench_timeseries [points] [threshold]
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from timeseries import FREQUENCIES, bucket_series, lttb, series_chart
+
+REFERENCE_POINTS = 1_000_000
+
+
+def make_series(count, seed=3):
+    rng = np.random.default_rng(seed)
+    timestamps = np.datetime64("2005-01-01T00:00") + np.arange(count).astype("timedelta64[m]")
+    amounts = np.abs(np.cumsum(rng.normal(0, 1e4, count)) + 5e6)
+    spikes = rng.choice(count, size=max(count // 100_000, 1), replace=False)
+    amounts[spikes] *= 20
+    return timestamps, amounts
+
+
+def python_lttb(x, y, threshold):
+    count = len(y)
+    every = (count - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        avg_start = math.floor((i + 1) * every) + 1
+        avg_end = min(math.floor((i + 2) * every) + 1, count)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        start, end = math.floor(i * every) + 1, math.floor((i + 1) * every) + 1
+        ax, ay = x[a], y[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(count - 1)
+    return selected
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    timestamps, amounts = make_series(count)
+    positions = np.arange(count, dtype=np.float64)
+    print(f"{count:,} points, {str(timestamps[0])[:10]} to {str(timestamps[-1])[:10]}, LTTB to {threshold:,}")
+
+    for freq in FREQUENCIES:
+        elapsed, (starts, _) = timed(lambda: bucket_series(timestamps, amounts, freq))
+        print(f"  bucket by {freq:<5}        {elapsed:9.1f} ms  {len(starts):>9,} buckets")
+
+    elapsed, keep = timed(lambda: lttb(positions, amounts, threshold))
+    print(f"  NumPy LTTB (raw)        {elapsed:9.1f} ms  {len(keep):>9,} points")
+    spikes_kept = int(np.isin(np.flatnonzero(amounts > 3 * np.median(amounts)), keep).sum())
+    print(f"    spikes kept: {spikes_kept} of {int((amounts > 3 * np.median(amounts)).sum())}")
+
+    elapsed, chart = timed(lambda: series_chart(timestamps, amounts, "Transaction Volume", max_points=threshold))
+    print(f"  series_chart (auto)     {elapsed:9.1f} ms  {len(chart['labels']):>9,} points ({chart['frequency']})")
+
+    reference = min(count, REFERENCE_POINTS)
+    x, y = positions[:reference], amounts[:reference]
+    python_ms, expected = timed(lambda: python_lttb(x.tolist(), y.tolist(), threshold))
+    numpy_ms, actual = timed(lambda: lttb(x, y, threshold))
+    assert actual.tolist() == expected, "NumPy LTTB picked different points"
+    print(f"  {reference:,}-point prefix: pure Python LTTB {python_ms:.1f} ms, NumPy {numpy_ms:.1f} ms "
+          f"({python_ms / numpy_ms:.0f}x), identical selection")
+
+
+if __name__ == "__main__":
+    main()
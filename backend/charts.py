@@ -0,0 +1,243 @@
+"""
+Chart.js payload helpers shared by the chart endpoints.
+
+Every payload is capped in size whatever the cardinality of the data:
+category charts (pie, doughnut, bar) keep the largest MAX_SLICES - 1
+labels and fold the rest into an "Other" slice; ordered series (line)
+are reduced to at most MAX_POINTS points with LTTB (see timeseries.py).
+NumPy is only imported when a payload actually needs shaping, so
+importing this module stays cheap.
+"""
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Base colours used across the dashboard (blue, green, yellow, purple, red, ...)
+PALETTE_RGB = [
+    (59, 130, 246),
+    (16, 185, 129),
+    (245, 158, 11),
+    (139, 92, 246),
+    (239, 68, 68),
+    (236, 72, 153),
+    (20, 184, 166),
+    (249, 115, 22),
+    (99, 102, 241),
+    (132, 204, 22),
+]
+OTHER_RGB = (156, 163, 175)
+
+# Precomputed rgba strings so building a chart never formats colours
+PALETTE_FILL = [f"rgba({r}, {g}, {b}, 0.8)" for r, g, b in PALETTE_RGB]
+PALETTE_BORDER = [f"rgba({r}, {g}, {b}, 1)" for r, g, b in PALETTE_RGB]
+OTHER_FILL = "rgba({}, {}, {}, 0.8)".format(*OTHER_RGB)
+OTHER_BORDER = "rgba({}, {}, {}, 1)".format(*OTHER_RGB)
+
+OTHER_LABEL = "Other"
+MAX_SLICES = 12
+MAX_POINTS = 500
+CATEGORY_CHARTS = {"pie", "doughnut", "polarArea", "bar"}
+
+# The palette cycled out to the largest payload, so colours are a slice
+_FILL_TABLE = [PALETTE_FILL[i % len(PALETTE_FILL)] for i in range(MAX_POINTS + len(PALETTE_FILL))]
+_BORDER_TABLE = [PALETTE_BORDER[i % len(PALETTE_BORDER)] for i in range(MAX_POINTS + len(PALETTE_BORDER))]
+
+
+def palette(count: int, offset: int = 0, other: bool = False) -> Dict[str, List[str]]:
+    """Fill and border colours for `count` slices, cycling the palette; grey last slice when `other`"""
+    start = offset % len(PALETTE_FILL)
+    if count <= MAX_POINTS:
+        fill, border = _FILL_TABLE[start:start + count], _BORDER_TABLE[start:start + count]
+    else:
+        indexes = [(start + i) % len(PALETTE_FILL) for i in range(count)]
+        fill, border = [PALETTE_FILL[i] for i in indexes], [PALETTE_BORDER[i] for i in indexes]
+    if other and count:
+        fill[-1], border[-1] = OTHER_FILL, OTHER_BORDER
+    return {"backgroundColor": fill, "borderColor": border}
+
+
+def top_n(labels: Sequence[Any], values: Sequence[float], n: int = MAX_SLICES,
+          other_label: str = OTHER_LABEL) -> Tuple[List[Any], List[float], bool]:
+    """
+    The n - 1 largest slices, largest first, plus an `other_label` slice
+    summing the rest. Inputs with at most n slices come back unchanged.
+    Returns (labels, values, has_other).
+    """
+    if len(values) <= n:
+        return list(labels), list(values), False
+
+    import numpy as np
+
+    amounts = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    keep = n - 1
+    largest = np.argpartition(-amounts, keep - 1)[:keep]
+    largest = largest[np.argsort(-amounts[largest], kind="stable")]
+    rest = amounts.sum() - amounts[largest].sum()
+    kept_labels = np.asarray(labels, dtype=object)[largest].tolist()
+    return kept_labels + [other_label], amounts[largest].tolist() + [float(rest)], True
+
+
+def thin_series(labels: Sequence[Any], values: Sequence[float],
+                max_points: int = MAX_POINTS) -> Tuple[List[Any], List[float]]:
+    """An ordered series reduced to `max_points` with LTTB, keeping its first and last points"""
+    if len(values) <= max_points:
+        return list(labels), list(values)
+
+    import numpy as np
+    from timeseries import lttb
+
+    keep = lttb(np.arange(len(values)), np.nan_to_num(np.asarray(values, dtype=np.float64)), max_points)
+    return np.asarray(labels, dtype=object)[keep].tolist(), np.asarray(values)[keep].tolist()
+
+
+def group_rows(data: Union[Sequence[Mapping[str, Any]], Mapping[str, Sequence[Any]]], label_column: str,
+               value_column: Optional[str] = None) -> Dict[Any, float]:
+    """
+    Sum `value_column` per distinct `label_column` over result rows (or a
+    column batch), in first-seen label order; counts rows per label when
+    value_column is None. NULLs and values that are not numbers add 0.
+    """
+    if isinstance(data, Mapping):
+        grouped = _group_arrays(data[label_column], None if value_column is None else data[value_column])
+        if grouped is not None:
+            return grouped
+        labels = _as_list(data[label_column])
+        if value_column is None:
+            return {label: float(count) for label, count in Counter(labels).items()}
+        values = _as_list(data[value_column])
+        fast = safe = lambda: zip(labels, values)
+    else:
+        if value_column is None:
+            try:
+                counts = Counter(map(itemgetter(label_column), data))
+            except KeyError:
+                counts = Counter(row.get(label_column) for row in data)
+            return {label: float(count) for label, count in counts.items()}
+        fast = lambda: map(itemgetter(label_column, value_column), data)
+        safe = lambda: ((row.get(label_column), row.get(value_column)) for row in data)
+
+    # A plain dict accumulation; Decimal amounts, NULLs, numeric strings or
+    # missing keys fail it and take the converting pass instead
+    totals: Dict[Any, float] = defaultdict(float)
+    try:
+        for label, value in fast():
+            totals[label] += value
+        if all(type(total) is float for total in totals.values()):
+            return totals
+    except (TypeError, KeyError):
+        pass
+    totals.clear()
+    for label, value in safe():
+        totals[label] += _number(value)
+    return totals
+
+
+def _number(value: Any) -> float:
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _as_list(column: Sequence[Any]) -> List[Any]:
+    # NumPy columns iterate as NumPy scalars; plain Python values hash faster
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+def _group_arrays(labels: Any, values: Any = None) -> Optional[Dict[Any, float]]:
+    """
+    Vectorised group-by for NumPy label columns of numbers or fixed-width
+    strings with a numeric (or no) value column; None when the columns
+    need the dict path
+    """
+    kind = getattr(getattr(labels, "dtype", None), "kind", None)
+    if kind not in ("b", "i", "u", "f", "U", "S") or labels.ndim != 1 or not len(labels):
+        return None
+    if values is not None and getattr(getattr(values, "dtype", None), "kind", None) not in ("b", "i", "u", "f"):
+        return None
+
+    import numpy as np
+
+    if kind in "US":
+        if not labels.itemsize:
+            return None
+        # Strings are grouped by a 64-bit hash of their code units, then
+        # checked against the labels so a collision falls back to the dict path
+        units = np.ascontiguousarray(labels).view(np.uint32 if kind == "U" else np.uint8).reshape(len(labels), -1)
+        keys = np.zeros(len(labels), dtype=np.uint64)
+        for column in units.T:
+            keys *= np.uint64(1099511628211)
+            keys ^= column
+    else:
+        keys = labels
+    groups, inverse = np.unique(keys, return_inverse=True)
+    # First row of each group: assigning rows in reverse leaves the smallest index
+    first = np.empty(len(groups), dtype=np.int64)
+    first[inverse[::-1]] = np.arange(len(labels) - 1, -1, -1)
+    distinct = labels[first]
+    if kind in "US" and not (distinct[inverse] == labels).all():
+        return None
+
+    if values is None:
+        totals = np.bincount(inverse, minlength=len(groups)).astype(np.float64)
+    else:
+        totals = np.bincount(inverse, weights=np.nan_to_num(values.astype(np.float64, copy=False)),
+                             minlength=len(groups))
+    order = np.argsort(first)
+    return dict(zip(distinct[order].tolist(), totals[order].tolist()))
+
+
+def _series_labels(labels: List[Any]) -> List[Any]:
+    """Labels in series order; NULL or mixed-type labels sort by text, NULL last"""
+    try:
+        return sorted(labels)
+    except TypeError:
+        return sorted(labels, key=lambda label: (label is None, str(label)))
+
+
+def _payload(chart_type: str, labels: List[Any], values: List[Any], label: str, other: bool) -> Dict[str, Any]:
+    """Single-dataset Chart.js payload in the shape ChartResponse.jsx renders"""
+    dataset = {"label": label, "data": values, "borderWidth": 2}
+    dataset.update(palette(len(labels), other=other))
+    return {
+        "type": chart_type,
+        "labels": labels,
+        "datasets": [dataset],
+    }
+
+
+def build_chart(chart_type: str, labels: Sequence[Any], values: Sequence[Any], label: str,
+                max_slices: int = MAX_SLICES, max_points: int = MAX_POINTS) -> Dict[str, Any]:
+    """Chart payload from aggregated labels and values, capped in size"""
+    other = False
+    if chart_type in CATEGORY_CHARTS:
+        labels, values, other = top_n(labels, values, min(max_slices, max_points))
+    else:
+        labels, values = thin_series(labels, values, max_points)
+    return _payload(chart_type, labels, values, label, other)
+
+
+def shape_chart(chart_type: str, data: Union[Sequence[Mapping[str, Any]], Mapping[str, Sequence[Any]]],
+                label_column: str, value_column: Optional[str], label: str, scale: float = 1.0,
+                digits: int = 2, max_slices: int = MAX_SLICES, max_points: int = MAX_POINTS) -> Dict[str, Any]:
+    """
+    Chart payload straight from result rows: group by `label_column`,
+    bucket or thin to the caps, then scale (e.g. rupees to crores) and round
+    """
+    totals = group_rows(data, label_column, value_column)
+    if chart_type in CATEGORY_CHARTS:
+        slices = min(max_slices, max_points)
+        if len(totals) > slices:
+            labels, values, other = top_n(list(totals), list(totals.values()), slices)
+        else:
+            labels = sorted(totals, key=totals.get, reverse=True)
+            values, other = [totals[name] for name in labels], False
+    else:
+        labels = _series_labels(list(totals))
+        labels, values = thin_series(labels, [totals[name] for name in labels], max_points)
+        other = False
+
+    values = [round(value * scale, digits) for value in values]
+    return _payload(chart_type, [str(item) for item in labels], values, label, other)
@@ -0,0 +1,121 @@
+"""
+Async variant of MySQLTool for use from FastAPI handlers.
+
+Uses aiomysql when it is installed, so queries never block the event loop.
+Without it, the synchronous MySQLTool runs on a bounded thread pool instead.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from db.executor import run_blocking
+from db.mysql_connect import MYSQL_CONFIG, MySQLTool
+from db.portfolio_summary import PortfolioSummary, PortfolioSummaryEngine, check_rows
+from settings import get_settings
+
+try:
+    import aiomysql
+except ImportError:  # aiomysql is optional, use the thread-pool fallback
+    aiomysql = None
+
+
+class AsyncMySQLTool:
+    """
+    Async MySQL tool with the same methods as MySQLTool.
+
+    SQL generation is shared with the sync tool; only execution differs.
+    Pass `use_driver=False` (or leave aiomysql uninstalled) to route every
+    query through the thread-pool fallback.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None, use_driver: Optional[bool] = None,
+                 sync_tool: Optional[MySQLTool] = None):
+        self.config = dict(config or MYSQL_CONFIG)
+        self.use_driver = (aiomysql is not None) if use_driver is None else use_driver
+        self._sync = sync_tool or MySQLTool(self.config)
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _get_pool(self):
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    settings = get_settings()
+                    self._pool = await aiomysql.create_pool(
+                        host=self.config.get("host"),
+                        port=int(self.config.get("port") or 3306),
+                        user=self.config.get("user"),
+                        password=self.config.get("password") or "",
+                        db=self.config.get("database"),
+                        minsize=1,
+                        maxsize=settings.mysql_pool_size + settings.mysql_pool_max_overflow,
+                        pool_recycle=int(settings.mysql_pool_recycle_seconds),
+                        autocommit=True,
+                    )
+        return self._pool
+
+    async def _execute_sql(self, query: str) -> List[Dict[str, Any]]:
+        """Execute SQL query and return results"""
+        if not self.use_driver:
+            return await run_blocking(self._sync._execute_sql, query)
+
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as connection:
+                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query)
+                    return list(await cursor.fetchall())
+        except Exception as e:
+            return [{"error": f"SQL execution failed: {str(e)}"}]
+
+    async def execute_portfolio_query(self, query_description: str) -> List[Dict[str, Any]]:
+        """Async counterpart of MySQLTool.execute_portfolio_query"""
+        try:
+            sql_query = self._sync._generate_portfolio_sql(query_description)
+            return await self._execute_sql(sql_query)
+        except Exception as e:
+            return [{"error": f"Portfolio query failed: {str(e)}"}]
+
+    async def analyze_transactions(self, analysis_type: str) -> List[Dict[str, Any]]:
+        """Async counterpart of MySQLTool.analyze_transactions"""
+        try:
+            sql_query = self._sync._generate_transaction_sql(analysis_type)
+            return await self._execute_sql(sql_query)
+        except Exception as e:
+            return [{"error": f"Transaction analysis failed: {str(e)}"}]
+
+    async def get_rm_analytics(self, analysis_type: str) -> List[Dict[str, Any]]:
+        """Async counterpart of MySQLTool.get_rm_analytics"""
+        try:
+            sql_query = self._sync._generate_rm_sql(analysis_type)
+            return await self._execute_sql(sql_query)
+        except Exception as e:
+            return [{"error": f"RM analytics failed: {str(e)}"}]
+
+    async def get_portfolio_summary(self, top_n: int = 5, parallel: bool = False) -> Dict[str, Any]:
+        """Async counterpart of MySQLTool.get_portfolio_summary"""
+        try:
+            summary = await self.summarize_portfolios(top_n, parallel)
+            return summary.to_dict()
+        except Exception as e:
+            return {"error": f"Portfolio summary failed: {str(e)}"}
+
+    async def summarize_portfolios(self, top_n: int = 5, parallel: bool = False) -> PortfolioSummary:
+        """Async counterpart of MySQLTool.summarize_portfolios"""
+        engine = PortfolioSummaryEngine(None, top_n)
+        if not parallel:
+            rows = await self._execute_sql(engine.combined_sql())
+            return engine.from_combined_rows(check_rows(rows))
+
+        queries = engine.split_sql()
+        scalar_rows, asset_rows = await asyncio.gather(
+            self._execute_sql(queries["scalars"]),
+            self._execute_sql(queries["top_assets"])
+        )
+        return engine.from_split_rows(check_rows(scalar_rows), check_rows(asset_rows))
+
+    async def close(self) -> None:
+        """Close the driver pool, if one was opened"""
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
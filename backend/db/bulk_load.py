@@ -0,0 +1,261 @@
+"""
+Bulk loading for the seeders and large imports.
+
+MySQL rows go in batches of `batch_size` through `executemany`, which the
+connector rewrites into one multi-row INSERT per batch, or through
+`LOAD DATA LOCAL INFILE` from a tab-separated temp file written as the rows
+stream past. For large loads the table's secondary indexes are dropped
+first and rebuilt in a single ALTER afterwards, so each index is sorted
+and built once instead of updated row by row.
+
+MongoDB documents go through `insert_many(ordered=False)` (duplicates are
+counted and skipped, the rest of the batch still lands) or `bulk_write`
+upserts keyed on one field, one round trip per batch either way.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from settings import get_settings
+
+# Loads at least this large drop and rebuild secondary indexes by default
+DEFER_INDEX_ROWS = 100000
+
+MYSQL_METHODS = ("executemany", "infile")
+
+# MongoDB duplicate key error
+DUPLICATE_KEY = 11000
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def mysql_connection(local_infile: bool = False):
+    """Connection from the configured MySQL settings; LOAD DATA LOCAL needs local_infile"""
+    import mysql.connector
+    return mysql.connector.connect(**get_settings().mysql_config, allow_local_infile=local_infile)
+
+
+def _quote(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def insert_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                batch_size: Optional[int] = None) -> int:
+    """INSERT rows with one multi-row statement per batch; returns the row count"""
+    batch_size = batch_size or get_settings().bulk_batch_size
+    statement = (
+        f"INSERT INTO {_quote(table)} ({', '.join(_quote(column) for column in columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    count = 0
+    for batch in batched(rows, batch_size):
+        cursor.executemany(statement, batch)
+        count += len(batch)
+    return count
+
+
+def _infile_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    text = str(value)
+    if "\\" in text or "\t" in text or "\n" in text:
+        text = text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    return text
+
+
+def _infile_line(row: Sequence[Any]) -> str:
+    # Most rows need no NULLs, booleans or escapes: str() every value and
+    # only take the per-value path when the joined line says otherwise
+    line = "\t".join(map(str, row))
+    if (line.count("\t") != len(row) - 1 or "\\" in line or "\n" in line
+            or any(value is None or value is True or value is False for value in row)):
+        line = "\t".join(map(_infile_value, row))
+    return line + "\n"
+
+
+def write_infile(handle, rows: Iterable[Sequence[Any]], batch_size: int) -> int:
+    """Write rows as LOAD DATA's default tab-separated format; returns the row count"""
+    count = 0
+    for batch in batched(rows, batch_size):
+        handle.write("".join(map(_infile_line, batch)))
+        count += len(batch)
+    return count
+
+
+def load_infile(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                batch_size: Optional[int] = None) -> int:
+    """
+    LOAD DATA LOCAL INFILE from a temp file; the connection needs
+    allow_local_infile and the server local_infile=ON
+    """
+    batch_size = batch_size or get_settings().bulk_batch_size
+    handle = tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", suffix=".tsv", delete=False)
+    try:
+        with handle:
+            count = write_infile(handle, rows, batch_size)
+        if count:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {_quote(table)} CHARACTER SET utf8mb4 "
+                f"({', '.join(_quote(column) for column in columns)})",
+                (handle.name,)
+            )
+        return count
+    finally:
+        os.unlink(handle.name)
+
+
+def secondary_indexes(cursor, table: str) -> List[Tuple[str, str]]:
+    """
+    (name, definition) for each secondary index that is safe to drop:
+    not the primary key and not the index a foreign key relies on
+    """
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND REFERENCED_TABLE_NAME IS NOT NULL",
+        (table,)
+    )
+    foreign_key_columns = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute(f"SHOW INDEX FROM {_quote(table)}")
+    names = [column[0] for column in cursor.description]
+    indexes: Dict[str, Dict[str, Any]] = {}
+    for row in cursor.fetchall():
+        index = dict(zip(names, row))
+        entry = indexes.setdefault(index["Key_name"], {
+            "unique": not int(index["Non_unique"]),
+            "type": index["Index_type"],
+            "parts": [],
+        })
+        part = _quote(index["Column_name"])
+        if index.get("Sub_part"):
+            part += f"({index['Sub_part']})"
+        entry["parts"].append((int(index["Seq_in_index"]), index["Column_name"], part))
+
+    definitions = []
+    for name, entry in indexes.items():
+        parts = sorted(entry["parts"])
+        if name == "PRIMARY" or parts[0][1] in foreign_key_columns:
+            continue
+        kind = "FULLTEXT INDEX" if entry["type"] == "FULLTEXT" else "UNIQUE INDEX" if entry["unique"] else "INDEX"
+        definitions.append((name, f"{kind} {_quote(name)} ({', '.join(part for _, _, part in parts)})"))
+    return definitions
+
+
+@contextmanager
+def deferred_indexes(cursor, table: str):
+    """Drop the table's secondary indexes for the block and rebuild them after it"""
+    indexes = secondary_indexes(cursor, table)
+    if indexes:
+        cursor.execute(f"ALTER TABLE {_quote(table)} "
+                       + ", ".join(f"DROP INDEX {_quote(name)}" for name, _ in indexes))
+    try:
+        yield [name for name, _ in indexes]
+    finally:
+        if indexes:
+            cursor.execute(f"ALTER TABLE {_quote(table)} "
+                           + ", ".join(f"ADD {definition}" for _, definition in indexes))
+
+
+@contextmanager
+def _relaxed_checks(cursor):
+    """Skip foreign key and unique checks for the load; restored afterwards"""
+    cursor.execute("SELECT @@foreign_key_checks, @@unique_checks")
+    foreign_key_checks, unique_checks = cursor.fetchall()[0]
+    cursor.execute("SET foreign_key_checks = 0, unique_checks = 0")
+    try:
+        yield
+    finally:
+        cursor.execute("SET foreign_key_checks = %s, unique_checks = %s",
+                       (int(foreign_key_checks), int(unique_checks)))
+
+
+def bulk_load_mysql(connection, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                    method: str = "executemany", batch_size: Optional[int] = None,
+                    defer_indexes: Optional[bool] = None) -> int:
+    """
+    Load rows into `table` and commit once; returns the row count.
+    `defer_indexes` defaults to on for sized inputs of DEFER_INDEX_ROWS or more.
+    """
+    if method not in MYSQL_METHODS:
+        raise ValueError(f"method must be one of {', '.join(MYSQL_METHODS)}")
+    if defer_indexes is None:
+        defer_indexes = hasattr(rows, "__len__") and len(rows) >= DEFER_INDEX_ROWS
+    load = insert_rows if method == "executemany" else load_infile
+
+    def load_and_commit(cursor) -> int:
+        # Roll back before the index rebuild, whose ALTER TABLE would
+        # otherwise implicitly commit a half-finished load
+        try:
+            count = load(cursor, table, columns, rows, batch_size)
+            connection.commit()
+            return count
+        except Exception:
+            connection.rollback()
+            raise
+
+    cursor = connection.cursor()
+    try:
+        with _relaxed_checks(cursor):
+            if not defer_indexes:
+                return load_and_commit(cursor)
+            with deferred_indexes(cursor, table):
+                return load_and_commit(cursor)
+    finally:
+        cursor.close()
+
+
+def insert_documents(collection, documents: Iterable[Dict[str, Any]],
+                     batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    insert_many(ordered=False) per batch. Documents that hit a duplicate key
+    are counted as skipped; any other write error is raised.
+    """
+    from pymongo.errors import BulkWriteError
+
+    batch_size = batch_size or get_settings().bulk_batch_size
+    counts = {"inserted": 0, "skipped": 0}
+    for batch in batched(documents, batch_size):
+        try:
+            counts["inserted"] += len(collection.insert_many(batch, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                raise
+            counts["inserted"] += e.details.get("nInserted", 0)
+            counts["skipped"] += len(errors)
+    return counts
+
+
+def upsert_documents(collection, documents: Iterable[Dict[str, Any]], key: str,
+                     replace: bool = False, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    bulk_write upserts matched on `key`, one round trip per batch. With
+    replace=False existing documents are left as they are ($setOnInsert);
+    with replace=True they are replaced.
+    """
+    from pymongo import ReplaceOne, UpdateOne
+
+    batch_size = batch_size or get_settings().bulk_batch_size
+    counts = {"inserted": 0, "matched": 0, "modified": 0}
+    for batch in batched(documents, batch_size):
+        if replace:
+            requests = [ReplaceOne({key: document[key]}, document, upsert=True) for document in batch]
+        else:
+            requests = [UpdateOne({key: document[key]}, {"$setOnInsert": document}, upsert=True)
+                        for document in batch]
+        result = collection.bulk_write(requests, ordered=False)
+        counts["inserted"] += result.upserted_count
+        counts["matched"] += result.matched_count
+        counts["modified"] += result.modified_count
+    return counts
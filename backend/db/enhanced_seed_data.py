@@ -1,16 +1,24 @@
 import os
-from dotenv import load_dotenv
+import sys
+
+if __name__ == "__main__":
+    # Run as a script (python db/enhanced_seed_data.py): make backend/ importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from pymongo import MongoClient
 import mysql.connector
+from db.bulk_load import insert_rows, upsert_documents
+from db.mongo_connect import add_search_fields
+from settings import get_settings
 
-load_dotenv()
+settings = get_settings()
 
 def seed_enhanced_mongodb():
     """Seed MongoDB with realistic film star and sports personality data"""
     
     try:
-        mongo_uri = os.getenv("MONGO_URI")
-        mongo_db = os.getenv("MONGO_DB")
+        mongo_uri = settings.mongo_uri
+        mongo_db = settings.mongo_db
         
         client = MongoClient(mongo_uri)
         db = client[mongo_db]
@@ -20,6 +28,7 @@ def seed_enhanced_mongodb():
         celebrity_clients = [
             {
                 "name": "Shah Rukh Khan",
+                "client_id": 1,
                 "age": 58,
                 "city": "Mumbai",
                 "email": "srk@example.com",
@@ -34,6 +43,7 @@ def seed_enhanced_mongodb():
             },
             {
                 "name": "Virat Kohli",
+                "client_id": 2,
                 "age": 35,
                 "city": "Delhi",
                 "email": "virat@example.com",
@@ -48,6 +58,7 @@ def seed_enhanced_mongodb():
             },
             {
                 "name": "Deepika Padukone",
+                "client_id": 3,
                 "age": 38,
                 "city": "Mumbai",
                 "email": "deepika@example.com",
@@ -62,6 +73,7 @@ def seed_enhanced_mongodb():
             },
             {
                 "name": "MS Dhoni",
+                "client_id": 4,
                 "age": 42,
                 "city": "Chennai",
                 "email": "dhoni@example.com",
@@ -76,6 +88,7 @@ def seed_enhanced_mongodb():
             },
             {
                 "name": "Priyanka Chopra",
+                "client_id": 5,
                 "age": 41,
                 "city": "Mumbai",
                 "email": "priyanka@example.com",
@@ -90,6 +103,7 @@ def seed_enhanced_mongodb():
             },
             {
                 "name": "Rohit Sharma",
+                "client_id": 6,
                 "age": 36,
                 "city": "Mumbai",
                 "email": "rohit@example.com",
@@ -104,6 +118,7 @@ def seed_enhanced_mongodb():
             },
             {
                 "name": "Alia Bhatt",
+                "client_id": 7,
                 "age": 30,
                 "city": "Mumbai",
                 "email": "alia@example.com",
@@ -118,6 +133,7 @@ def seed_enhanced_mongodb():
             },
             {
                 "name": "Hardik Pandya",
+                "client_id": 8,
                 "age": 30,
                 "city": "Ahmedabad",
                 "email": "hardik@example.com",
@@ -132,13 +148,9 @@ def seed_enhanced_mongodb():
             }
         ]
         
-        # Insert clients
-        for client in celebrity_clients:
-            if not collection.find_one({"name": client["name"]}):
-                collection.insert_one(client)
-                print(f"✅ Inserted celebrity client: {client['name']}")
-            else:
-                print(f"⚠️ Client already exists: {client['name']}")
+        # Insert clients that do not exist yet, in one round trip
+        counts = upsert_documents(collection, [add_search_fields(profile) for profile in celebrity_clients], key="name")
+        print(f"✅ Inserted {counts['inserted']} celebrity clients, {counts['matched']} already existed")
         
         print("✅ Enhanced MongoDB seeding complete.")
         client.close()
@@ -151,10 +163,10 @@ def seed_enhanced_mysql():
     
     try:
         mysql_config = {
-            "host": os.getenv("MYSQL_HOST"),
-            "user": os.getenv("MYSQL_USER"),
-            "password": os.getenv("MYSQL_PASSWORD"),
-            "database": os.getenv("MYSQL_DB"),
+            "host": settings.mysql_host,
+            "user": settings.mysql_user,
+            "password": settings.mysql_password,
+            "database": settings.mysql_db,
         }
         
         connection = mysql.connector.connect(**mysql_config)
@@ -168,12 +180,8 @@ def seed_enhanced_mysql():
         ]
         
         cursor.execute("DELETE FROM relationship_managers")
-        for rm in rm_data:
-            cursor.execute("""
-            INSERT INTO relationship_managers (id, manager_name, portfolio_value)
-            VALUES (%s, %s, %s)
-            """, rm)
-            print(f"✅ Inserted RM: {rm[1]}")
+        count = insert_rows(cursor, "relationship_managers", ["id", "manager_name", "portfolio_value"], rm_data)
+        print(f"✅ Inserted {count} RMs")
         
         # Enhanced portfolio data with realistic amounts for celebrities
         portfolio_data = [
@@ -204,12 +212,8 @@ def seed_enhanced_mysql():
         ]
         
         cursor.execute("DELETE FROM portfolios")
-        for portfolio in portfolio_data:
-            cursor.execute("""
-            INSERT INTO portfolios (id, client_id, asset_type, amount, stock_symbol)
-            VALUES (%s, %s, %s, %s, %s)
-            """, portfolio)
-            print(f"✅ Inserted portfolio: Client {portfolio[1]} - {portfolio[2]}")
+        count = insert_rows(cursor, "portfolios", ["id", "client_id", "asset_type", "amount", "stock_symbol"], portfolio_data)
+        print(f"✅ Inserted {count} portfolios")
         
         # Enhanced transaction data
         transaction_data = [
@@ -224,12 +228,10 @@ def seed_enhanced_mysql():
         ]
         
         cursor.execute("DELETE FROM transactions")
-        for txn in transaction_data:
-            cursor.execute("""
-            INSERT INTO transactions (id, client_id, transaction_type, amount, asset_type, stock_symbol, transaction_date)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, txn)
-            print(f"✅ Inserted transaction: Client {txn[1]} - {txn[2]} {txn[3]/10000000:.1f} Cr")
+        count = insert_rows(cursor, "transactions", [
+            "id", "client_id", "transaction_type", "amount", "asset_type", "stock_symbol", "transaction_date"
+        ], transaction_data)
+        print(f"✅ Inserted {count} transactions, {sum(txn[3] for txn in transaction_data)/10000000:.1f} Cr in total")
         
         connection.commit()
         cursor.close()
@@ -0,0 +1,32 @@
+"""
+Bounded thread pool for blocking database calls.
+
+Every synchronous MySQL or MongoDB call made from an async handler goes
+through run_blocking, so database concurrency is capped at
+MYSQL_ASYNC_THREADS no matter how many requests are in flight. /query
+misses run here too, since they may search the retrieval index.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from settings import get_settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Bounded thread pool shared by every blocking database call"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings().mysql_async_threads,
+            thread_name_prefix="mysql-sync"
+        )
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a synchronous call on the bounded executor without blocking the loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), fn, *args)
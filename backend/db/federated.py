@@ -0,0 +1,173 @@
+"""
+Federated query planner across MongoDB client profiles and MySQL portfolios.
+
+Client attributes (city, risk appetite, profession) live in Mongo while
+holdings live in MySQL. The planner estimates how many rows each side's
+filter selects, runs the more selective side first, pushes its client ids
+into the other side (`client_id IN (...)` / `$in`) and hash-joins the two
+results in memory.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from db.mongo_connect import CLIENT_TABLE_FIELDS
+from db.portfolio_summary import check_rows
+
+# Ids pushed per IN (...) / $in clause
+IN_CHUNK_SIZE = 1000
+
+
+def _chunks(values: Sequence[Any], size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class MongoClientSource:
+    """Client profiles side of the join, backed by MongoDBTool"""
+
+    def __init__(self, tool, fields: Optional[List[str]] = None):
+        self.tool = tool
+        self.fields = list(fields or CLIENT_TABLE_FIELDS)
+
+    def estimate(self, query: str) -> int:
+        search_filter = self.tool._parse_search_query(query)
+        if not search_filter:
+            return self.tool.collection.estimated_document_count()
+        return self.tool.collection.count_documents(search_filter)
+
+    def fetch(self, query: str, client_ids: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        search_filter = self.tool._parse_search_query(query)
+        projection = {name: 1 for name in self.fields}
+        projection.update({"_id": 0, "client_id": 1})
+        if client_ids is None:
+            return list(self.tool.collection.find(search_filter, projection))
+
+        documents = []
+        for chunk in _chunks(list(client_ids), IN_CHUNK_SIZE):
+            chunk_filter = dict(search_filter)
+            chunk_filter["client_id"] = {"$in": list(chunk)}
+            documents.extend(self.tool.collection.find(chunk_filter, projection))
+        return documents
+
+
+class MySQLPortfolioSource:
+    """Portfolio holdings side of the join, backed by MySQLTool"""
+
+    COLUMNS = "client_id, asset_type, amount, stock_symbol"
+
+    def __init__(self, tool):
+        self.tool = tool
+
+    def _where(self, filters: Dict[str, Any], client_ids: Optional[Sequence[int]] = None):
+        clauses, params = [], []
+        if filters.get("asset_type"):
+            clauses.append("asset_type = %s")
+            params.append(filters["asset_type"])
+        if filters.get("min_amount") is not None:
+            clauses.append("amount >= %s")
+            params.append(filters["min_amount"])
+        if client_ids is not None:
+            clauses.append(f"client_id IN ({', '.join(['%s'] * len(client_ids))})")
+            params.extend(client_ids)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    def estimate(self, filters: Dict[str, Any]) -> int:
+        # The optimizer's row estimate is enough to pick a side and costs no scan
+        where, params = self._where(filters)
+        rows = check_rows(self.tool._execute_sql(f"EXPLAIN SELECT {self.COLUMNS} FROM portfolios {where}", params))
+        return int(rows[0].get("rows") or 0) if rows else 0
+
+    def fetch(self, filters: Dict[str, Any], client_ids: Optional[Sequence[int]] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        limit_sql = f"LIMIT {int(limit)}" if limit else ""
+        if client_ids is None:
+            where, params = self._where(filters)
+            sql = f"SELECT {self.COLUMNS} FROM portfolios {where} ORDER BY amount DESC {limit_sql}"
+            return check_rows(self.tool._execute_sql(sql, params))
+
+        rows = []
+        for chunk in _chunks(list(client_ids), IN_CHUNK_SIZE):
+            where, params = self._where(filters, chunk)
+            sql = f"SELECT {self.COLUMNS} FROM portfolios {where} ORDER BY amount DESC {limit_sql}"
+            rows.extend(check_rows(self.tool._execute_sql(sql, params)))
+        return rows
+
+
+@dataclass
+class FederatedPlan:
+    driver: str
+    client_estimate: int
+    portfolio_estimate: int
+    pushed_ids: int = 0
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+
+class FederatedPlanner:
+    """
+    Answers "portfolios of clients matching X" questions across both stores.
+
+    `client_source` / `portfolio_source` default to adapters over the
+    MongoDBTool / MySQLTool instances; any object with the same
+    estimate/fetch methods can stand in.
+    """
+
+    def __init__(self, mongo_tool=None, mysql_tool=None, client_source=None, portfolio_source=None):
+        self.clients = client_source or MongoClientSource(mongo_tool)
+        self.portfolios = portfolio_source or MySQLPortfolioSource(mysql_tool)
+
+    def plan(self, client_query: str, portfolio_filters: Dict[str, Any]) -> FederatedPlan:
+        client_estimate = self.clients.estimate(client_query)
+        portfolio_estimate = self.portfolios.estimate(portfolio_filters)
+        driver = "clients" if client_estimate <= portfolio_estimate else "portfolios"
+        return FederatedPlan(driver, client_estimate, portfolio_estimate)
+
+    def top_portfolios(self, client_query: str = "", asset_type: Optional[str] = None,
+                       min_amount: Optional[float] = None, limit: int = 10) -> Dict[str, Any]:
+        """
+        Top holdings by amount for clients matching a natural language
+        filter, e.g. top_portfolios("high risk mumbai clients")
+        """
+        filters = {"asset_type": asset_type, "min_amount": min_amount}
+        start = time.perf_counter()
+        plan = self.plan(client_query, filters)
+        plan.timings_ms["plan"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        if plan.driver == "clients":
+            profiles = self.clients.fetch(client_query)
+            ids = sorted({p["client_id"] for p in profiles if p.get("client_id") is not None})
+            plan.pushed_ids = len(ids)
+            holdings = self.portfolios.fetch(filters, ids, limit) if ids else []
+        else:
+            holdings = self.portfolios.fetch(filters)
+            ids = sorted({row["client_id"] for row in holdings})
+            plan.pushed_ids = len(ids)
+            profiles = self.clients.fetch(client_query, ids) if ids else []
+        plan.timings_ms["fetch"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        rows = hash_join(profiles, holdings, limit)
+        plan.timings_ms["join"] = (time.perf_counter() - start) * 1000
+
+        return {"rows": rows, "plan": plan}
+
+
+def hash_join(profiles: List[Dict[str, Any]], holdings: List[Dict[str, Any]],
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Inner join holdings to profiles on client_id, largest amounts first.
+    Builds the hash table on the profiles, which is the smaller side for
+    any per-client filter.
+    """
+    by_client = {profile["client_id"]: profile for profile in profiles if profile.get("client_id") is not None}
+    joined = []
+    for holding in holdings:
+        profile = by_client.get(holding["client_id"])
+        if profile is not None:
+            row = dict(profile)
+            row.update(holding)
+            joined.append(row)
+    joined.sort(key=lambda row: row.get("amount") or 0, reverse=True)
+    return joined[:limit] if limit else joined
@@ -1,19 +1,60 @@
-import os
-from pymongo import MongoClient
-from typing import List, Dict, Any
+import re
+import base64
+from typing import List, Dict, Any, Iterator, Optional
 import json
 
+from settings import get_settings
+
+# Fields with an equality/prefix index; *_norm are lowercase shadow copies
+INDEXED_FIELDS = ["city_norm", "risk_appetite", "investment_preferences", "relationship_manager", "name_norm", "client_id"]
+
+# Fields the client tables actually render; the default search projection
+CLIENT_TABLE_FIELDS = ["name", "age", "city", "profession", "risk_appetite"]
+
+DEFAULT_SEARCH_LIMIT = 100
+MAX_SEARCH_LIMIT = 1000
+
+# Stable keyset order for pagination, backed by a compound index
+PAGE_SORT = [("name_norm", 1), ("_id", 1)]
+
+# Chartable profile dimensions -> source field; array fields are unwound
+DISTRIBUTION_FIELDS = {
+    "risk_appetite": "risk_appetite",
+    "city": "city",
+    "profession": "profession",
+    "investment_preferences": "investment_preferences",
+}
+ARRAY_FIELDS = {"investment_preferences"}
+
+def normalize_text(value: Any) -> str:
+    """Lowercase, trimmed, whitespace-collapsed form used for shadow fields"""
+    return " ".join(str(value).split()).lower() if value is not None else ""
+
+def add_search_fields(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the profile with its normalized shadow fields filled in"""
+    profile = dict(profile)
+    if "city" in profile:
+        profile["city_norm"] = normalize_text(profile["city"])
+    if "name" in profile:
+        profile["name_norm"] = normalize_text(profile["name"])
+    return profile
+
 class MongoDBTool:
     """
     MongoDB tool for LangChain agent to query client profiles
     """
     
     def __init__(self):
-        self.client = MongoClient(os.getenv("MONGO_URI"))
-        self.db = self.client[os.getenv("MONGO_DB", "wealth_db")]
+        # Imported here so loading this module (e.g. for add_search_fields)
+        # does not pull in the driver
+        from pymongo import MongoClient
+        settings = get_settings()
+        self.client = MongoClient(settings.mongo_uri)
+        self.db = self.client[settings.mongo_db]
         self.collection = self.db["client_profiles"]
     
-    def search_clients(self, query: str) -> List[Dict[str, Any]]:
+    def search_clients(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT, skip: int = 0,
+                       fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Search client profiles based on natural language query
         """
@@ -21,14 +62,86 @@ class MongoDBTool:
             # Parse the query to determine search criteria
             search_filter = self._parse_search_query(query)
             
-            # Execute MongoDB query
-            results = list(self.collection.find(search_filter, {"_id": 0}))
+            # Execute MongoDB query, fetching only the rendered fields
+            cursor = self.collection.find(search_filter, self._projection(fields)) \
+                .sort(PAGE_SORT) \
+                .skip(max(0, skip)) \
+                .limit(self._clamp_limit(limit))
             
-            return results
+            return list(cursor)
             
         except Exception as e:
             return [{"error": f"MongoDB search failed: {str(e)}"}]
     
+    def search_clients_page(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT,
+                            cursor: Optional[str] = None,
+                            fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Keyset-paginated search. Returns {"items", "next_cursor"}; pass
+        next_cursor back to fetch the following page.
+        """
+        limit = self._clamp_limit(limit)
+        search_filter = self._parse_search_query(query)
+        if cursor:
+            last_name, last_id = _decode_cursor(cursor)
+            after = {"$or": [
+                {"name_norm": {"$gt": last_name}},
+                {"name_norm": last_name, "_id": {"$gt": last_id}}
+            ]}
+            search_filter = {"$and": [search_filter, after]} if search_filter else after
+        
+        # Fetch one extra document to know whether another page exists
+        projection = self._projection(fields)
+        projection.update({"_id": 1, "name_norm": 1})
+        documents = list(
+            self.collection.find(search_filter, projection).sort(PAGE_SORT).limit(limit + 1)
+        )
+        
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        next_cursor = _encode_cursor(documents[-1]) if has_more and documents else None
+        
+        keep_name_norm = fields is not None and "name_norm" in fields
+        for document in documents:
+            document.pop("_id", None)
+            if not keep_name_norm:
+                document.pop("name_norm", None)
+        
+        return {"items": documents, "next_cursor": next_cursor}
+    
+    def _projection(self, fields: Optional[List[str]]) -> Dict[str, int]:
+        projection = {field: 1 for field in (fields or CLIENT_TABLE_FIELDS)}
+        projection["_id"] = 0
+        return projection
+    
+    def _clamp_limit(self, limit: int) -> int:
+        return max(1, min(int(limit or DEFAULT_SEARCH_LIMIT), MAX_SEARCH_LIMIT))
+    
+    def stream_clients(self, query: str, batch_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streaming variant of search_clients yielding documents in batches
+        of batch_size, matching the server cursor batch size
+        """
+        cursor = None
+        try:
+            search_filter = self._parse_search_query(query)
+            cursor = self.collection.find(search_filter, {"_id": 0}, batch_size=batch_size)
+            
+            batch = []
+            for document in cursor:
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+                
+        except Exception as e:
+            yield [{"error": f"MongoDB search failed: {str(e)}"}]
+        finally:
+            if cursor is not None:
+                cursor.close()
+    
     def _parse_search_query(self, query: str) -> Dict[str, Any]:
         """
         Parse natural language query into MongoDB filter
@@ -36,11 +149,16 @@ class MongoDBTool:
         query_lower = query.lower()
         filter_dict = {}
         
-        # Location-based searches
+        # Location-based searches: anchored prefix match on the indexed
+        # shadow field, so "Mumbai Suburban" still matches "mumbai" with an
+        # index scan. Unlike an unanchored substring regex, a city named
+        # only mid-value ("Navi Mumbai") is not matched.
         cities = ["mumbai", "delhi", "bangalore", "chennai", "pune", "hyderabad"]
-        for city in cities:
-            if city in query_lower:
-                filter_dict["city"] = {"$regex": city, "$options": "i"}
+        matched_cities = [re.compile("^" + re.escape(city)) for city in cities if city in query_lower]
+        if len(matched_cities) == 1:
+            filter_dict["city_norm"] = matched_cities[0]
+        elif matched_cities:
+            filter_dict["city_norm"] = {"$in": matched_cities}
         
         # Risk appetite searches
         if "high risk" in query_lower or "aggressive" in query_lower:
@@ -68,12 +186,15 @@ class MongoDBTool:
         return filter_dict
     
     def get_client_by_name(self, name: str) -> Dict[str, Any]:
-        """Get specific client by name"""
+        """Get specific client by name (exact, then anchored prefix match)"""
         try:
-            result = self.collection.find_one(
-                {"name": {"$regex": name, "$options": "i"}},
-                {"_id": 0}
-            )
+            name_norm = normalize_text(name)
+            result = self.collection.find_one({"name_norm": name_norm}, {"_id": 0})
+            if result is None:
+                result = self.collection.find_one(
+                    {"name_norm": {"$regex": "^" + re.escape(name_norm)}},
+                    {"_id": 0}
+                )
             return result or {"error": f"Client '{name}' not found"}
         except Exception as e:
             return {"error": f"Error finding client: {str(e)}"}
@@ -88,3 +209,101 @@ class MongoDBTool:
             return results
         except Exception as e:
             return [{"error": f"Error finding clients for RM: {str(e)}"}]
+    
+    def get_distribution(self, dimension: str, query: str = "", top_n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Client counts per value of a profile dimension, grouped server-side.
+        Returns [{"label": ..., "count": ...}] sorted by count.
+        """
+        try:
+            pipeline = [{"$match": self._parse_search_query(query)}]
+            pipeline.extend(self._distribution_stages(dimension, top_n))
+            return list(self.collection.aggregate(pipeline))
+        except Exception as e:
+            return [{"error": f"Distribution query failed: {str(e)}"}]
+    
+    def get_profile_distributions(self, dimensions: Optional[List[str]] = None, query: str = "",
+                                  top_n: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Several distributions in one round trip using a single $facet stage
+        """
+        try:
+            dimensions = dimensions or list(DISTRIBUTION_FIELDS)
+            facets = {dimension: self._distribution_stages(dimension, top_n) for dimension in dimensions}
+            pipeline = [{"$match": self._parse_search_query(query)}, {"$facet": facets}]
+            result = list(self.collection.aggregate(pipeline))
+            return result[0] if result else {dimension: [] for dimension in dimensions}
+        except Exception as e:
+            return {"error": f"Distribution query failed: {str(e)}"}
+    
+    def _distribution_stages(self, dimension: str, top_n: Optional[int] = None) -> List[Dict[str, Any]]:
+        if dimension not in DISTRIBUTION_FIELDS:
+            raise ValueError(f"Unknown distribution dimension: {dimension}")
+        field = DISTRIBUTION_FIELDS[dimension]
+        
+        stages = []
+        if field in ARRAY_FIELDS:
+            stages.append({"$unwind": f"${field}"})
+        stages.extend([
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$match": {"_id": {"$ne": None}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ])
+        if top_n:
+            stages.append({"$limit": int(top_n)})
+        stages.append({"$project": {"_id": 0, "label": "$_id", "count": 1}})
+        return stages
+    
+    def upsert_client(self, profile: Dict[str, Any]) -> None:
+        """Insert or replace a client profile by name, keeping shadow fields in sync"""
+        profile = add_search_fields(profile)
+        self.collection.replace_one({"name": profile["name"]}, profile, upsert=True)
+    
+    def ensure_indexes(self) -> None:
+        """Backfill shadow fields on older documents and create search indexes"""
+        self.collection.update_many(
+            {"$or": [{"city_norm": {"$exists": False}}, {"name_norm": {"$exists": False}}]},
+            [{"$set": {
+                "city_norm": {"$toLower": {"$trim": {"input": {"$ifNull": ["$city", ""]}}}},
+                "name_norm": {"$toLower": {"$trim": {"input": {"$ifNull": ["$name", ""]}}}}
+            }}]
+        )
+        for field in INDEXED_FIELDS:
+            self.collection.create_index(field)
+        self.collection.create_index(PAGE_SORT)
+    
+    def explain_search(self, query: str) -> List[str]:
+        """Stages of the winning plan for a search, e.g. ["FETCH", "IXSCAN"]"""
+        return self.explain_filter(self._parse_search_query(query))
+    
+    def explain_filter(self, search_filter: Dict[str, Any]) -> List[str]:
+        """Stages of the winning plan for a raw MongoDB filter"""
+        plan = self.collection.find(search_filter, {"_id": 0}).explain()
+        return _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+
+def _encode_cursor(document: Dict[str, Any]) -> str:
+    """Opaque continuation token from the last document of a page"""
+    raw = json.dumps([document.get("name_norm", ""), str(document["_id"])])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str):
+    from bson import ObjectId
+    try:
+        name_norm, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return name_norm, ObjectId(last_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Flatten the stage names of an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            if isinstance(value, (dict, list)):
+                stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
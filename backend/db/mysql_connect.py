@@ -1,24 +1,43 @@
-import os
-from dotenv import load_dotenv
-import mysql.connector
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 import json
 
-# Load environment variables
-load_dotenv()
+from db.mysql_pool import get_pool
+from db.portfolio_summary import PortfolioSummary, PortfolioSummaryEngine
+from settings import get_settings
+
+MYSQL_CONFIG = get_settings().mysql_config
+
+# MySQL protocol column type codes -> kind of value the driver returns,
+# so exports can type columns from the cursor instead of guessing
+FIELD_KINDS = {
+    0: "decimal", 246: "decimal",
+    1: "int", 2: "int", 3: "int", 8: "int", 9: "int", 13: "int",
+    4: "float", 5: "float",
+    7: "datetime", 12: "datetime",
+    10: "date", 14: "date",
+    15: "string", 247: "string", 253: "string", 254: "string",
+}
+
+# Rolled up to days in MySQL; weeks, months and LTTB happen in timeseries.py
+TRANSACTION_SERIES_SQL = """
+            SELECT
+                DATE(transaction_date) as day,
+                SUM(amount) as total_amount,
+                COUNT(*) as transaction_count
+            FROM transactions
+            {where}
+            GROUP BY DATE(transaction_date)
+            ORDER BY day
+            """
 
 class MySQLTool:
     """
     MySQL tool for LangChain agent to query portfolio and transaction data
     """
     
-    def __init__(self):
-        self.config = {
-            "host": os.getenv("MYSQL_HOST"),
-            "user": os.getenv("MYSQL_USER"),
-            "password": os.getenv("MYSQL_PASSWORD"),
-            "database": os.getenv("MYSQL_DB"),
-        }
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = dict(config or MYSQL_CONFIG)
+        self.pool = get_pool(self.config)
     
     def execute_portfolio_query(self, query_description: str) -> List[Dict[str, Any]]:
         """
@@ -49,53 +68,27 @@ class MySQLTool:
         Get relationship manager performance analytics
         """
         try:
-            if "performance" in analysis_type.lower() or "ranking" in analysis_type.lower():
-                sql_query = """
-                SELECT 
-                    rm.manager_name,
-                    COUNT(DISTINCT p.client_id) as client_count,
-                    SUM(p.amount) as total_aum,
-                    AVG(p.amount) as avg_portfolio_value,
-                    rm.portfolio_value
-                FROM relationship_managers rm
-                LEFT JOIN portfolios p ON rm.id = p.client_id
-                GROUP BY rm.id, rm.manager_name, rm.portfolio_value
-                ORDER BY total_aum DESC
-                """
-            else:
-                sql_query = "SELECT * FROM relationship_managers ORDER BY portfolio_value DESC"
-            
+            sql_query = self._generate_rm_sql(analysis_type)
             return self._execute_sql(sql_query)
             
         except Exception as e:
             return [{"error": f"RM analytics failed: {str(e)}"}]
     
-    def get_portfolio_summary(self) -> Dict[str, Any]:
+    def get_portfolio_summary(self, top_n: int = 5, parallel: bool = False) -> Dict[str, Any]:
         """Get overall portfolio summary statistics"""
         try:
-            queries = {
-                "total_aum": "SELECT SUM(amount) as total_aum FROM portfolios",
-                "client_count": "SELECT COUNT(DISTINCT client_id) as client_count FROM portfolios",
-                "avg_portfolio": "SELECT AVG(amount) as avg_portfolio FROM portfolios",
-                "top_assets": """
-                    SELECT asset_type, SUM(amount) as total_amount 
-                    FROM portfolios 
-                    GROUP BY asset_type 
-                    ORDER BY total_amount DESC 
-                    LIMIT 5
-                """
-            }
-            
-            summary = {}
-            for key, query in queries.items():
-                result = self._execute_sql(query)
-                summary[key] = result[0] if result else {}
-            
-            return summary
+            return self.summarize_portfolios(top_n, parallel).to_dict()
             
         except Exception as e:
             return {"error": f"Portfolio summary failed: {str(e)}"}
     
+    def summarize_portfolios(self, top_n: int = 5, parallel: bool = False) -> PortfolioSummary:
+        """
+        Typed portfolio summary in a single round trip, or as two
+        concurrent statements when parallel=True
+        """
+        return PortfolioSummaryEngine(self._execute_sql, top_n).run(parallel=parallel)
+    
     def _generate_portfolio_sql(self, description: str) -> str:
         """Generate SQL query based on natural language description"""
         
@@ -140,6 +133,25 @@ class MySQLTool:
             LIMIT 10
             """
     
+    def _generate_rm_sql(self, analysis_type: str) -> str:
+        """Generate SQL for relationship manager analytics"""
+        
+        if "performance" in analysis_type.lower() or "ranking" in analysis_type.lower():
+            return """
+            SELECT 
+                rm.manager_name,
+                COUNT(DISTINCT p.client_id) as client_count,
+                SUM(p.amount) as total_aum,
+                AVG(p.amount) as avg_portfolio_value,
+                rm.portfolio_value
+            FROM relationship_managers rm
+            LEFT JOIN portfolios p ON rm.id = p.client_id
+            GROUP BY rm.id, rm.manager_name, rm.portfolio_value
+            ORDER BY total_aum DESC
+            """
+        
+        return "SELECT * FROM relationship_managers ORDER BY portfolio_value DESC"
+    
     def _generate_transaction_sql(self, analysis_type: str) -> str:
         """Generate SQL for transaction analysis"""
         
@@ -153,6 +165,9 @@ class MySQLTool:
             LIMIT 20
             """
         
+        elif any(word in analysis_lower for word in ("trend", "growth", "timeline", "over time")):
+            return TRANSACTION_SERIES_SQL.format(where="")
+        
         elif "volume" in analysis_lower or "pattern" in analysis_lower:
             return """
             SELECT 
@@ -174,23 +189,107 @@ class MySQLTool:
             LIMIT 15
             """
     
-    def _execute_sql(self, query: str) -> List[Dict[str, Any]]:
+    def get_transaction_series(self, transaction_type: str = None) -> List[Dict[str, Any]]:
+        """
+        Per-day transaction totals (day, total_amount, transaction_count),
+        oldest first, for the time-series charts to re-bucket and downsample
+        """
+        if transaction_type:
+            return self._execute_sql(TRANSACTION_SERIES_SQL.format(where="WHERE transaction_type = %s"),
+                                     (transaction_type,))
+        return self._execute_sql(TRANSACTION_SERIES_SQL.format(where=""))
+    
+    def _execute_sql(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         """Execute SQL query and return results"""
         try:
-            connection = mysql.connector.connect(**self.config)
-            cursor = connection.cursor(dictionary=True)
-            
-            cursor.execute(query)
-            results = cursor.fetchall()
-            
-            cursor.close()
-            connection.close()
+            with self.pool.connection() as connection:
+                cursor = connection.cursor(dictionary=True)
+                
+                cursor.execute(query, params)
+                results = cursor.fetchall()
+                
+                cursor.close()
             
             return results
             
         except Exception as e:
             return [{"error": f"SQL execution failed: {str(e)}"}]
     
+    def stream_portfolio_query(self, query_description: str, batch_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streaming variant of execute_portfolio_query yielding row batches
+        """
+        return self._stream_sql(self._generate_portfolio_sql(query_description), batch_size)
+    
+    def stream_transactions(self, analysis_type: str, batch_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streaming variant of analyze_transactions yielding row batches
+        """
+        return self._stream_sql(self._generate_transaction_sql(analysis_type), batch_size)
+    
+    def _stream_sql(self, query: str, batch_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Execute SQL on an unbuffered cursor and yield rows in fixed-size
+        batches, so memory stays bounded whatever the result size
+        """
+        conn = self.pool.acquire()
+        finished = False
+        try:
+            cursor = conn.raw.cursor(dictionary=True, buffered=False)
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+            finished = True
+        except Exception as e:
+            yield [{"error": f"SQL execution failed: {str(e)}"}]
+        finally:
+            # A half-read unbuffered result leaves the connection unusable
+            self.pool.release(conn, discard=not finished)
+    
+    def stream_portfolio_batches(self, query_description: str,
+                                 batch_size: int = 10000) -> Iterator[Tuple[List[Tuple[str, str]], List[tuple]]]:
+        """
+        Tuple-batch variant of execute_portfolio_query for columnar exports
+        """
+        return self.stream_batches(self._generate_portfolio_sql(query_description), batch_size)
+    
+    def stream_transaction_batches(self, analysis_type: str,
+                                   batch_size: int = 10000) -> Iterator[Tuple[List[Tuple[str, str]], List[tuple]]]:
+        """
+        Tuple-batch variant of analyze_transactions for columnar exports
+        """
+        return self.stream_batches(self._generate_transaction_sql(analysis_type), batch_size)
+    
+    def stream_batches(self, query: str, batch_size: int = 10000,
+                       params: tuple = None) -> Iterator[Tuple[List[Tuple[str, str]], List[tuple]]]:
+        """
+        Execute SQL on an unbuffered tuple cursor and yield (fields, rows)
+        batches, fields being (name, kind) pairs from the cursor description
+        (see FIELD_KINDS). No dicts are built, and an empty result still
+        yields its fields once. Errors are raised rather than returned as an
+        error row, since a binary export has nowhere to put one.
+        """
+        conn = self.pool.acquire()
+        finished = False
+        try:
+            cursor = conn.raw.cursor(buffered=False)
+            cursor.execute(query, params)
+            fields = [(column[0], FIELD_KINDS.get(column[1], "auto")) for column in cursor.description]
+            rows = cursor.fetchmany(batch_size)
+            yield fields, rows
+            while rows:
+                rows = cursor.fetchmany(batch_size)
+                if rows:
+                    yield fields, rows
+            cursor.close()
+            finished = True
+        finally:
+            self.pool.release(conn, discard=not finished)
+    
     def _extract_number(self, text: str) -> int:
         """Extract number from text"""
         import re
@@ -205,14 +304,13 @@ def run_sql_query(sql_query: str) -> list:
         if not sql_query.strip().lower().startswith("select"):
             return {"error": "Only SELECT queries are allowed."}
 
-        connection = mysql.connector.connect(**MYSQL_CONFIG)
-        cursor = connection.cursor(dictionary=True)
+        with get_pool(MYSQL_CONFIG).connection() as connection:
+            cursor = connection.cursor(dictionary=True)
 
-        cursor.execute(sql_query)
-        results = cursor.fetchall()
+            cursor.execute(sql_query)
+            results = cursor.fetchall()
 
-        cursor.close()
-        connection.close()
+            cursor.close()
 
         return results
     except Exception as e:
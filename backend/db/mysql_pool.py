@@ -0,0 +1,224 @@
+"""
+Process-wide MySQL connection pool.
+
+Keeps up to `pool_size` idle connections, allows `max_overflow` extra
+connections under load, checks connections before handing them out and
+recycles them after a number of uses or an age limit.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from settings import get_settings
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the timeout"""
+
+
+def _mysql_connect(**config):
+    import mysql.connector
+    return mysql.connector.connect(**config)
+
+
+class _PooledConnection:
+    """Book-keeping for a raw connection owned by the pool"""
+
+    __slots__ = ("raw", "created_at", "uses")
+
+    def __init__(self, raw: Any, created_at: float):
+        self.raw = raw
+        self.created_at = created_at
+        self.uses = 0
+
+
+class MySQLConnectionPool:
+    """
+    Thread-safe connection pool with overflow, pre-ping and recycling.
+
+    `connect` is the connection factory (defaults to mysql.connector.connect)
+    and is called with the pool config as keyword arguments. Any object with
+    `is_connected()`, `rollback()` and `close()` can be pooled.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        pool_size: int = 5,
+        max_overflow: int = 5,
+        recycle_uses: int = 1000,
+        recycle_seconds: float = 3600.0,
+        timeout: float = 30.0,
+        connect: Optional[Callable[..., Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config = dict(config)
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.recycle_uses = recycle_uses
+        self.recycle_seconds = recycle_seconds
+        self.timeout = timeout
+        self._connect = connect or _mysql_connect
+        self._clock = clock
+        self._idle: List[_PooledConnection] = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self.created = 0
+        self.recycled = 0
+        self.failed_checks = 0
+
+    def _is_stale(self, conn: _PooledConnection) -> bool:
+        if self.recycle_uses and conn.uses >= self.recycle_uses:
+            return True
+        if self.recycle_seconds and self._clock() - conn.created_at >= self.recycle_seconds:
+            return True
+        return False
+
+    def _close(self, conn: _PooledConnection) -> None:
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn: _PooledConnection) -> bool:
+        try:
+            return bool(conn.raw.is_connected())
+        except Exception:
+            return False
+
+    def acquire(self) -> _PooledConnection:
+        """Check out a healthy connection, opening one if allowed"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.pool_size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No MySQL connection available within {self.timeout}s"
+                        )
+                    self._cond.wait(remaining)
+
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    # Reserve the slot before connecting outside the lock
+                    self._open += 1
+
+            if conn is None:
+                try:
+                    raw = self._connect(**self.config)
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self.created += 1
+                conn = _PooledConnection(raw, self._clock())
+                conn.uses += 1
+                return conn
+
+            if self._is_stale(conn):
+                self._discard(conn, counter="recycled")
+                continue
+            if not self._healthy(conn):
+                self._discard(conn, counter="failed_checks")
+                continue
+
+            conn.uses += 1
+            return conn
+
+    def _discard(self, conn: _PooledConnection, counter: Optional[str] = None) -> None:
+        self._close(conn)
+        with self._cond:
+            self._open -= 1
+            if counter:
+                # Counters change under the lock; pool users run on many threads
+                setattr(self, counter, getattr(self, counter) + 1)
+            self._cond.notify()
+
+    def release(self, conn: _PooledConnection, discard: bool = False) -> None:
+        """Return a connection; overflow and broken connections are closed"""
+        if not discard:
+            try:
+                # End any open transaction so the next user gets a fresh snapshot
+                conn.raw.rollback()
+            except Exception:
+                discard = True
+
+        if discard or self._is_stale(conn):
+            self._discard(conn, counter=None if discard else "recycled")
+            return
+
+        with self._cond:
+            if len(self._idle) >= self.pool_size:
+                overflow = True
+            else:
+                overflow = False
+                self._idle.append(conn)
+                self._cond.notify()
+        if overflow:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a raw connection from the pool"""
+        conn = self.acquire()
+        failed = False
+        try:
+            yield conn.raw
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(conn, discard=failed and not self._healthy(conn))
+
+    def dispose(self) -> None:
+        """Close every idle connection"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "created": self.created,
+                "recycled": self.recycled,
+                "failed_checks": self.failed_checks,
+            }
+
+
+_pools: Dict[tuple, MySQLConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config: Dict[str, Any], **overrides) -> MySQLConnectionPool:
+    """
+    Return the process-wide pool for a connection config, creating it on
+    first use. Sizing comes from the MYSQL_POOL_* settings unless
+    overridden.
+    """
+    key = tuple(sorted((k, str(v)) for k, v in config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            settings = get_settings()
+            options = {
+                "pool_size": settings.mysql_pool_size,
+                "max_overflow": settings.mysql_pool_max_overflow,
+                "recycle_uses": settings.mysql_pool_recycle_uses,
+                "recycle_seconds": settings.mysql_pool_recycle_seconds,
+                "timeout": settings.mysql_pool_timeout,
+            }
+            options.update(overrides)
+            pool = MySQLConnectionPool(config, **options)
+            _pools[key] = pool
+        return pool
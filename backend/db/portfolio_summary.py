@@ -0,0 +1,136 @@
+"""
+Portfolio summary engine.
+
+Computes the book-level aggregates (total AUM, distinct clients, average
+holding, holding count) in a single scan and fetches the top-N asset types
+in the same round trip, returning a typed PortfolioSummary.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+SCALAR_SQL = """
+    SELECT
+        SUM(amount) AS total_aum,
+        COUNT(DISTINCT client_id) AS client_count,
+        AVG(amount) AS avg_portfolio,
+        COUNT(*) AS holding_count
+    FROM portfolios
+"""
+
+TOP_ASSETS_SQL = """
+    SELECT asset_type, SUM(amount) AS total_amount
+    FROM portfolios
+    GROUP BY asset_type
+    ORDER BY total_amount DESC
+    LIMIT {top_n}
+"""
+
+# Scalars and the top-N breakdown in one statement: the scalar row is
+# repeated on each asset row, and a LEFT JOIN keeps it for an empty book
+COMBINED_SQL = """
+    SELECT
+        s.total_aum, s.client_count, s.avg_portfolio, s.holding_count,
+        a.asset_type, a.total_amount
+    FROM ({scalar_sql}) s
+    LEFT JOIN ({top_assets_sql}) a ON 1 = 1
+    ORDER BY a.total_amount DESC
+"""
+
+
+@dataclass
+class AssetTotal:
+    asset_type: str
+    total_amount: float
+
+
+@dataclass
+class PortfolioSummary:
+    total_aum: float = 0.0
+    client_count: int = 0
+    avg_portfolio: float = 0.0
+    holding_count: int = 0
+    top_assets: List[AssetTotal] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _number(value: Any, cast=float):
+    return cast(value) if value is not None else cast(0)
+
+
+def check_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # The tools report SQL failures as a single {"error": ...} row
+    if rows and "error" in rows[0]:
+        raise RuntimeError(rows[0]["error"])
+    return rows
+
+
+class PortfolioSummaryEngine:
+    """
+    Builds a PortfolioSummary through an `execute(sql) -> rows` callable.
+
+    By default everything comes back in one round trip. With `parallel=True`
+    the scalar and top-N queries run as separate statements on two
+    connections at the same time, for servers where the combined form plans
+    badly.
+    """
+
+    def __init__(self, execute: Callable[[str], List[Dict[str, Any]]], top_n: int = 5):
+        self.execute = execute
+        self.top_n = int(top_n)
+
+    def combined_sql(self) -> str:
+        return COMBINED_SQL.format(
+            scalar_sql=SCALAR_SQL,
+            top_assets_sql=TOP_ASSETS_SQL.format(top_n=self.top_n)
+        )
+
+    def split_sql(self) -> Dict[str, str]:
+        return {
+            "scalars": SCALAR_SQL,
+            "top_assets": TOP_ASSETS_SQL.format(top_n=self.top_n),
+        }
+
+    def run(self, parallel: bool = False, executor: Optional[ThreadPoolExecutor] = None) -> PortfolioSummary:
+        if not parallel:
+            return self.from_combined_rows(check_rows(self.execute(self.combined_sql())))
+
+        queries = self.split_sql()
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+                results = dict(zip(queries, pool.map(self.execute, queries.values())))
+        else:
+            results = dict(zip(queries, executor.map(self.execute, queries.values())))
+        return self.from_split_rows(check_rows(results["scalars"]), check_rows(results["top_assets"]))
+
+    @staticmethod
+    def from_combined_rows(rows: List[Dict[str, Any]]) -> PortfolioSummary:
+        if not rows:
+            return PortfolioSummary()
+        summary = PortfolioSummaryEngine._scalars(rows[0])
+        summary.top_assets = [
+            AssetTotal(row["asset_type"], _number(row["total_amount"]))
+            for row in rows if row.get("asset_type") is not None
+        ]
+        return summary
+
+    @staticmethod
+    def from_split_rows(scalar_rows: List[Dict[str, Any]],
+                        asset_rows: List[Dict[str, Any]]) -> PortfolioSummary:
+        summary = PortfolioSummaryEngine._scalars(scalar_rows[0]) if scalar_rows else PortfolioSummary()
+        summary.top_assets = [
+            AssetTotal(row["asset_type"], _number(row["total_amount"]))
+            for row in asset_rows
+        ]
+        return summary
+
+    @staticmethod
+    def _scalars(row: Dict[str, Any]) -> PortfolioSummary:
+        return PortfolioSummary(
+            total_aum=_number(row.get("total_aum")),
+            client_count=_number(row.get("client_count"), int),
+            avg_portfolio=_number(row.get("avg_portfolio")),
+            holding_count=_number(row.get("holding_count"), int),
+        )
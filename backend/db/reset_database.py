@@ -2,10 +2,16 @@
 Script to completely reset the MySQL database if needed
 """
 import os
-from dotenv import load_dotenv
+import sys
+
+if __name__ == "__main__":
+    # Run as a script (python db/reset_database.py): make backend/ importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import mysql.connector
+from settings import get_settings
 
-load_dotenv()
+settings = get_settings()
 
 def reset_mysql_database():
     """
@@ -14,14 +20,14 @@ def reset_mysql_database():
     try:
         # Connect without specifying database
         connection = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST"),
-            user=os.getenv("MYSQL_USER"),
-            password=os.getenv("MYSQL_PASSWORD")
+            host=settings.mysql_host,
+            user=settings.mysql_user,
+            password=settings.mysql_password
         )
         cursor = connection.cursor()
 
         # Drop and recreate database
-        db_name = os.getenv("MYSQL_DB")
+        db_name = settings.mysql_db
         cursor.execute(f"DROP DATABASE IF EXISTS {db_name}")
         cursor.execute(f"CREATE DATABASE {db_name}")
         
@@ -0,0 +1,191 @@
+"""
+Incrementally maintained aggregate rollups for the dashboard charts.
+
+Keeps three group-bys in memory:
+- AUM per relationship manager (keyed the same way as get_rm_analytics)
+- allocation per asset type (the top_assets breakdown)
+- transaction volume per (asset type, transaction type)
+
+`rebuild()` computes them with one GROUP BY scan each and records the
+highest transaction id as a watermark, all inside one consistent-snapshot
+transaction. `refresh()` then folds in only the transactions above the
+watermark, so reads cost O(groups) and updates cost O(new transactions).
+
+Only transactions are folded in. Direct edits to portfolios or
+relationship managers, and transactions committed out of id order, are
+picked up by the next full rebuild, which `refresh()` runs once the last
+one is `rebuild_seconds` old; until then those rollups are stale.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from db.portfolio_summary import check_rows
+
+# Transaction types that add to holdings; anything else (e.g. "Sell") reduces them
+INFLOW_TYPES = {"buy"}
+
+
+class RollupStore:
+    """In-memory rollups over portfolios and transactions with an id watermark"""
+
+    def __init__(self, mysql_tool, batch_size: int = 5000, rebuild_seconds: Optional[float] = None):
+        self.tool = mysql_tool
+        self.batch_size = batch_size
+        self.rebuild_seconds = rebuild_seconds
+        self.watermark = 0
+        self.built_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._rm_names: Dict[Any, str] = {}
+        self._aum_by_rm: Dict[str, float] = defaultdict(float)
+        self._allocation: Dict[str, float] = defaultdict(float)
+        self._volume: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+
+    def _query(self, sql: str, params: tuple = None, cursor=None) -> List[Dict[str, Any]]:
+        if cursor is None:
+            return check_rows(self.tool._execute_sql(sql, params))
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+    @contextmanager
+    def _snapshot(self):
+        """Dictionary cursor inside START TRANSACTION WITH CONSISTENT SNAPSHOT"""
+        with self.tool.pool.connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                yield cursor
+            finally:
+                # Releasing the connection rolls the read-only transaction back
+                cursor.close()
+
+    def rebuild(self) -> None:
+        """Full rebuild from the base tables"""
+        # The watermark and every scan read one snapshot, so a transaction
+        # committed meanwhile is either in the scans and below the
+        # watermark, or in neither and left to refresh()
+        with self._snapshot() as cursor:
+            self._scan(cursor)
+
+    def _scan(self, cursor) -> None:
+        watermark_rows = self._query("SELECT COALESCE(MAX(id), 0) AS watermark FROM transactions", cursor=cursor)
+        watermark = int(watermark_rows[0]["watermark"]) if watermark_rows else 0
+
+        rm_names = {
+            row["id"]: row["manager_name"]
+            for row in self._query("SELECT id, manager_name FROM relationship_managers", cursor=cursor)
+        }
+
+        aum_by_rm = defaultdict(float)
+        for row in self._query("""
+            SELECT client_id, SUM(amount) AS total_amount
+            FROM portfolios
+            GROUP BY client_id
+        """, cursor=cursor):
+            rm_name = rm_names.get(row["client_id"])
+            if rm_name is not None:
+                aum_by_rm[rm_name] += float(row["total_amount"] or 0)
+
+        allocation = defaultdict(float)
+        for row in self._query("""
+            SELECT asset_type, SUM(amount) AS total_amount
+            FROM portfolios
+            GROUP BY asset_type
+        """, cursor=cursor):
+            allocation[row["asset_type"]] = float(row["total_amount"] or 0)
+
+        volume = defaultdict(lambda: [0, 0.0])
+        for row in self._query("""
+            SELECT asset_type, transaction_type, COUNT(*) AS transaction_count, SUM(amount) AS total_amount
+            FROM transactions
+            WHERE id <= %s
+            GROUP BY asset_type, transaction_type
+        """, (watermark,), cursor=cursor):
+            volume[(row["asset_type"], row["transaction_type"])] = [
+                int(row["transaction_count"]), float(row["total_amount"] or 0)
+            ]
+
+        with self._lock:
+            self._rm_names = rm_names
+            self._aum_by_rm = aum_by_rm
+            self._allocation = allocation
+            self._volume = volume
+            self.watermark = watermark
+            self.built_at = self.refreshed_at = time.time()
+
+    def refresh(self) -> int:
+        """Apply transactions above the watermark; returns how many were applied"""
+        with self._refresh_lock:
+            if self.built_at is None or (
+                    self.rebuild_seconds and time.time() - self.built_at >= self.rebuild_seconds):
+                self.rebuild()
+                return 0
+            return self._apply_new_transactions()
+
+    def _apply_new_transactions(self) -> int:
+        applied = 0
+        while True:
+            rows = self._query("""
+                SELECT id, client_id, transaction_type, amount, asset_type
+                FROM transactions
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (self.watermark, self.batch_size))
+            if not rows:
+                break
+            with self._lock:
+                for row in rows:
+                    self._apply(row)
+                self.watermark = int(rows[-1]["id"])
+            applied += len(rows)
+            if len(rows) < self.batch_size:
+                break
+
+        self.refreshed_at = time.time()
+        return applied
+
+    def _apply(self, row: Dict[str, Any]) -> None:
+        amount = float(row["amount"] or 0)
+        signed = amount if str(row["transaction_type"]).lower() in INFLOW_TYPES else -amount
+
+        self._allocation[row["asset_type"]] += signed
+        rm_name = self._rm_names.get(row["client_id"])
+        if rm_name is not None:
+            self._aum_by_rm[rm_name] += signed
+
+        bucket = self._volume[(row["asset_type"], row["transaction_type"])]
+        bucket[0] += 1
+        bucket[1] += amount
+
+    def refresh_if_stale(self, max_age_seconds: float) -> None:
+        if self.refreshed_at is None or time.time() - self.refreshed_at >= max_age_seconds:
+            self.refresh()
+
+    def aum_by_rm(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._aum_by_rm.items(), key=lambda item: item[1], reverse=True)
+        return [{"label": name, "value": value} for name, value in items]
+
+    def allocation_by_asset(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._allocation.items(), key=lambda item: item[1], reverse=True)
+        return [{"label": asset, "value": value} for asset, value in items]
+
+    def transaction_volume(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._volume.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {
+                "asset_type": asset_type,
+                "transaction_type": transaction_type,
+                "transaction_count": count,
+                "total_amount": total,
+                "avg_amount": total / count if count else 0.0,
+            }
+            for (asset_type, transaction_type), (count, total) in items
+        ]
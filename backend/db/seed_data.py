@@ -1,10 +1,19 @@
 import os
-from dotenv import load_dotenv
+import sys
+
+if __name__ == "__main__":
+    # Run as a script (python db/seed_data.py): make backend/ importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from pymongo import MongoClient
 import mysql.connector
+from db.bulk_load import insert_rows, upsert_documents
+from db.mongo_connect import add_search_fields
+from settings import get_settings
+
+settings = get_settings()
 
-# ✅ Load environment variables
-load_dotenv()
+TRANSACTION_COLUMNS = ["id", "client_id", "transaction_type", "amount", "asset_type", "stock_symbol", "transaction_date"]
 
 def get_table_columns(cursor, table_name):
     """
@@ -22,8 +31,8 @@ def seed_mongodb():
     Seed MongoDB with dummy client profiles.
     """
     try:
-        mongo_uri = os.getenv("MONGO_URI")
-        mongo_db = os.getenv("MONGO_DB")
+        mongo_uri = settings.mongo_uri
+        mongo_db = settings.mongo_db
 
         client = MongoClient(mongo_uri)
         db = client[mongo_db]
@@ -33,6 +42,7 @@ def seed_mongodb():
         dummy_clients = [
             {
                 "name": "John Doe", 
+                "client_id": 1,
                 "age": 35, 
                 "city": "Mumbai", 
                 "email": "john@example.com",
@@ -43,6 +53,7 @@ def seed_mongodb():
             },
             {
                 "name": "Jane Smith", 
+                "client_id": 2,
                 "age": 28, 
                 "city": "Delhi", 
                 "email": "jane@example.com",
@@ -53,6 +64,7 @@ def seed_mongodb():
             },
             {
                 "name": "Arjun Kapoor", 
+                "client_id": 3,
                 "age": 42, 
                 "city": "Bangalore", 
                 "email": "arjun@example.com",
@@ -63,6 +75,7 @@ def seed_mongodb():
             },
             {
                 "name": "Meera Singh", 
+                "client_id": 4,
                 "age": 30, 
                 "city": "Pune", 
                 "email": "meera@example.com",
@@ -73,6 +86,7 @@ def seed_mongodb():
             },
             {
                 "name": "Rajesh Kumar", 
+                "client_id": 5,
                 "age": 45, 
                 "city": "Chennai", 
                 "email": "rajesh@example.com",
@@ -83,13 +97,9 @@ def seed_mongodb():
             }
         ]
 
-        # ✅ Insert only if the client does not already exist
-        for client_profile in dummy_clients:
-            if not collection.find_one({"name": client_profile["name"]}):
-                collection.insert_one(client_profile)
-                print(f"✅ Inserted: {client_profile['name']}")
-            else:
-                print(f"⚠️ Skipped (already exists): {client_profile['name']}")
+        # ✅ Insert only the clients that do not already exist, in one round trip
+        counts = upsert_documents(collection, [add_search_fields(profile) for profile in dummy_clients], key="name")
+        print(f"✅ Inserted {counts['inserted']} clients, skipped {counts['matched']} existing")
 
         print("✅ MongoDB seeding complete.")
         client.close()
@@ -103,10 +113,10 @@ def seed_mysql():
     """
     try:
         mysql_config = {
-            "host": os.getenv("MYSQL_HOST"),
-            "user": os.getenv("MYSQL_USER"),
-            "password": os.getenv("MYSQL_PASSWORD"),
-            "database": os.getenv("MYSQL_DB"),
+            "host": settings.mysql_host,
+            "user": settings.mysql_user,
+            "password": settings.mysql_password,
+            "database": settings.mysql_db,
         }
 
         connection = mysql.connector.connect(**mysql_config)
@@ -137,21 +147,15 @@ def seed_mysql():
                     (3, "Rohit Singh", 200000.00),
                 ]
                 
-                for rm in rm_data:
-                    try:
-                        if 'portfolio_value' in rm_columns:
-                            cursor.execute("""
-                            INSERT INTO relationship_managers (id, manager_name, portfolio_value)
-                            VALUES (%s, %s, %s)
-                            """, rm)
-                        else:
-                            cursor.execute("""
-                            INSERT INTO relationship_managers (id, manager_name)
-                            VALUES (%s, %s)
-                            """, (rm[0], rm[1]))
-                        print(f"✅ Inserted RM: {rm[1]} (ID: {rm[0]})")
-                    except Exception as e:
-                        print(f"⚠️ Could not insert RM {rm[1]}: {e}")
+                try:
+                    if 'portfolio_value' in rm_columns:
+                        count = insert_rows(cursor, "relationship_managers", ["id", "manager_name", "portfolio_value"], rm_data)
+                    else:
+                        count = insert_rows(cursor, "relationship_managers", ["id", "manager_name"],
+                                            [(rm[0], rm[1]) for rm in rm_data])
+                    print(f"✅ Inserted {count} RMs")
+                except Exception as e:
+                    print(f"⚠️ Could not insert RMs: {e}")
 
         # 📊 Handle clients table (if it exists)
         if 'clients' in existing_tables:
@@ -170,16 +174,12 @@ def seed_mysql():
                 (5, "Rajesh Kumar", "Chennai", "rajesh@example.com", 2),
             ]
             
-            for client in clients_data:
-                try:
-                    if 'name' in clients_columns and 'city' in clients_columns:
-                        cursor.execute("""
-                        INSERT INTO clients (id, name, city, email, manager_id)
-                        VALUES (%s, %s, %s, %s, %s)
-                        """, client)
-                        print(f"✅ Inserted client: {client[1]}")
-                except Exception as e:
-                    print(f"⚠️ Could not insert client {client[1]}: {e}")
+            try:
+                if 'name' in clients_columns and 'city' in clients_columns:
+                    count = insert_rows(cursor, "clients", ["id", "name", "city", "email", "manager_id"], clients_data)
+                    print(f"✅ Inserted {count} clients")
+            except Exception as e:
+                print(f"⚠️ Could not insert clients: {e}")
 
         # 📊 Handle portfolios table
         if 'portfolios' in existing_tables:
@@ -201,25 +201,22 @@ def seed_mysql():
                 (8, 5, "Stocks", 600000.00, "INFOSYS"),
             ]
             
-            for portfolio in portfolio_data:
-                try:
-                    # Adapt based on your column structure
-                    if 'client_id' in portfolio_columns and 'asset_type' in portfolio_columns:
-                        cursor.execute("""
-                        INSERT INTO portfolios (id, client_id, asset_type, amount, stock_symbol)
-                        VALUES (%s, %s, %s, %s, %s)
-                        """, portfolio)
-                        print(f"✅ Inserted portfolio: Client {portfolio[1]} - {portfolio[2]}")
-                    elif 'client_name' in portfolio_columns:
-                        # If it uses client_name instead
-                        client_names = ["John Doe", "John Doe", "Jane Smith", "Jane Smith", "Arjun Kapoor", "Arjun Kapoor", "Meera Singh", "Rajesh Kumar"]
-                        cursor.execute("""
-                        INSERT INTO portfolios (client_name, asset_type, amount, stock_symbol)
-                        VALUES (%s, %s, %s, %s)
-                        """, (client_names[portfolio[0]-1], portfolio[2], portfolio[3], portfolio[4]))
-                        print(f"✅ Inserted portfolio: {client_names[portfolio[0]-1]} - {portfolio[2]}")
-                except Exception as e:
-                    print(f"⚠️ Could not insert portfolio: {e}")
+            try:
+                # Adapt based on your column structure
+                if 'client_id' in portfolio_columns and 'asset_type' in portfolio_columns:
+                    count = insert_rows(cursor, "portfolios", ["id", "client_id", "asset_type", "amount", "stock_symbol"],
+                                        portfolio_data)
+                    print(f"✅ Inserted {count} portfolios")
+                elif 'client_name' in portfolio_columns:
+                    # If it uses client_name instead
+                    client_names = ["John Doe", "John Doe", "Jane Smith", "Jane Smith", "Arjun Kapoor", "Arjun Kapoor", "Meera Singh", "Rajesh Kumar"]
+                    count = insert_rows(cursor, "portfolios", ["client_name", "asset_type", "amount", "stock_symbol"], [
+                        (client_names[portfolio[0]-1], portfolio[2], portfolio[3], portfolio[4])
+                        for portfolio in portfolio_data
+                    ])
+                    print(f"✅ Inserted {count} portfolios")
+            except Exception as e:
+                print(f"⚠️ Could not insert portfolios: {e}")
 
         # 📊 Handle holdings table
         if 'holdings' in existing_tables:
@@ -239,16 +236,13 @@ def seed_mysql():
                 (6, 5, "INFOSYS", 1200, 533.33),
             ]
             
-            for holding in holdings_data:
-                try:
-                    if 'client_id' in holdings_columns and 'symbol' in holdings_columns:
-                        cursor.execute("""
-                        INSERT INTO holdings (id, client_id, symbol, quantity, current_price)
-                        VALUES (%s, %s, %s, %s, %s)
-                        """, holding)
-                        print(f"✅ Inserted holding: Client {holding[1]} - {holding[2]}")
-                except Exception as e:
-                    print(f"⚠️ Could not insert holding: {e}")
+            try:
+                if 'client_id' in holdings_columns and 'symbol' in holdings_columns:
+                    count = insert_rows(cursor, "holdings", ["id", "client_id", "symbol", "quantity", "current_price"],
+                                        holdings_data)
+                    print(f"✅ Inserted {count} holdings")
+            except Exception as e:
+                print(f"⚠️ Could not insert holdings: {e}")
 
         # 📊 Handle transactions table
         if 'transactions' in existing_tables:
@@ -264,16 +258,12 @@ def seed_mysql():
                 (5, 5, "Buy", 600000.00, "Stocks", "INFOSYS", "2024-01-05"),
             ]
             
-            for txn in transaction_data:
-                try:
-                    if 'client_id' in transaction_columns:
-                        cursor.execute("""
-                        INSERT INTO transactions (id, client_id, transaction_type, amount, asset_type, stock_symbol, transaction_date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """, txn)
-                        print(f"✅ Inserted transaction: Client {txn[1]} - {txn[2]}")
-                except Exception as e:
-                    print(f"⚠️ Could not insert transaction: {e}")
+            try:
+                if 'client_id' in transaction_columns:
+                    count = insert_rows(cursor, "transactions", TRANSACTION_COLUMNS, transaction_data)
+                    print(f"✅ Inserted {count} transactions")
+            except Exception as e:
+                print(f"⚠️ Could not insert transactions: {e}")
 
         # 🛡️ Re-enable foreign key checks
         cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
@@ -0,0 +1,76 @@
+"""
+Local text embeddings.
+
+A hashing vectorizer over character n-grams: every n-gram of the padded
+text is hashed into one of `dim` buckets with a hash-derived sign, and the
+resulting vector is L2-normalised so a dot product is a cosine similarity.
+No vocabulary, no model files and no network access; the same text always
+maps to the same vector in every process.
+"""
+import re
+import zlib
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Conversational filler that changes the wording but not the question
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "me", "my", "us", "our", "please", "pls", "show",
+    "give", "get", "tell", "can", "could", "would", "you", "i", "want",
+    "to", "see", "of", "for", "what", "are", "is", "which", "kindly",
+})
+
+
+def clean_text(text: str, drop_filler: bool = True) -> str:
+    """Lowercase, strip punctuation and (optionally) filler words"""
+    text = _WHITESPACE.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+    if not drop_filler:
+        return text
+    words = [word for word in text.split(" ") if word not in FILLER_WORDS]
+    return " ".join(words) or text
+
+
+class HashingVectorizer:
+    """
+    Character n-gram hashing embedder producing float32 unit vectors.
+
+    `dim` should be a power of two so bucket selection is a mask.
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: Sequence[int] = (3, 5), drop_filler: bool = True):
+        if dim <= 0 or dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.dim = dim
+        self.ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
+        self.drop_filler = drop_filler
+        self._mask = dim - 1
+
+    def _ngrams(self, text: str) -> List[bytes]:
+        padded = f" {clean_text(text, self.drop_filler)} ".encode("utf-8")
+        low, high = self.ngram_range
+        return [
+            padded[start:start + n]
+            for n in range(low, high + 1)
+            for start in range(0, max(len(padded) - n + 1, 0))
+        ]
+
+    def transform_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for gram in self._ngrams(text):
+            # crc32 rather than hash() so vectors are stable across processes
+            h = zlib.crc32(gram)
+            vector[h & self._mask] += 1.0 if h & 0x80000000 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        """Stack of unit vectors, one row per text"""
+        rows = [self.transform_one(text) for text in texts]
+        if not rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack(rows)
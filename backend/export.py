@@ -0,0 +1,161 @@
+"""
+Columnar exports of query results for notebooks.
+
+Result sets arrive from the database cursor as batches of row tuples and
+are written out chunk by chunk as Arrow IPC stream record batches or
+Parquet row groups, so an extract of any size is held in memory one batch
+(or row group) at a time and loads on the client without JSON parsing:
+
+    pyarrow.ipc.open_stream(body).read_all()
+    pandas.read_parquet(io.BytesIO(body))
+
+pyarrow is imported on first use; an ImportError surfaces from the first
+chunk when it is not installed.
+"""
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Export format -> (media type, file extension)
+FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+PARQUET_ROW_GROUP_ROWS = 131072
+PARQUET_COMPRESSION = "zstd"
+
+Fields = List[Tuple[str, str]]
+Batches = Iterable[Tuple[Fields, Sequence[tuple]]]
+
+
+def _arrow_type(pa, kind: str):
+    """Arrow type for a FIELD_KINDS kind, or None to infer from the values"""
+    return {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "decimal": pa.float64(),
+        "string": pa.string(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us"),
+    }.get(kind)
+
+
+def _column_array(pa, values: Sequence[Any], kind: str, arrow_type=None):
+    if kind == "decimal":
+        # Decimals convert to Arrow decimals natively; analysts want floats
+        return pa.array(values).cast(pa.float64())
+    arrow_type = arrow_type or _arrow_type(pa, kind)
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if arrow_type is None:
+            raise
+    # The schema is fixed by the first batch, so later values that do not
+    # fit (e.g. an "auto" column that was all null there) are coerced to it
+    # rather than failing after the response has started
+    if pa.types.is_string(arrow_type):
+        return pa.array([_as_text(value) for value in values], type=arrow_type)
+    return pa.array(values).cast(arrow_type)
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", "replace")
+    return str(value)
+
+
+def record_batches(batches: Batches) -> Iterator[Any]:
+    """
+    Arrow record batches from (fields, row tuples) batches. The schema is
+    fixed by the first batch: typed from the field kinds, inferred for
+    "auto" columns (a column that is all null there becomes a string).
+    """
+    import pyarrow as pa
+
+    schema = None
+    for fields, rows in batches:
+        columns = list(zip(*rows)) if rows else [()] * len(fields)
+        if schema is None:
+            arrays = [_column_array(pa, column, kind) for column, (_, kind) in zip(columns, fields)]
+            arrays = [array.cast(pa.string()) if pa.types.is_null(array.type) else array for array in arrays]
+            schema = pa.schema([(name, array.type) for (name, _), array in zip(fields, arrays)])
+        else:
+            arrays = [_column_array(pa, column, kind, field.type)
+                      for column, (_, kind), field in zip(columns, fields, schema)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object that hands the writers' output back as chunks"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def arrow_stream(batches: Batches) -> Iterator[bytes]:
+    """Arrow IPC stream: schema message, then one chunk per record batch"""
+    import pyarrow as pa
+
+    sink = _ChunkSink()
+    writer = None
+    for batch in record_batches(batches):
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        yield sink.take()
+    if writer is not None:
+        writer.close()
+        yield sink.take()
+
+
+def parquet_stream(batches: Batches, row_group_rows: int = PARQUET_ROW_GROUP_ROWS) -> Iterator[bytes]:
+    """Parquet file written row group by row group; the footer goes out last"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    pending: List[Any] = []
+    pending_rows = 0
+
+    def flush_row_group():
+        writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+        pending.clear()
+
+    for batch in record_batches(batches):
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema, compression=PARQUET_COMPRESSION)
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= row_group_rows:
+            flush_row_group()
+            pending_rows = 0
+            yield sink.take()
+    if writer is not None:
+        if pending_rows:
+            flush_row_group()
+        writer.close()
+        yield sink.take()
+
+
+def export_stream(batches: Batches, fmt: str, row_group_rows: Optional[int] = None) -> Iterator[bytes]:
+    if fmt == "arrow":
+        return arrow_stream(batches)
+    if fmt == "parquet":
+        return parquet_stream(batches, row_group_rows or PARQUET_ROW_GROUP_ROWS)
+    raise ValueError(f"Unknown export format: {fmt}")
@@ -1,13 +1,98 @@
 import json
 import re
-from typing import Dict, Any, List, Union
-import pandas as pd
+from typing import Dict, Any, List, Optional, Union
+from intent_router import AhoCorasick
+
+# Every phrase a formatting decision looks at. A query is scanned once
+# against all of them and each decision tests bits of the resulting mask.
+CHART_KEYWORDS = (
+    "distribution", "breakdown", "allocation", "percentage", "proportion",
+    "trend", "growth", "comparison", "analysis", "share", "split",
+    "pie", "chart", "graph", "visual", "show me", "compare",
+    "across", "between", "among", "portfolio values per", "breakup"
+)
+STRONG_CHART_INDICATORS = (
+    "breakup of portfolio values", "distribution", "allocation across",
+    "breakdown", "percentage", "share of"
+)
+TABLE_KEYWORDS = (
+    "top", "list", "show me all", "which clients", "ranking",
+    "performance", "managers", "clients", "portfolios",
+    "highest", "lowest", "compare managers", "relationship managers"
+)
+AVOID_TABLE_KEYWORDS = ("breakup", "distribution", "allocation", "percentage")
+OTHER_PHRASES = (
+    "over time", "timeline", "relationship manager", "manager", "risk", "geographic",
+    "city", "why", "explain", "pattern", "strategy", "approach", "best", "vs", "versus",
+    "reason", "recommend", "suggest", "portfolio", "client", "mumbai", "profile", "stock"
+)
+
+FEATURE_PHRASES = tuple(dict.fromkeys(
+    CHART_KEYWORDS + STRONG_CHART_INDICATORS + TABLE_KEYWORDS + AVOID_TABLE_KEYWORDS + OTHER_PHRASES
+))
+_FEATURES = AhoCorasick(FEATURE_PHRASES)
+_BIT = {phrase: 1 << i for i, phrase in enumerate(FEATURE_PHRASES)}
+
+
+def feature_mask(*phrases: str) -> int:
+    mask = 0
+    for phrase in phrases:
+        mask |= _BIT[phrase]
+    return mask
+
+
+def extract_features(query: str) -> int:
+    """Bitset of the FEATURE_PHRASES present in a lowercased query"""
+    return _FEATURES.search_mask(query)
+
+
+CHART_MASK = feature_mask(*CHART_KEYWORDS)
+STRONG_CHART_MASK = feature_mask(*STRONG_CHART_INDICATORS, "breakup", "allocation")
+TABLE_MASK = feature_mask(*TABLE_KEYWORDS)
+AVOID_TABLE_MASK = feature_mask(*AVOID_TABLE_KEYWORDS)
+PIE_MASK = feature_mask("breakup", "distribution", "allocation", "share")
+LINE_MASK = feature_mask("trend", "growth", "over time", "timeline")
+RANKING_MASK = feature_mask("top", "highest", "best", "ranking")
+COMPARISON_MASK = feature_mask("compare", "comparison", "vs", "versus")
+TREND_MASK = feature_mask("trend", "growth", "pattern")
+EXPLANATION_MASK = feature_mask("why", "explain", "reason")
+STRATEGY_MASK = feature_mask("strategy", "recommend", "suggest")
+
+# Charts built from real result rows: query features, label column, value
+# column (None counts rows) and dataset label. Amounts are rupees, shown
+# in crores. The first entry whose features and columns match wins.
+CHART_GROUPINGS = (
+    (feature_mask("relationship manager", "manager"), "manager_name", "total_portfolio_value",
+     "Portfolio Distribution by RM (₹ Crores)"),
+    (feature_mask("stock"), "stock_symbol", "amount", "Holdings by Stock (₹ Crores)"),
+    (feature_mask("risk"), "risk_appetite", None, "Risk Appetite Distribution"),
+    (feature_mask("geographic", "city"), "city", None, "Clients by City"),
+    (feature_mask("allocation", "distribution", "breakdown", "breakup"), "asset_type", "amount",
+     "Asset Allocation (₹ Crores)"),
+)
+
+# Date and amount columns of transaction rows (raw, or the per-day rollup)
+# that trend queries draw as a line
+SERIES_COLUMNS = (("day", "total_amount"), ("transaction_date", "amount"))
+
+# Compiled once instead of on every response. The first two only test for
+# existence, so their `+` repeats are trimmed to one character (same
+# matches, no backtracking inside long words), and both need a "key: 123"
+# fragment, which a cheap literal-led search rules out first.
+NUMBERED_LIST_PATTERN = re.compile(r'\d\.\s+\w.*:\s*[\d,]')
+KEY_VALUE_PAIRS_PATTERN = re.compile(r'\w:\s*[\d,].*\w:\s*[\d,]')
+PIPE_TABLE_PATTERN = re.compile(r'\|\s*\w+\s*\|\s*\w+\s*\|')
+_COLON_NUMBER = re.compile(r':\s*[\d,]')
 
 class ResponseFormatter:
     """
     Enhanced formatter for diverse response types (text, tables, charts)
     """
     
+    def __init__(self, retriever=None):
+        # Optional retrieval.Retriever whose matches are appended to text answers
+        self.retriever = retriever
+    
     def format_response(self, agent_response: Dict[str, Any], original_query: str) -> Dict[str, Any]:
         """
         Format agent response based on content type and query intent
@@ -23,71 +108,45 @@ class ResponseFormatter:
         response_text = agent_response.get("response", "")
         query_lower = original_query.lower()
         
+        # One scan of the query; every decision below reads this bitset
+        features = extract_features(query_lower)
+        
         # Enhanced logic for response type determination
-        if self._should_be_chart(query_lower, response_text):
-            return self._format_as_chart(response_text, agent_response, query_lower)
-        elif self._should_be_table(query_lower, response_text):
-            return self._format_as_table(response_text, agent_response, query_lower)
+        if self._should_be_chart(features):
+            return self._format_as_chart(response_text, agent_response, query_lower, features)
+        elif self._should_be_table(features, response_text):
+            return self._format_as_table(response_text, agent_response, query_lower, features)
         else:
-            return self._format_as_text(response_text, agent_response, query_lower)
+            return self._format_as_text(response_text, agent_response, query_lower, features)
     
-    def _should_be_chart(self, query: str, response: str) -> bool:
+    def _should_be_chart(self, features: int) -> bool:
         """Enhanced chart detection logic"""
         
-        chart_keywords = [
-            "distribution", "breakdown", "allocation", "percentage", "proportion",
-            "trend", "growth", "comparison", "analysis", "share", "split",
-            "pie", "chart", "graph", "visual", "show me", "compare",
-            "across", "between", "among", "portfolio values per", "breakup"
-        ]
-        
-        # Strong chart indicators
-        strong_chart_indicators = [
-            "breakup of portfolio values",
-            "distribution",
-            "allocation across",
-            "breakdown",
-            "percentage",
-            "share of"
-        ]
-        
-        # Check for strong indicators first
-        for indicator in strong_chart_indicators:
-            if indicator in query:
-                return True
-        
-        # Check for general chart keywords
-        chart_score = sum(1 for keyword in chart_keywords if keyword in query)
-        
-        return chart_score >= 2 or any(word in query for word in ["breakup", "distribution", "allocation"])
+        # Strong indicators alone are enough; otherwise two chart keywords
+        if features & STRONG_CHART_MASK:
+            return True
+        
+        return bin(features & CHART_MASK).count("1") >= 2
     
-    def _should_be_table(self, query: str, response: str) -> bool:
+    def _should_be_table(self, features: int, response: str) -> bool:
         """Enhanced table detection logic"""
         
-        table_keywords = [
-            "top", "list", "show me all", "which clients", "ranking",
-            "performance", "managers", "clients", "portfolios",
-            "highest", "lowest", "compare managers", "relationship managers"
-        ]
-        
         # Avoid tables for distribution/breakdown queries
-        avoid_table_keywords = ["breakup", "distribution", "allocation", "percentage"]
-        
-        if any(avoid in query for avoid in avoid_table_keywords):
+        if features & AVOID_TABLE_MASK:
             return False
         
-        return any(keyword in query for keyword in table_keywords) or \
-               self._contains_structured_data(response)
+        return bool(features & TABLE_MASK) or self._contains_structured_data(response)
     
-    def _format_as_chart(self, response: str, agent_response: Dict[str, Any], query: str) -> Dict[str, Any]:
+    def _format_as_chart(self, response: str, agent_response: Dict[str, Any], query: str,
+                         features: int) -> Dict[str, Any]:
         """Enhanced chart formatting with multiple chart types"""
         
         try:
             # Determine chart type based on query
-            chart_type = self._determine_chart_type(query)
+            chart_type = self._determine_chart_type(features)
             
             # Generate chart data based on query type
-            chart_data = self._generate_chart_data(query, response, chart_type)
+            chart_data = self._generate_chart_data(features, response, chart_type, agent_response.get("rows"))
             
             if chart_data:
                 return {
@@ -102,30 +161,41 @@ class ResponseFormatter:
                 }
             else:
                 # Fallback to text if chart generation fails
-                return self._format_as_text(response, agent_response, query)
+                return self._format_as_text(response, agent_response, query, features)
                 
         except Exception as e:
-            return self._format_as_text(response, agent_response, query)
+            return self._format_as_text(response, agent_response, query, features)
     
-    def _determine_chart_type(self, query: str) -> str:
+    def _determine_chart_type(self, features: int) -> str:
         """Determine the best chart type for the query"""
         
-        if any(word in query for word in ["breakup", "distribution", "allocation", "share"]):
+        if features & PIE_MASK:
             return "pie"
-        elif any(word in query for word in ["trend", "growth", "over time", "timeline"]):
+        elif features & LINE_MASK:
             return "line"
-        elif any(word in query for word in ["compare", "comparison", "vs", "versus"]):
-            return "bar"
         else:
-            return "bar"  # Default
+            return "bar"  # Default, including comparisons
     
-    def _generate_chart_data(self, query: str, response: str, chart_type: str) -> Dict[str, Any]:
+    def _generate_chart_data(self, features: int, response: str, chart_type: str,
+                             rows: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Generate chart data based on query context"""
         
-        query_lower = query.lower()
+        # Real rows from the agent's tools: grouped, bucketed and capped
+        if rows and "error" not in rows[0]:
+            if chart_type == "line":
+                for date_column, value_column in SERIES_COLUMNS:
+                    if date_column in rows[0] and value_column in rows[0]:
+                        from timeseries import series_chart
+                        return series_chart([row[date_column] for row in rows], [row[value_column] for row in rows],
+                                            "Transaction Volume (₹ Crores)", scale=1e-7)
+            for mask, label_column, value_column, label in CHART_GROUPINGS:
+                if features & mask and label_column in rows[0] and (value_column is None or value_column in rows[0]):
+                    from charts import shape_chart
+                    scale = 1e-7 if value_column else 1.0
+                    return shape_chart(chart_type, rows, label_column, value_column, label, scale=scale)
         
         # Portfolio breakup by relationship manager
-        if "breakup" in query_lower and "relationship manager" in query_lower:
+        if features & _BIT["breakup"] and features & _BIT["relationship manager"]:
             return {
                 "type": "pie",
                 "labels": ["Amit Sharma", "Priya Patel", "Rohit Singh"],
@@ -147,7 +217,7 @@ class ResponseFormatter:
             }
         
         # Asset allocation breakdown
-        elif "allocation" in query_lower or "distribution" in query_lower:
+        elif features & feature_mask("allocation", "distribution"):
             return {
                 "type": "pie",
                 "labels": ["Stocks", "Real Estate", "Mutual Funds", "Bonds", "Alternative Investments"],
@@ -166,7 +236,7 @@ class ResponseFormatter:
             }
         
         # Performance comparison
-        elif "performance" in query_lower and "manager" in query_lower:
+        elif features & _BIT["performance"] and features & _BIT["manager"]:
             return {
                 "type": "bar",
                 "labels": ["Amit Sharma", "Priya Patel", "Rohit Singh"],
@@ -186,7 +256,7 @@ class ResponseFormatter:
             }
         
         # Client risk appetite distribution
-        elif "risk" in query_lower and ("distribution" in query_lower or "breakdown" in query_lower):
+        elif features & _BIT["risk"] and features & feature_mask("distribution", "breakdown"):
             return {
                 "type": "doughnut",
                 "labels": ["High Risk", "Moderate Risk", "Conservative"],
@@ -203,7 +273,7 @@ class ResponseFormatter:
             }
         
         # Geographic distribution
-        elif "geographic" in query_lower or "city" in query_lower:
+        elif features & feature_mask("geographic", "city"):
             return {
                 "type": "bar",
                 "labels": ["Mumbai", "Delhi", "Chennai", "Bangalore", "Ahmedabad"],
@@ -235,29 +305,40 @@ class ResponseFormatter:
                 }]
             }
     
-    def _format_as_text(self, response: str, agent_response: Dict[str, Any], query: str) -> Dict[str, Any]:
+    def _format_as_text(self, response: str, agent_response: Dict[str, Any], query: str,
+                        features: int) -> Dict[str, Any]:
         """Enhanced text formatting with query-specific responses"""
         
         # Generate more contextual text responses
-        enhanced_response = self._enhance_text_response(response, query)
+        enhanced_response = self._enhance_text_response(response, features)
+        
+        metadata = {
+            "source": "langchain_agent",
+            "query_type": "analytical_text",
+            "has_intermediate_steps": bool(agent_response.get("intermediate_steps")),
+            "query_category": self._categorize_query(features)
+        }
+        
+        if self.retriever is not None:
+            documents = self.retriever.search(query, k=3, min_score=0.2)
+            if documents:
+                from retrieval import format_context
+                enhanced_response = f"{enhanced_response}\n\n{format_context(documents)}"
+                metadata["retrieved"] = [
+                    {"key": document["key"], "kind": document.get("kind"), "score": document["score"]}
+                    for document in documents
+                ]
         
         return {
             "type": "text",
             "data": enhanced_response,
-            "metadata": {
-                "source": "langchain_agent",
-                "query_type": "analytical_text",
-                "has_intermediate_steps": bool(agent_response.get("intermediate_steps")),
-                "query_category": self._categorize_query(query)
-            }
+            "metadata": metadata
         }
     
-    def _enhance_text_response(self, response: str, query: str) -> str:
+    def _enhance_text_response(self, response: str, features: int) -> str:
         """Enhance text responses with more detailed analysis"""
         
-        query_lower = query.lower()
-        
-        if "why" in query_lower or "explain" in query_lower:
+        if features & feature_mask("why", "explain"):
             return f"""
 **Analysis & Insights:**
 
@@ -275,7 +356,7 @@ class ResponseFormatter:
 • Enhanced communication between RMs and clients for better outcomes
             """.strip()
         
-        elif "trend" in query_lower or "pattern" in query_lower:
+        elif features & feature_mask("trend", "pattern"):
             return f"""
 **Market Trend Analysis:**
 
@@ -293,7 +374,7 @@ class ResponseFormatter:
 • Technology sector remains attractive for younger clients
             """.strip()
         
-        elif "strategy" in query_lower or "approach" in query_lower:
+        elif features & feature_mask("strategy", "approach"):
             return f"""
 **Strategic Recommendations:**
 
@@ -328,30 +409,29 @@ Our celebrity wealth management division handles portfolios exceeding ₹100 cro
 • Dedicated relationship management for high-net-worth clients
             """.strip()
     
-    def _categorize_query(self, query: str) -> str:
+    def _categorize_query(self, features: int) -> str:
         """Categorize the query type for metadata"""
         
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["top", "highest", "best", "ranking"]):
+        if features & RANKING_MASK:
             return "ranking_analysis"
-        elif any(word in query_lower for word in ["compare", "comparison", "vs", "versus"]):
+        elif features & COMPARISON_MASK:
             return "comparative_analysis"
-        elif any(word in query_lower for word in ["trend", "growth", "pattern"]):
+        elif features & TREND_MASK:
             return "trend_analysis"
-        elif any(word in query_lower for word in ["why", "explain", "reason"]):
+        elif features & EXPLANATION_MASK:
             return "explanatory_analysis"
-        elif any(word in query_lower for word in ["strategy", "recommend", "suggest"]):
+        elif features & STRATEGY_MASK:
             return "strategic_recommendation"
         else:
             return "general_inquiry"
     
-    def _format_as_table(self, response: str, agent_response: Dict[str, Any], query: str) -> Dict[str, Any]:
+    def _format_as_table(self, response: str, agent_response: Dict[str, Any], query: str,
+                         features: int) -> Dict[str, Any]:
         """Enhanced table formatting"""
         
         try:
             # Generate contextual table data
-            table_data = self._generate_table_data(query, response)
+            table_data = self._generate_table_data(features, response, agent_response.get("rows"))
             
             if table_data:
                 return {
@@ -361,22 +441,28 @@ Our celebrity wealth management division handles portfolios exceeding ₹100 cro
                         "source": "langchain_agent",
                         "query_type": "structured_data",
                         "record_count": len(table_data),
-                        "table_category": self._categorize_table(query)
+                        "table_category": self._categorize_table(features)
                     }
                 }
             else:
-                return self._format_as_text(response, agent_response, query)
+                return self._format_as_text(response, agent_response, query, features)
                 
         except Exception as e:
-            return self._format_as_text(response, agent_response, query)
+            return self._format_as_text(response, agent_response, query, features)
     
-    def _generate_table_data(self, query: str, response: str) -> List[Dict[str, Any]]:
+    def _generate_table_data(self, features: int, response: str,
+                             rows: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """Generate contextual table data based on query"""
         
-        query_lower = query.lower()
+        # Real rows from the agent's tools, shaped column-wise
+        if rows and "error" not in rows[0]:
+            from tables import TABLE_SPECS, build_table
+            spec = TABLE_SPECS.get(self._categorize_table(features))
+            if spec is not None:
+                return build_table(rows, spec)
         
         # Top portfolios
-        if "top" in query_lower and "portfolio" in query_lower:
+        if features & _BIT["top"] and features & _BIT["portfolio"]:
             return [
                 {"rank": 1, "client_name": "MS Dhoni", "portfolio_value": "₹156 Cr", "primary_asset": "Real Estate", "rm": "Rohit Singh"},
                 {"rank": 2, "client_name": "Shah Rukh Khan", "portfolio_value": "₹125 Cr", "primary_asset": "Stocks", "rm": "Amit Sharma"},
@@ -386,7 +472,7 @@ Our celebrity wealth management division handles portfolios exceeding ₹100 cro
             ]
         
         # Relationship managers
-        elif "relationship manager" in query_lower and "top" in query_lower:
+        elif features & _BIT["relationship manager"] and features & _BIT["top"]:
             return [
                 {"rank": 1, "rm_name": "Amit Sharma", "client_count": 25, "total_aum": "₹450 Cr", "avg_portfolio": "₹18 Cr", "performance_rating": "Excellent"},
                 {"rank": 2, "rm_name": "Priya Patel", "client_count": 18, "total_aum": "₹320 Cr", "avg_portfolio": "₹17.8 Cr", "performance_rating": "Very Good"},
@@ -394,7 +480,7 @@ Our celebrity wealth management division handles portfolios exceeding ₹100 cro
             ]
         
         # Client profiles
-        elif "client" in query_lower and ("mumbai" in query_lower or "profile" in query_lower):
+        elif features & _BIT["client"] and features & feature_mask("mumbai", "profile"):
             return [
                 {"name": "Shah Rukh Khan", "age": 58, "city": "Mumbai", "profession": "Film Actor", "risk_appetite": "Moderate", "portfolio_value": "₹125 Cr"},
                 {"name": "Deepika Padukone", "age": 38, "city": "Mumbai", "profession": "Film Actress", "risk_appetite": "Conservative", "portfolio_value": "₹87 Cr"},
@@ -403,7 +489,7 @@ Our celebrity wealth management division handles portfolios exceeding ₹100 cro
             ]
         
         # Stock holders
-        elif "stock" in query_lower and "highest" in query_lower:
+        elif features & _BIT["stock"] and features & _BIT["highest"]:
             return [
                 {"client_name": "Shah Rukh Khan", "stock_symbol": "RELIANCE", "holding_value": "₹50 Cr", "percentage_of_portfolio": "40%"},
                 {"client_name": "Virat Kohli", "stock_symbol": "TCS", "holding_value": "₹45 Cr", "percentage_of_portfolio": "46%"},
@@ -420,18 +506,16 @@ Our celebrity wealth management division handles portfolios exceeding ₹100 cro
                 {"metric": "Client Satisfaction", "value": "94%", "growth": "+2.1%", "status": "Outstanding"}
             ]
     
-    def _categorize_table(self, query: str) -> str:
+    def _categorize_table(self, features: int) -> str:
         """Categorize table type for metadata"""
         
-        query_lower = query.lower()
-        
-        if "portfolio" in query_lower:
+        if features & _BIT["portfolio"]:
             return "portfolio_ranking"
-        elif "manager" in query_lower:
+        elif features & _BIT["manager"]:
             return "rm_performance"
-        elif "client" in query_lower:
+        elif features & _BIT["client"]:
             return "client_profiles"
-        elif "stock" in query_lower:
+        elif features & _BIT["stock"]:
             return "stock_holdings"
         else:
             return "general_metrics"
@@ -439,10 +523,8 @@ Our celebrity wealth management division handles portfolios exceeding ₹100 cro
     def _contains_structured_data(self, response: str) -> bool:
         """Check if response contains structured data"""
         
-        patterns = [
-            r'\d+\.\s+\w+.*:\s*[\d,]+',
-            r'\w+:\s*[\d,]+.*\w+:\s*[\d,]+',
-            r'\|\s*\w+\s*\|\s*\w+\s*\|',
-        ]
-        
-        return any(re.search(pattern, response) for pattern in patterns)
+        if "|" in response and PIPE_TABLE_PATTERN.search(response):
+            return True
+        if not _COLON_NUMBER.search(response):
+            return False
+        return bool(NUMBERED_LIST_PATTERN.search(response) or KEY_VALUE_PAIRS_PATTERN.search(response))
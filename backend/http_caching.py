@@ -0,0 +1,121 @@
+"""
+Compression and cache validators for encoded JSON responses.
+
+The bodies /query serves are immutable bytes objects that the response
+cache hands out again and again, so the ETag and each compressed variant
+are computed once per body and kept in the `variants` dict the cache holds
+for that body's digest. They are dropped when the cache drops the body.
+"""
+import gzip
+from functools import lru_cache
+from typing import Any, MutableMapping, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from response_cache import body_digest
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Server preference when the client accepts several encodings equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Revalidate on every use; a matching ETag costs a 304 and no body
+CACHE_CONTROL = "no-cache"
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong validator for the identity representation of `body`"""
+    return '"' + body_digest(body) + '"'
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Encoded representations differ byte-wise, so each gets its own strong tag"""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison; any encoding variant of the same
+    body matches, since the client holds the same content
+    """
+    if not if_none_match:
+        return False
+    base = etag[1:-1]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        opaque = candidate.strip('"')
+        if opaque == base or any(opaque == f"{base}-{encoding}" for encoding in ENCODINGS):
+            return True
+    return False
+
+
+@lru_cache(maxsize=64)
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported content coding for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    ranked = [(weights.get(encoding, weights.get("*", 0.0)), -rank, encoding)
+              for rank, encoding in enumerate(ENCODINGS)]
+    weight, _, encoding = max(ranked)
+    return encoding if weight > 0 else None
+
+
+def encode_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def json_response(request: Request, body: bytes, min_size: int = 1024,
+                  conditional: bool = True, vary: str = "Accept-Encoding",
+                  variants: Optional[MutableMapping[str, Any]] = None) -> Response:
+    """
+    JSON response for an encoded body: compressed when the client accepts
+    it and the body is at least `min_size` bytes, tagged with a strong ETag,
+    and a bodiless 304 when `conditional` and If-None-Match already matches.
+    The ETag and compressed bytes are read from and stored in `variants`.
+    """
+    variants = {} if variants is None else variants
+    etag = variants.get("etag")
+    if etag is None:
+        etag = variants["etag"] = strong_etag(body)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if len(body) >= min_size else None
+    headers = {
+        "ETag": variant_etag(etag, encoding),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": vary,
+    }
+
+    if conditional and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        encoded = variants.get(encoding)
+        if encoded is None:
+            encoded = variants[encoding] = encode_body(body, encoding)
+        body = encoded
+    return Response(content=body, media_type="application/json", headers=headers)
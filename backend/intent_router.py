@@ -0,0 +1,191 @@
+"""
+Compiled intent router for natural language queries.
+
+All trigger phrases are compiled once into a single Aho-Corasick automaton,
+so classifying a query is one pass over its characters no matter how many
+intents are registered.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Category priority - lower rank wins. Mirrors the chart -> table -> text order
+# of the original keyword cascade.
+CATEGORY_PRIORITY = {"chart": 0, "table": 1, "text": 2}
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    A routable intent.
+
+    `requires` is a list of phrase groups: every group must have at least one
+    phrase present in the query (AND of ORs). An intent with no groups only
+    matches as its category fallback.
+    """
+    name: str
+    category: str
+    requires: Tuple[Tuple[str, ...], ...] = ()
+
+
+@dataclass
+class RouteResult:
+    """Outcome of routing a single query"""
+    intent: str
+    category: str
+    matched: List[str] = field(default_factory=list)
+
+
+class AhoCorasick:
+    """
+    Minimal Aho-Corasick automaton over characters.
+
+    `search` returns the ids of every pattern occurring anywhere in the text
+    (substring semantics, same as `pattern in text`).
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] = self._out[state] + (pattern_id,)
+
+        # Breadth-first pass to wire failure links and merge outputs
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+        self._out_mask = [sum(1 << pattern_id for pattern_id in set(out)) for out in self._out]
+
+    def search(self, text: str) -> set:
+        """Return the set of pattern ids found in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def search_mask(self, text: str) -> int:
+        """Bitset of the pattern ids found in text (bit i set for pattern i)"""
+        goto, fail, out_mask = self._goto, self._fail, self._out_mask
+        state = 0
+        mask = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            mask |= out_mask[state]
+        return mask
+
+
+class IntentRouter:
+    """
+    Routes a query to exactly one intent.
+
+    Categories may carry a gate: a list of phrases of which at least one must
+    appear before any intent in that category is considered. Within the
+    winning category, intents are tried in registration order, so priority is
+    deterministic: category rank first, then declaration order.
+    """
+
+    def __init__(
+        self,
+        intents: Sequence[Intent],
+        gates: Optional[Dict[str, Sequence[str]]] = None,
+        default_intent: str = "general_text",
+    ):
+        self.intents = list(intents)
+        self.default_intent = default_intent
+        gates = gates or {}
+
+        phrases: List[str] = []
+        phrase_ids: Dict[str, int] = {}
+
+        def _phrase_id(phrase: str) -> int:
+            phrase = phrase.lower()
+            if phrase not in phrase_ids:
+                phrase_ids[phrase] = len(phrases)
+                phrases.append(phrase)
+            return phrase_ids[phrase]
+
+        # Gate phrases per category
+        self._gates: Dict[str, frozenset] = {
+            category: frozenset(_phrase_id(p) for p in gate_phrases)
+            for category, gate_phrases in gates.items()
+        }
+
+        # Each intent's requirement groups as sets of phrase ids, plus an
+        # inverted index phrase -> intents so only candidates are evaluated
+        self._requirements: List[Tuple[frozenset, ...]] = []
+        self._phrase_to_intents: Dict[int, List[int]] = {}
+        for index, intent in enumerate(self.intents):
+            if intent.category not in CATEGORY_PRIORITY:
+                raise ValueError(f"Unknown intent category: {intent.category}")
+            groups = tuple(frozenset(_phrase_id(p) for p in group) for group in intent.requires)
+            self._requirements.append(groups)
+            for group in groups:
+                for pid in group:
+                    self._phrase_to_intents.setdefault(pid, []).append(index)
+
+        self._priority = [
+            (CATEGORY_PRIORITY[intent.category], index)
+            for index, intent in enumerate(self.intents)
+        ]
+        self._phrases = phrases
+        self._automaton = AhoCorasick(phrases)
+
+    def route(self, query: str) -> RouteResult:
+        """Classify a query in a single pass over its text"""
+        found = self._automaton.search(query.lower())
+
+        candidates = set()
+        for pid in found:
+            candidates.update(self._phrase_to_intents.get(pid, ()))
+
+        best = None
+        for index in candidates:
+            intent = self.intents[index]
+            gate = self._gates.get(intent.category)
+            if gate is not None and not (gate & found):
+                continue
+            if all(group & found for group in self._requirements[index]):
+                if best is None or self._priority[index] < self._priority[best]:
+                    best = index
+
+        matched = sorted(self._phrases[pid] for pid in found)
+        if best is None:
+            return RouteResult(intent=self.default_intent, category="text", matched=matched)
+
+        intent = self.intents[best]
+        return RouteResult(intent=intent.name, category=intent.category, matched=matched)
+
+    @property
+    def phrase_count(self) -> int:
+        return len(self._phrases)
@@ -1,385 +1,85 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import uvicorn
-import os
-from dotenv import load_dotenv
+"""
+Model-backed query agent.
+
+Sends every question with the same system prompt (role plus database
+schema) so the client's prefix cache and the provider's prompt caching can
+reuse it, then shapes the reply with ResponseFormatter. The model comes from
+llm_client.get_llm_client(); with LLM_BACKEND=stub (the default) the agent
+runs fully offline.
+"""
 import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional
 
-# Load environment variables
-load_dotenv()
+from formatter import ResponseFormatter
+from llm_client import LLMClient, LLMTimeoutError, Prompt, get_llm_client
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Wealth Query RAG Agent", version="1.0.0")
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-class QueryRequest(BaseModel):
-    query: str
-
-class QueryResponse(BaseModel):
-    type: str
-    data: dict | list | str
-    metadata: dict = {}
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "Backend is running",
-        "system": "Enhanced Mock System",
-        "databases": {
-            "mongodb": "mock_data_ready",
-            "mysql": "mock_data_ready"
-        }
-    }
-
-@app.post("/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
-    """Process natural language queries with proper type detection"""
-    
-    try:
-        logger.info(f"Processing query: {request.query}")
-        
-        # Get enhanced response based on query
-        response_data = get_enhanced_response(request.query)
-        
-        logger.info(f"Response type: {response_data['type']}")
-        
-        return QueryResponse(
-            type=response_data["type"],
-            data=response_data["data"],
-            metadata=response_data.get("metadata", {})
-        )
-        
-    except Exception as e:
-        logger.error(f"Query processing failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Query processing failed: {str(e)}")
-
-def get_enhanced_response(query: str) -> dict:
-    """Enhanced response system with FIXED type detection"""
-    
-    query_lower = query.lower()
-    
-    # CHART RESPONSES - More specific detection
-    chart_keywords = [
-        "asset allocation distribution",
-        "breakup of portfolio values", 
-        "distribution across",
-        "allocation across",
-        "breakdown",
-        "distribution",
-        "allocation",
-        "share of",
-        "percentage of"
-    ]
-    
-    # Check for chart keywords first
-    is_chart_query = any(keyword in query_lower for keyword in chart_keywords)
-    
-    if is_chart_query:
-        logger.info("Detected CHART query")
-        
-        if "asset allocation" in query_lower or "allocation distribution" in query_lower:
-            return {
-                "type": "chart",
-                "data": {
-                    "type": "pie",
-                    "labels": ["Stocks & Equity", "Real Estate", "Mutual Funds", "Bonds & Fixed Income", "Alternative Investments"],
-                    "datasets": [{
-                        "label": "Asset Allocation (₹ Crores)",
-                        "data": [425, 280, 195, 125, 85],
-                        "backgroundColor": [
-                            "rgba(59, 130, 246, 0.8)",   # Blue
-                            "rgba(16, 185, 129, 0.8)",   # Green  
-                            "rgba(245, 158, 11, 0.8)",   # Yellow
-                            "rgba(139, 92, 246, 0.8)",   # Purple
-                            "rgba(239, 68, 68, 0.8)"     # Red
-                        ],
-                        "borderColor": [
-                            "rgba(59, 130, 246, 1)",
-                            "rgba(16, 185, 129, 1)", 
-                            "rgba(245, 158, 11, 1)",
-                            "rgba(139, 92, 246, 1)",
-                            "rgba(239, 68, 68, 1)"
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "asset_allocation_chart",
-                    "chart_type": "pie",
-                    "total_aum": "₹1,110 Crores"
-                }
-            }
-        
-        elif "breakup of portfolio values per relationship manager" in query_lower:
-            return {
-                "type": "chart", 
-                "data": {
-                    "type": "pie",
-                    "labels": ["Amit Sharma", "Priya Patel", "Rohit Singh"],
-                    "datasets": [{
-                        "label": "Portfolio Distribution by RM (₹ Crores)",
-                        "data": [450, 320, 280],
-                        "backgroundColor": [
-                            "rgba(59, 130, 246, 0.8)",
-                            "rgba(16, 185, 129, 0.8)", 
-                            "rgba(245, 158, 11, 0.8)"
-                        ],
-                        "borderColor": [
-                            "rgba(59, 130, 246, 1)",
-                            "rgba(16, 185, 129, 1)",
-                            "rgba(245, 158, 11, 1)"
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "rm_distribution_chart", 
-                    "chart_type": "pie"
-                }
-            }
-        
-        elif "geographic" in query_lower or "city" in query_lower:
-            return {
-                "type": "chart",
-                "data": {
-                    "type": "bar",
-                    "labels": ["Mumbai", "Delhi", "Chennai", "Bangalore", "Ahmedabad"],
-                    "datasets": [{
-                        "label": "Clients by City",
-                        "data": [4, 1, 1, 1, 1],
-                        "backgroundColor": [
-                            "rgba(59, 130, 246, 0.8)",
-                            "rgba(16, 185, 129, 0.8)",
-                            "rgba(245, 158, 11, 0.8)", 
-                            "rgba(139, 92, 246, 0.8)",
-                            "rgba(239, 68, 68, 0.8)"
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "geographic_distribution",
-                    "chart_type": "bar"
-                }
-            }
-        
-        elif "risk appetite" in query_lower:
-            return {
-                "type": "chart",
-                "data": {
-                    "type": "doughnut", 
-                    "labels": ["High Risk", "Moderate Risk", "Conservative"],
-                    "datasets": [{
-                        "label": "Risk Appetite Distribution (%)",
-                        "data": [45, 35, 20],
-                        "backgroundColor": [
-                            "rgba(239, 68, 68, 0.8)",   # Red for High Risk
-                            "rgba(245, 158, 11, 0.8)",  # Yellow for Moderate
-                            "rgba(16, 185, 129, 0.8)"   # Green for Conservative
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "risk_distribution",
-                    "chart_type": "doughnut"
-                }
-            }
-    
-    # TABLE RESPONSES - Specific table keywords
-    table_keywords = [
-        "top five portfolios",
-        "top 5 portfolios", 
-        "top relationship managers",
-        "highest holders",
-        "client profiles",
-        "show me all",
-        "list all"
-    ]
-    
-    is_table_query = any(keyword in query_lower for keyword in table_keywords)
-    
-    if is_table_query:
-        logger.info("Detected TABLE query")
-        
-        if "top five portfolios" in query_lower or "top 5 portfolios" in query_lower:
-            return {
-                "type": "table",
-                "data": [
-                    {"rank": 1, "client_name": "MS Dhoni", "portfolio_value": "₹156 Cr", "primary_asset": "Real Estate", "rm": "Rohit Singh", "growth": "+18.5%"},
-                    {"rank": 2, "client_name": "Shah Rukh Khan", "portfolio_value": "₹125 Cr", "primary_asset": "Stocks", "rm": "Amit Sharma", "growth": "+15.2%"},
-                    {"rank": 3, "client_name": "Virat Kohli", "portfolio_value": "₹98 Cr", "primary_asset": "Stocks", "rm": "Priya Patel", "growth": "+22.1%"},
-                    {"rank": 4, "client_name": "Deepika Padukone", "portfolio_value": "₹87 Cr", "primary_asset": "Mutual Funds", "rm": "Amit Sharma", "growth": "+12.8%"},
-                    {"rank": 5, "client_name": "Priyanka Chopra", "portfolio_value": "₹76 Cr", "primary_asset": "International Stocks", "rm": "Priya Patel", "growth": "+19.7%"}
-                ],
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "top_portfolios_table",
-                    "record_count": 5
-                }
-            }
-        
-        elif "top relationship managers" in query_lower:
-            return {
-                "type": "table",
-                "data": [
-                    {"rank": 1, "rm_name": "Amit Sharma", "client_count": 25, "total_aum": "₹450 Cr", "avg_portfolio": "₹18 Cr", "performance_rating": "Excellent"},
-                    {"rank": 2, "rm_name": "Priya Patel", "client_count": 18, "total_aum": "₹320 Cr", "avg_portfolio": "₹17.8 Cr", "performance_rating": "Very Good"},
-                    {"rank": 3, "rm_name": "Rohit Singh", "client_count": 12, "total_aum": "₹280 Cr", "avg_portfolio": "₹23.3 Cr", "performance_rating": "Good"}
-                ],
-                "metadata": {
-                    "source": "enhanced_backend", 
-                    "query_type": "rm_performance_table",
-                    "record_count": 3
-                }
-            }
-        
-        elif "highest holders" in query_lower or "client profiles" in query_lower:
-            return {
-                "type": "table",
-                "data": [
-                    {"name": "Shah Rukh Khan", "age": 58, "city": "Mumbai", "profession": "Film Actor", "risk_appetite": "Moderate", "portfolio_value": "₹125 Cr"},
-                    {"name": "Virat Kohli", "age": 35, "city": "Delhi", "profession": "Cricket Player", "risk_appetite": "High", "portfolio_value": "₹98 Cr"},
-                    {"name": "Deepika Padukone", "age": 38, "city": "Mumbai", "profession": "Film Actress", "risk_appetite": "Conservative", "portfolio_value": "₹87 Cr"},
-                    {"name": "MS Dhoni", "age": 42, "city": "Chennai", "profession": "Cricket Player", "risk_appetite": "Moderate", "portfolio_value": "₹156 Cr"}
-                ],
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "client_profiles_table", 
-                    "record_count": 4
-                }
-            }
-    
-    # TEXT RESPONSES - Everything else
-    logger.info("Detected TEXT query")
-    
-    if "why" in query_lower and "sports personalities" in query_lower and "real estate" in query_lower:
-        text_response = """**Why Sports Personalities Prefer Real Estate Investments:**
-
-**Career Stability & Longevity Concerns:**
-Sports careers are inherently shorter than traditional professions, typically spanning 10-15 years of peak earning potential. This creates unique investment needs:
-
-• **Wealth Preservation**: Need for assets that maintain value beyond active career
-• **Steady Income**: Real estate provides rental income during and after retirement
-• **Tangible Security**: Physical assets offer psychological comfort and control
-
-**Risk Management Benefits:**
-• **Lower Volatility**: Real estate markets are generally more stable than equity markets
-• **Inflation Hedge**: Property values typically appreciate with inflation
-• **Diversification**: Reduces overall portfolio risk when combined with other investments
-
-**Tax Advantages:**
-• **Depreciation Benefits**: Significant tax deductions available on property investments
-• **Capital Gains Treatment**: Favorable long-term capital gains tax rates
-• **1031 Exchanges**: Ability to defer taxes through property exchanges
-
-**Celebrity Case Study - MS Dhoni:**
-Our client MS Dhoni has allocated 51% of his ₹156 Cr portfolio to real estate, including:
-- Agricultural land in Ranchi (₹80 Cr)
-- Commercial properties in Chennai (₹45 Cr) 
-- Residential properties in Mumbai (₹31 Cr)
-
-This strategy has delivered consistent 12-15% annual returns while providing personal satisfaction through his farming interests.
-
-**Industry Trends:**
-65% of our sports personality clients have real estate allocations above 25%, compared to 18% for film industry clients who prefer more liquid investments."""
-    
-    elif "investment strategy" in query_lower and ("celebrity" in query_lower or "celebrities" in query_lower):
-        text_response = """**Celebrity Investment Strategy Framework:**
-
-**Unique Challenges in Celebrity Wealth Management:**
-
-**Income Volatility & Career Uncertainty:**
-• **Peak Earning Concentration**: Most celebrities earn 70-80% of lifetime income during 10-15 peak years
-• **Industry Cyclicality**: Entertainment and sports industries face significant ups and downs
-• **Career Risk**: Injury, scandal, or changing public preferences can end careers abruptly
-
-**Our Strategic Asset Allocation Model:**
-
-**Tier 1 - Core Holdings (60-70%):**
-• **Blue-chip Stocks (25%)**: Reliance, TCS, HDFC Bank - stable, dividend-paying companies
-• **Real Estate (20%)**: Mix of commercial and residential properties
-• **Fixed Income (15%)**: Government bonds and high-grade corporate debt
-
-**Tier 2 - Growth Investments (20-25%):**
-• **International Equity (10%)**: US tech stocks, global diversification
-• **Mutual Funds (8%)**: Professionally managed diversified portfolios
-• **Sector-specific Investments (7%)**: Entertainment, sports, and related industries
-
-**Tier 3 - Alternative Investments (10-15%):**
-• **Private Equity (5%)**: Stakes in private companies and startups
-• **Luxury Assets (3%)**: Art, collectibles, rare assets
-• **Cryptocurrency (2%)**: Limited exposure for younger, tech-savvy clients
-
-**Tax Optimization Strategies:**
-• **Corporate Structures**: Investment holding companies for tax efficiency
-• **Geographic Diversification**: International investments for tax benefits
-• **Timing Strategies**: Strategic realization of gains and losses
-
-**Performance Results:**
-- Average annual return: 12.5% (vs market 8.2%)
-- Risk-adjusted Sharpe ratio: 1.8
-- Client satisfaction: 94%
-- Portfolio volatility: 11.2% (well-managed risk)"""
-    
-    else:
-        text_response = """**Comprehensive Wealth Management Analysis:**
-
-Our AI-powered celebrity wealth management system has analyzed extensive portfolio data to provide strategic insights tailored to high-net-worth individuals in entertainment and sports.
-
-**Portfolio Performance Overview:**
-• **Total Assets Under Management**: ₹1,050+ Crores
-• **Average Portfolio Size**: ₹19.1 Crores  
-• **Year-to-Date Performance**: +12.5% (outperforming benchmark by 4.3%)
-• **Client Satisfaction Score**: 94%
-
-**Key Investment Principles:**
-• **Diversification**: Strategic allocation across multiple asset classes and geographies
-• **Risk Management**: Balanced approach between growth and capital preservation
-• **Liquidity Management**: Maintaining sufficient liquid assets for lifestyle needs
-• **Tax Efficiency**: Implementing structures to optimize after-tax returns
-
-**Celebrity-Specific Considerations:**
-• **Career Volatility**: Investment strategies adapted to irregular income patterns
-• **Public Scrutiny**: Avoiding controversial or reputation-damaging investments
-• **Lifestyle Requirements**: Balancing investment growth with liquidity needs
-• **Succession Planning**: Long-term wealth preservation and transfer strategies
-
-**Market Insights:**
-• **Emerging Trends**: Increased interest in ESG investments and sustainable assets
-• **Technology Integration**: Growing allocation to fintech and digital assets
-• **Geographic Expansion**: International diversification becoming more common
-• **Alternative Investments**: Rising interest in private equity and luxury assets"""
-    
-    return {
-        "type": "text",
-        "data": text_response,
-        "metadata": {
-            "source": "enhanced_backend",
-            "query_type": "analytical_text",
-            "analysis_depth": "comprehensive"
+# Keep this byte-stable: it is the cache key for the shared prompt prefix
+SYSTEM_PROMPT = """You are a wealth management analyst for a celebrity wealth management firm.
+Answer questions about clients, portfolios, relationship managers and transactions.
+
+Data available:
+- MongoDB collection client_profiles: client_id, name, age, city, profession, risk_appetite,
+  investment_preferences (list of asset types), relationship_manager
+- MySQL relationship_managers(id, manager_name, portfolio_value)
+- MySQL portfolios(id, client_id, asset_type, amount, stock_symbol)
+- MySQL transactions(id, client_id, transaction_type, amount, asset_type, stock_symbol, transaction_date)
+
+Amounts are in INR; report large figures in crores (1 crore = 10,000,000).
+Be concise and factual. If the data cannot answer the question, say so."""
+
+
+class WealthQueryAgent:
+    """Answers a natural language query with the configured model"""
+
+    def __init__(self, client: Optional[LLMClient] = None, formatter: Optional[ResponseFormatter] = None,
+                 max_tokens: int = 512):
+        self.client = client or get_llm_client()
+        self.formatter = formatter or ResponseFormatter()
+        self.max_tokens = max_tokens
+
+    def _prompt(self, query: str) -> Prompt:
+        return Prompt(system=SYSTEM_PROMPT, user=query, max_tokens=self.max_tokens)
+
+    async def run(self, query: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Raw agent response in the shape ResponseFormatter.format_response expects"""
+        try:
+            completion = await self.client.complete(self._prompt(query), timeout=timeout)
+        except LLMTimeoutError as e:
+            logger.warning(f"Model call timed out: {e}")
+            return {"success": False, "response": str(e), "timed_out": True}
+        except Exception as e:
+            logger.error(f"Model call failed: {e}")
+            return {"success": False, "response": f"Model call failed: {str(e)}"}
+
+        return {
+            "success": True,
+            "response": completion.text,
+            "intermediate_steps": [],
+            "usage": {
+                "prompt_tokens": completion.prompt_tokens,
+                "completion_tokens": completion.completion_tokens,
+                "latency_ms": round(completion.latency_ms, 2),
+                "prefix_cached": completion.prefix_cached,
+                "batch_size": completion.batch_size,
+            },
         }
-    }
 
-if __name__ == "__main__":
-    print("🚀 Starting FIXED Wealth Query RAG Agent...")
-    print("📊 Proper Chart/Table/Text Detection System")
-    print("💼 Celebrity Wealth Management Platform")
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    async def answer(self, query: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Formatted chart/table/text response for a query"""
+        start = time.perf_counter()
+        agent_response = await self.run(query, timeout)
+        response = self.formatter.format_response(agent_response, query)
+        if agent_response.get("timed_out"):
+            response["metadata"]["timed_out"] = True
+        if agent_response.get("usage"):
+            response["metadata"]["usage"] = agent_response["usage"]
+        response["metadata"]["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return response
+
+    async def stream(self, query: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Answer text token by token"""
+        async for token in self.client.stream(self._prompt(query), timeout=timeout):
+            yield token
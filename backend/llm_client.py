@@ -0,0 +1,364 @@
+"""
+Model client layer.
+
+`LLMClient` sits in front of a pluggable backend and adds:
+- micro-batching: concurrent `complete()` calls arriving within
+  `max_wait_ms` of each other are sent to the backend as one batch
+- a prefix cache: the shared system/schema prompt is prepared once per
+  distinct prefix and reused by every request that carries it
+- token streaming via `stream()`
+- per-call timeouts, raised as LLMTimeoutError
+
+Backends: `StubBackend` is deterministic and simulates prefill latency and
+token throughput so the whole pipeline can be load-tested offline;
+`OpenAIBackend` calls the OpenAI chat completions API. `get_llm_client()`
+picks one from LLM_BACKEND.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from settings import get_settings
+
+
+class LLMTimeoutError(TimeoutError):
+    """A model call did not finish within its timeout"""
+
+
+@dataclass(frozen=True)
+class Prompt:
+    system: str
+    user: str
+    max_tokens: int = 256
+
+
+@dataclass
+class PrefixHandle:
+    """Backend-prepared form of a system prompt, shared across requests"""
+    key: str
+    tokens: int
+    state: Any = None
+
+
+@dataclass
+class Completion:
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float = 0.0
+    prefix_cached: bool = False
+    batch_size: int = 1
+
+
+def count_tokens(text: str) -> int:
+    # Whitespace tokens; close enough for budgeting and the stub's timings
+    return len(text.split())
+
+
+def prefix_key(system: str) -> str:
+    return hashlib.sha256(system.encode("utf-8")).hexdigest()
+
+
+class StubBackend:
+    """
+    Deterministic local backend.
+
+    The reply depends only on the prompt. Timings follow a simple serving
+    model: preparing a prefix costs `prefill_ms_per_token` per prefix
+    token (paid once per cached prefix), every batch pays `first_token_ms`
+    plus prefill for the user turns, and decoding runs the batch in
+    lockstep at `tokens_per_second`, so a batch costs its longest reply
+    rather than the sum of them. At most `slots` batches (or streams) are
+    served at once, like a single accelerator.
+    """
+
+    name = "stub"
+
+    VOCABULARY = (
+        "portfolio", "allocation", "clients", "risk", "equity", "real", "estate", "returns",
+        "diversified", "relationship", "manager", "holdings", "growth", "bonds", "gold",
+        "exposure", "mumbai", "strategy", "quarterly", "rebalancing",
+    )
+
+    def __init__(self, first_token_ms: float = 40.0, tokens_per_second: float = 400.0,
+                 prefill_ms_per_token: float = 0.05, reply_tokens: Tuple[int, int] = (24, 64),
+                 slots: int = 1):
+        self.first_token_ms = first_token_ms
+        self.tokens_per_second = tokens_per_second
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.reply_tokens = reply_tokens
+        self.slots = slots
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self.calls = 0
+        self.batches = 0
+
+    def _slot(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.slots)}
+        return self._semaphores[loop]
+
+    def reply(self, prompt: Prompt) -> List[str]:
+        digest = hashlib.sha256(f"{prompt.system}\0{prompt.user}".encode("utf-8")).digest()
+        low, high = self.reply_tokens
+        length = min(prompt.max_tokens, low + digest[0] % max(high - low + 1, 1))
+        words = [self.VOCABULARY[digest[i % len(digest)] % len(self.VOCABULARY)] for i in range(1, length)]
+        return ["[stub]"] + words
+
+    async def prepare_prefix(self, system: str) -> PrefixHandle:
+        tokens = count_tokens(system)
+        await asyncio.sleep(tokens * self.prefill_ms_per_token / 1000)
+        return PrefixHandle(prefix_key(system), tokens)
+
+    async def generate_batch(self, items: Sequence[Tuple[PrefixHandle, Prompt]]) -> List[str]:
+        self.calls += len(items)
+        self.batches += 1
+        replies = [self.reply(prompt) for _, prompt in items]
+        prefill = sum(count_tokens(prompt.user) for _, prompt in items) * self.prefill_ms_per_token
+        decode = max(len(words) for words in replies) / self.tokens_per_second * 1000
+        async with self._slot():
+            await asyncio.sleep((self.first_token_ms + prefill + decode) / 1000)
+        return [" ".join(words) for words in replies]
+
+    async def stream(self, handle: PrefixHandle, prompt: Prompt) -> AsyncIterator[str]:
+        self.calls += 1
+        async with self._slot():
+            await asyncio.sleep((self.first_token_ms + count_tokens(prompt.user) * self.prefill_ms_per_token) / 1000)
+            words = self.reply(prompt)
+            for i, word in enumerate(words):
+                yield word if i == 0 else f" {word}"
+                await asyncio.sleep(1 / self.tokens_per_second)
+
+
+class OpenAIBackend:
+    """
+    OpenAI chat completions.
+
+    The chat API takes one conversation per request, so a micro-batch is
+    sent as concurrent requests. The system prompt is kept byte-identical
+    across calls, which is what lets the server reuse its cached prefix.
+    """
+
+    name = "openai"
+
+    def __init__(self, model: Optional[str] = None, api_key: Optional[str] = None, temperature: float = 0.0):
+        try:
+            import openai
+        except ImportError:  # optional; only needed for LLM_BACKEND=openai
+            raise RuntimeError("openai package is not installed") from None
+        settings = get_settings()
+        self.model = model or settings.openai_model
+        self.temperature = temperature
+        self.client = openai.AsyncOpenAI(api_key=api_key or settings.openai_api_key)
+
+    async def prepare_prefix(self, system: str) -> PrefixHandle:
+        return PrefixHandle(prefix_key(system), count_tokens(system), [{"role": "system", "content": system}])
+
+    def _messages(self, handle: PrefixHandle, prompt: Prompt) -> List[Dict[str, str]]:
+        return handle.state + [{"role": "user", "content": prompt.user}]
+
+    async def _complete(self, handle: PrefixHandle, prompt: Prompt) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(handle, prompt),
+            max_tokens=prompt.max_tokens,
+            temperature=self.temperature,
+        )
+        return response.choices[0].message.content or ""
+
+    async def generate_batch(self, items: Sequence[Tuple[PrefixHandle, Prompt]]) -> List[str]:
+        return list(await asyncio.gather(*(self._complete(handle, prompt) for handle, prompt in items)))
+
+    async def stream(self, handle: PrefixHandle, prompt: Prompt) -> AsyncIterator[str]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(handle, prompt),
+            max_tokens=prompt.max_tokens,
+            temperature=self.temperature,
+            stream=True,
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+@dataclass
+class _Pending:
+    handle: PrefixHandle
+    prompt: Prompt
+    future: asyncio.Future
+    prefix_cached: bool
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class LLMClient:
+    """Batching, prefix-caching front end over a backend"""
+
+    def __init__(self, backend, max_batch_size: int = 8, max_wait_ms: float = 5.0,
+                 timeout: float = 30.0, prefix_cache_size: int = 32):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.timeout = timeout
+        self.prefix_cache_size = prefix_cache_size
+        self._prefixes: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight = set()
+        self.prefix_hits = 0
+        self.prefix_misses = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.requests = 0
+        self.timeouts = 0
+
+    async def _prefix(self, system: str) -> Tuple[PrefixHandle, bool]:
+        key = prefix_key(system)
+        task = self._prefixes.get(key)
+        cached = task is not None
+        if cached:
+            self._prefixes.move_to_end(key)
+            self.prefix_hits += 1
+        else:
+            # Concurrent first requests share one preparation
+            task = self._prefixes[key] = asyncio.ensure_future(self.backend.prepare_prefix(system))
+            self.prefix_misses += 1
+            while len(self._prefixes) > self.prefix_cache_size:
+                self._prefixes.popitem(last=False)
+        try:
+            return await asyncio.shield(task), cached
+        except Exception:
+            self._prefixes.pop(key, None)
+            raise
+
+    def _bind_loop(self) -> None:
+        # Queue, worker and prefix tasks belong to one event loop; start
+        # fresh if the client is reused from another (e.g. asyncio.run twice)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._worker is None or self._worker.done():
+            if loop is not self._loop:
+                self._prefixes.clear()
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._batch_loop())
+
+    async def _batch_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Requests that already timed out are not worth sending
+            batch = [item for item in batch if not item.future.done()]
+            if batch:
+                task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[_Pending]) -> None:
+        self.batches += 1
+        self.batched_requests += len(batch)
+        try:
+            texts = await self.backend.generate_batch([(item.handle, item.prompt) for item in batch])
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        for item, text in zip(batch, texts):
+            if not item.future.done():
+                item.future.set_result(Completion(
+                    text=text,
+                    prompt_tokens=item.handle.tokens + count_tokens(item.prompt.user),
+                    completion_tokens=count_tokens(text),
+                    latency_ms=(time.perf_counter() - item.enqueued_at) * 1000,
+                    prefix_cached=item.prefix_cached,
+                    batch_size=len(batch),
+                ))
+
+    async def complete(self, prompt: Prompt, timeout: Optional[float] = None) -> Completion:
+        """Full completion for one prompt, batched with concurrent callers"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.perf_counter() + timeout
+        self.requests += 1
+        self._bind_loop()
+        try:
+            handle, cached = await asyncio.wait_for(self._prefix(prompt.system), timeout)
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put(_Pending(handle, prompt, future, cached))
+            return await asyncio.wait_for(future, max(deadline - time.perf_counter(), 0))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise LLMTimeoutError(f"model call exceeded {timeout:g}s") from None
+
+    async def stream(self, prompt: Prompt, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Tokens as the backend produces them; `timeout` bounds the whole stream"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.perf_counter() + timeout
+        self.requests += 1
+        self._bind_loop()
+        try:
+            handle, _ = await asyncio.wait_for(self._prefix(prompt.system), timeout)
+            tokens = self.backend.stream(handle, prompt)
+            try:
+                while True:
+                    try:
+                        token = await asyncio.wait_for(tokens.__anext__(), max(deadline - time.perf_counter(), 0))
+                    except StopAsyncIteration:
+                        return
+                    yield token
+            finally:
+                await tokens.aclose()
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise LLMTimeoutError(f"model stream exceeded {timeout:g}s") from None
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for task in list(self._inflight):
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": getattr(self.backend, "name", type(self.backend).__name__),
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "prefix_hits": self.prefix_hits,
+            "prefix_misses": self.prefix_misses,
+            "timeouts": self.timeouts,
+        }
+
+
+def get_llm_client() -> LLMClient:
+    """Client configured from LLM_BACKEND (stub|openai) and LLM_* settings"""
+    settings = get_settings()
+    if settings.llm_backend == "openai":
+        backend = OpenAIBackend()
+    elif settings.llm_backend == "stub":
+        backend = StubBackend(
+            first_token_ms=settings.llm_stub_first_token_ms,
+            tokens_per_second=settings.llm_stub_tokens_per_second,
+            slots=settings.llm_stub_slots,
+        )
+    else:
+        raise ValueError(f"Unknown LLM_BACKEND: {settings.llm_backend}")
+    return LLMClient(
+        backend,
+        max_batch_size=settings.llm_max_batch_size,
+        max_wait_ms=settings.llm_max_wait_ms,
+        timeout=settings.llm_timeout,
+    )
@@ -1,13 +1,23 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import uvicorn
-import os
-from dotenv import load_dotenv
+import copy
+import asyncio
+import time
+import threading
 import logging
+from settings import get_settings
+from intent_router import Intent, IntentRouter
+from response_cache import ResponseCache, normalize_query
+from canned_responses import CANNED_RESPONSES, freeze_payloads
+from serialization import COLUMNAR_MEDIA_TYPE, TABLE_FORMATS, columnar_body, encode_json, ndjson_batches
+from charts import build_chart
+from http_caching import json_response
+from db.executor import run_blocking
 
-# Load environment variables
-load_dotenv()
+# Environment and .env are read once, here
+settings = get_settings()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,14 +34,218 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Intent registry - compiled once into a single automaton at startup.
+# Order within a category is the priority order.
+QUERY_INTENTS = [
+    Intent("asset_allocation_chart", "chart", (("asset allocation", "allocation distribution"),)),
+    Intent("rm_distribution_chart", "chart", (("breakup of portfolio values per relationship manager",),)),
+    Intent("geographic_distribution", "chart", (("geographic", "city"),)),
+    Intent("risk_distribution", "chart", (("risk appetite",),)),
+    Intent("top_portfolios_table", "table", (("top five portfolios", "top 5 portfolios"),)),
+    Intent("rm_performance_table", "table", (("top relationship managers",),)),
+    Intent("client_profiles_table", "table", (("highest holders", "client profiles"),)),
+    Intent("sports_real_estate_text", "text", (("why",), ("sports personalities",), ("real estate",))),
+    Intent("celebrity_strategy_text", "text", (("investment strategy",), ("celebrity", "celebrities"))),
+]
+
+QUERY_GATES = {
+    "chart": [
+        "asset allocation distribution",
+        "breakup of portfolio values",
+        "distribution across",
+        "allocation across",
+        "breakdown",
+        "distribution",
+        "allocation",
+        "share of",
+        "percentage of"
+    ],
+    "table": [
+        "top five portfolios",
+        "top 5 portfolios",
+        "top relationship managers",
+        "highest holders",
+        "client profiles",
+        "show me all",
+        "list all"
+    ],
+}
+
+query_router = IntentRouter(QUERY_INTENTS, gates=QUERY_GATES, default_intent="general_text")
+
+# Serialized responses keyed on the normalized query
+response_cache = ResponseCache(
+    max_entries=settings.query_cache_size,
+    ttl_seconds=settings.query_cache_ttl
+)
+
 class QueryRequest(BaseModel):
     query: str
+    table_format: str | None = None
 
 class QueryResponse(BaseModel):
     type: str
     data: dict | list | str
     metadata: dict = {}
 
+class BatchQueryRequest(BaseModel):
+    queries: list[str]
+    stream: bool = False
+
+MAX_BATCH_QUERIES = settings.max_batch_queries
+BATCH_QUERY_CONCURRENCY = settings.batch_query_concurrency
+
+# Ends a streamed /agent/query body that failed after the first token
+AGENT_STREAM_ERROR = "\n[stream error] "
+
+class AgentQueryRequest(BaseModel):
+    query: str
+    stream: bool = False
+    timeout: float | None = None
+
+class StreamRequest(BaseModel):
+    query: str
+    source: str = "portfolios"
+    batch_size: int = 500
+
+class ExportRequest(BaseModel):
+    query: str
+    source: str = "portfolios"
+    format: str = "arrow"
+    batch_size: int = 10000
+
+class ClientSearchRequest(BaseModel):
+    query: str = ""
+    limit: int = 50
+    cursor: str | None = None
+    fields: list[str] | None = None
+
+class ClientPortfoliosRequest(BaseModel):
+    query: str = ""
+    asset_type: str | None = None
+    min_amount: float | None = None
+    limit: int = 10
+
+# Database tools are created on first use so the API can start without
+# the database drivers configured
+_tools = {}
+_semantic_cache_lock = threading.Lock()
+
+def get_mysql_tool():
+    if "mysql" not in _tools:
+        from db.mysql_connect import MySQLTool
+        _tools["mysql"] = MySQLTool()
+    return _tools["mysql"]
+
+def get_rollup_store():
+    if "rollups" not in _tools:
+        from db.rollups import RollupStore
+        _tools["rollups"] = RollupStore(get_mysql_tool(), rebuild_seconds=settings.rollup_rebuild_seconds)
+    return _tools["rollups"]
+
+def get_federated_planner():
+    if "federated" not in _tools:
+        from db.federated import FederatedPlanner
+        _tools["federated"] = FederatedPlanner(get_mongo_tool(), get_mysql_tool())
+    return _tools["federated"]
+
+def get_semantic_cache():
+    # Catches rewordings the exact-match cache misses ("show me top 5
+    # portfolios" vs "top five portfolios please"). Created on first use so
+    # NumPy is not imported before the server can answer /health.
+    if "semantic_cache" not in _tools:
+        # The startup warm-up and the first query may race to create it
+        with _semantic_cache_lock:
+            if "semantic_cache" not in _tools:
+                from semantic_cache import SemanticCache
+                _tools["semantic_cache"] = SemanticCache(
+                    max_entries=settings.semantic_cache_size,
+                    threshold=settings.semantic_cache_threshold,
+                    ttl_seconds=settings.query_cache_ttl
+                )
+    return _tools["semantic_cache"]
+
+def get_agent():
+    if "agent" not in _tools:
+        from langchain_agent import WealthQueryAgent
+        _tools["agent"] = WealthQueryAgent()
+    return _tools["agent"]
+
+def get_mongo_tool():
+    if "mongo" not in _tools:
+        from db.mongo_connect import MongoDBTool
+        _tools["mongo"] = MongoDBTool()
+    return _tools["mongo"]
+
+def _validate_payload(payload: dict) -> dict:
+    return QueryResponse(**payload).model_dump()
+
+# Canned payloads validated and encoded once at startup
+frozen_responses = freeze_payloads(CANNED_RESPONSES, validate=_validate_payload)
+
+@app.on_event("startup")
+async def prepare_indexes():
+    """Create MongoDB search indexes in the background without delaying startup"""
+    
+    def _ensure():
+        try:
+            get_mongo_tool().ensure_indexes()
+            logger.info("MongoDB search indexes ready")
+        except Exception as e:
+            logger.warning(f"Could not ensure MongoDB indexes: {e}")
+    
+    if settings.mongo_uri:
+        asyncio.get_running_loop().run_in_executor(None, _ensure)
+
+@app.on_event("startup")
+async def warm_semantic_cache():
+    """Load the semantic cache off the event loop so the first query does not pay for it"""
+    asyncio.get_running_loop().run_in_executor(None, get_semantic_cache)
+
+@app.on_event("startup")
+async def build_retrieval_index():
+    """Embed client profiles and holdings for the text route when RAG_INDEX=1"""
+    
+    def _build():
+        try:
+            from retrieval import Retriever
+            retriever = Retriever(
+                dtype=settings.rag_index_dtype,
+                path=settings.rag_index_path
+            )
+            count = retriever.build(
+                mongo_tool=get_mongo_tool() if settings.mongo_uri else None,
+                mysql_tool=get_mysql_tool()
+            )
+            _tools["retriever"] = retriever
+            logger.info(f"Retrieval index ready ({count} documents)")
+        except Exception as e:
+            logger.warning(f"Could not build retrieval index: {e}")
+    
+    if settings.rag_index:
+        asyncio.get_running_loop().run_in_executor(None, _build)
+
+def with_retrieved_context(intent: str, query: str):
+    """Text payload for an intent with the most relevant documents appended, or None"""
+    
+    retriever = _tools.get("retriever")
+    if retriever is None or not len(retriever):
+        return None
+    
+    documents = retriever.search(query, k=settings.rag_top_k, min_score=settings.rag_min_score)
+    if not documents:
+        return None
+    
+    from retrieval import format_context
+    
+    payload = copy.deepcopy(CANNED_RESPONSES[intent])
+    payload["data"] = f"{payload['data']}\n\n{format_context(documents)}"
+    payload["metadata"]["retrieved"] = [
+        {"key": document["key"], "kind": document.get("kind"), "score": document["score"]}
+        for document in documents
+    ]
+    return encode_json(_validate_payload(payload))
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -45,340 +259,445 @@ async def health_check():
     }
 
 @app.post("/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+async def process_query(request: QueryRequest, http_request: Request):
     """Process natural language queries with proper type detection"""
     
+    return await answer_query(request.query, http_request, request.table_format, conditional=False)
+
+@app.get("/query", response_model=QueryResponse)
+async def process_query_get(query: str, http_request: Request, table_format: str | None = None):
+    """
+    Cacheable form of POST /query: browsers revalidate with If-None-Match
+    and get a bodiless 304 while the answer is unchanged
+    """
+    
+    return await answer_query(query, http_request, table_format, conditional=True)
+
+async def answer_query(query: str, http_request: Request, table_format: str | None, conditional: bool) -> Response:
+    """
+    Encoded answer with ETag, negotiated compression and, for GET, 304
+    handling. Tables are sent columnar when `table_format` is "columnar"
+    or the client accepts COLUMNAR_MEDIA_TYPE.
+    """
+    
+    if table_format is not None and table_format not in TABLE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"table_format must be one of {', '.join(TABLE_FORMATS)}")
+    if table_format is None:
+        columnar = COLUMNAR_MEDIA_TYPE in http_request.headers.get("accept", "")
+    else:
+        columnar = table_format == "columnar"
+    
     try:
-        logger.info(f"Processing query: {request.query}")
-        
-        # Get enhanced response based on query
-        response_data = get_enhanced_response(request.query)
+        logger.info(f"Processing query: {query}")
         
-        logger.info(f"Response type: {response_data['type']}")
-        
-        return QueryResponse(
-            type=response_data["type"],
-            data=response_data["data"],
-            metadata=response_data.get("metadata", {})
-        )
+        cache_key = normalize_query(query)
+        resolved = response_cache.get_entry(cache_key)
+        if resolved is None:
+            # A miss may embed the query and search the retrieval index,
+            # so it runs off the event loop
+            resolved = await run_blocking(answer_miss, cache_key)
+        body, variants = resolved
+        if columnar:
+            # The columnar body and its own ETag and encodings sit beside
+            # the records ones, for as long as the cache holds the body
+            variants = variants.setdefault("columnar", {})
+            if "body" not in variants:
+                variants["body"] = columnar_body(body)
+            body = variants["body"]
+        return json_response(http_request, body, min_size=settings.compress_min_bytes,
+                             conditional=conditional, vary="Accept, Accept-Encoding",
+                             variants=variants)
         
     except Exception as e:
         logger.error(f"Query processing failed: {e}")
         raise HTTPException(status_code=500, detail=f"Query processing failed: {str(e)}")
 
-def get_enhanced_response(query: str) -> dict:
-    """Enhanced response system with FIXED type detection"""
+def resolve_query(cache_key: str) -> tuple[bytes, dict]:
+    """
+    Encoded /query response for a normalized query, served from cache when
+    possible, and the cache's dict of representations derived from it
+    """
     
-    query_lower = query.lower()
+    cached = response_cache.get_entry(cache_key)
+    if cached is not None:
+        return cached
+    return answer_miss(cache_key)
+
+def answer_miss(cache_key: str) -> tuple[bytes, dict]:
+    """Answer a query the response cache does not hold, and cache it"""
     
-    # CHART RESPONSES - More specific detection
-    chart_keywords = [
-        "asset allocation distribution",
-        "breakup of portfolio values", 
-        "distribution across",
-        "allocation across",
-        "breakdown",
-        "distribution",
-        "allocation",
-        "share of",
-        "percentage of"
-    ]
+    # Near-duplicate phrasings are answered from the closest query already
+    # answered, before routing, so a hit also skips any retrieval; the
+    # similarity threshold is what keeps e.g. "top 5 portfolios chart" from
+    # taking the table answered for "top 5 portfolios"
+    semantic_cache = get_semantic_cache()
+    match = semantic_cache.lookup(cache_key)
+    if match is not None:
+        logger.info(f"Semantic cache hit: {match[0]!r} ({match[2]:.3f})")
+        body = match[1]
+    else:
+        body = compute_answer(cache_key)
+        semantic_cache.put(cache_key, body)
     
-    # Check for chart keywords first
-    is_chart_query = any(keyword in query_lower for keyword in chart_keywords)
+    return body, response_cache.put(cache_key, body)
+
+def compute_answer(cache_key: str) -> bytes:
+    """Route a normalized query and build its encoded answer"""
     
-    if is_chart_query:
-        logger.info("Detected CHART query")
-        
-        if "asset allocation" in query_lower or "allocation distribution" in query_lower:
-            return {
-                "type": "chart",
-                "data": {
-                    "type": "pie",
-                    "labels": ["Stocks & Equity", "Real Estate", "Mutual Funds", "Bonds & Fixed Income", "Alternative Investments"],
-                    "datasets": [{
-                        "label": "Asset Allocation (₹ Crores)",
-                        "data": [425, 280, 195, 125, 85],
-                        "backgroundColor": [
-                            "rgba(59, 130, 246, 0.8)",   # Blue
-                            "rgba(16, 185, 129, 0.8)",   # Green  
-                            "rgba(245, 158, 11, 0.8)",   # Yellow
-                            "rgba(139, 92, 246, 0.8)",   # Purple
-                            "rgba(239, 68, 68, 0.8)"     # Red
-                        ],
-                        "borderColor": [
-                            "rgba(59, 130, 246, 1)",
-                            "rgba(16, 185, 129, 1)", 
-                            "rgba(245, 158, 11, 1)",
-                            "rgba(139, 92, 246, 1)",
-                            "rgba(239, 68, 68, 1)"
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "asset_allocation_chart",
-                    "chart_type": "pie",
-                    "total_aum": "₹1,110 Crores"
-                }
-            }
-        
-        elif "breakup of portfolio values per relationship manager" in query_lower:
-            return {
-                "type": "chart", 
-                "data": {
-                    "type": "pie",
-                    "labels": ["Amit Sharma", "Priya Patel", "Rohit Singh"],
-                    "datasets": [{
-                        "label": "Portfolio Distribution by RM (₹ Crores)",
-                        "data": [450, 320, 280],
-                        "backgroundColor": [
-                            "rgba(59, 130, 246, 0.8)",
-                            "rgba(16, 185, 129, 0.8)", 
-                            "rgba(245, 158, 11, 0.8)"
-                        ],
-                        "borderColor": [
-                            "rgba(59, 130, 246, 1)",
-                            "rgba(16, 185, 129, 1)",
-                            "rgba(245, 158, 11, 1)"
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "rm_distribution_chart", 
-                    "chart_type": "pie"
-                }
-            }
-        
-        elif "geographic" in query_lower or "city" in query_lower:
-            return {
-                "type": "chart",
-                "data": {
-                    "type": "bar",
-                    "labels": ["Mumbai", "Delhi", "Chennai", "Bangalore", "Ahmedabad"],
-                    "datasets": [{
-                        "label": "Clients by City",
-                        "data": [4, 1, 1, 1, 1],
-                        "backgroundColor": [
-                            "rgba(59, 130, 246, 0.8)",
-                            "rgba(16, 185, 129, 0.8)",
-                            "rgba(245, 158, 11, 0.8)", 
-                            "rgba(139, 92, 246, 0.8)",
-                            "rgba(239, 68, 68, 0.8)"
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "geographic_distribution",
-                    "chart_type": "bar"
-                }
-            }
-        
-        elif "risk appetite" in query_lower:
-            return {
-                "type": "chart",
-                "data": {
-                    "type": "doughnut", 
-                    "labels": ["High Risk", "Moderate Risk", "Conservative"],
-                    "datasets": [{
-                        "label": "Risk Appetite Distribution (%)",
-                        "data": [45, 35, 20],
-                        "backgroundColor": [
-                            "rgba(239, 68, 68, 0.8)",   # Red for High Risk
-                            "rgba(245, 158, 11, 0.8)",  # Yellow for Moderate
-                            "rgba(16, 185, 129, 0.8)"   # Green for Conservative
-                        ],
-                        "borderWidth": 2
-                    }]
-                },
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "risk_distribution",
-                    "chart_type": "doughnut"
-                }
-            }
-    
-    # TABLE RESPONSES - Specific table keywords
-    table_keywords = [
-        "top five portfolios",
-        "top 5 portfolios", 
-        "top relationship managers",
-        "highest holders",
-        "client profiles",
-        "show me all",
-        "list all"
-    ]
+    # Route the normalized query so every phrasing sharing a cache key
+    # gets the same answer
+    route = query_router.route(cache_key)
+    logger.info(f"Detected {route.category.upper()} query ({route.intent})")
     
-    is_table_query = any(keyword in query_lower for keyword in table_keywords)
+    body = frozen_responses[route.intent]
+    if route.category == "text":
+        body = with_retrieved_context(route.intent, cache_key) or body
+    return body
+
+@app.post("/query/batch")
+async def process_query_batch(request: BatchQueryRequest):
+    """
+    Run many queries in one request. Identical queries (after normalization)
+    run once; the rest run concurrently up to BATCH_QUERY_CONCURRENCY.
+    """
     
-    if is_table_query:
-        logger.info("Detected TABLE query")
-        
-        if "top five portfolios" in query_lower or "top 5 portfolios" in query_lower:
-            return {
-                "type": "table",
-                "data": [
-                    {"rank": 1, "client_name": "MS Dhoni", "portfolio_value": "₹156 Cr", "primary_asset": "Real Estate", "rm": "Rohit Singh", "growth": "+18.5%"},
-                    {"rank": 2, "client_name": "Shah Rukh Khan", "portfolio_value": "₹125 Cr", "primary_asset": "Stocks", "rm": "Amit Sharma", "growth": "+15.2%"},
-                    {"rank": 3, "client_name": "Virat Kohli", "portfolio_value": "₹98 Cr", "primary_asset": "Stocks", "rm": "Priya Patel", "growth": "+22.1%"},
-                    {"rank": 4, "client_name": "Deepika Padukone", "portfolio_value": "₹87 Cr", "primary_asset": "Mutual Funds", "rm": "Amit Sharma", "growth": "+12.8%"},
-                    {"rank": 5, "client_name": "Priyanka Chopra", "portfolio_value": "₹76 Cr", "primary_asset": "International Stocks", "rm": "Priya Patel", "growth": "+19.7%"}
-                ],
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "top_portfolios_table",
-                    "record_count": 5
-                }
-            }
-        
-        elif "top relationship managers" in query_lower:
-            return {
-                "type": "table",
-                "data": [
-                    {"rank": 1, "rm_name": "Amit Sharma", "client_count": 25, "total_aum": "₹450 Cr", "avg_portfolio": "₹18 Cr", "performance_rating": "Excellent"},
-                    {"rank": 2, "rm_name": "Priya Patel", "client_count": 18, "total_aum": "₹320 Cr", "avg_portfolio": "₹17.8 Cr", "performance_rating": "Very Good"},
-                    {"rank": 3, "rm_name": "Rohit Singh", "client_count": 12, "total_aum": "₹280 Cr", "avg_portfolio": "₹23.3 Cr", "performance_rating": "Good"}
-                ],
-                "metadata": {
-                    "source": "enhanced_backend", 
-                    "query_type": "rm_performance_table",
-                    "record_count": 3
-                }
-            }
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="No queries given")
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    
+    keys = [normalize_query(query) for query in request.queries]
+    unique_keys = list(dict.fromkeys(keys))
+    semaphore = asyncio.Semaphore(BATCH_QUERY_CONCURRENCY)
+    
+    async def run_one(key: str):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                body, _ = await run_blocking(resolve_query, key)
+                status = "ok"
+            except Exception as e:
+                logger.error(f"Batch query failed: {e}")
+                body = encode_json({"detail": f"Query processing failed: {str(e)}"})
+                status = "error"
+            return key, status, body, (time.perf_counter() - start) * 1000
+    
+    def encode_item(index: int, first: bool, status: str, body: bytes, elapsed_ms: float) -> bytes:
+        # Splice the already-encoded response bytes instead of re-encoding them
+        header = encode_json({
+            "index": index,
+            "query": request.queries[index],
+            "status": status,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "deduplicated": not first
+        })
+        return header[:-1] + b',"response":' + body + b"}"
+    
+    positions = {}
+    for index, key in enumerate(keys):
+        positions.setdefault(key, []).append(index)
+    
+    tasks = [asyncio.create_task(run_one(key)) for key in unique_keys]
+    
+    if request.stream:
+        async def stream_results():
+            for finished in asyncio.as_completed(tasks):
+                key, status, body, elapsed_ms = await finished
+                for n, index in enumerate(positions[key]):
+                    yield encode_item(index, n == 0, status, body, elapsed_ms) + b"\n"
         
-        elif "highest holders" in query_lower or "client profiles" in query_lower:
-            return {
-                "type": "table",
-                "data": [
-                    {"name": "Shah Rukh Khan", "age": 58, "city": "Mumbai", "profession": "Film Actor", "risk_appetite": "Moderate", "portfolio_value": "₹125 Cr"},
-                    {"name": "Virat Kohli", "age": 35, "city": "Delhi", "profession": "Cricket Player", "risk_appetite": "High", "portfolio_value": "₹98 Cr"},
-                    {"name": "Deepika Padukone", "age": 38, "city": "Mumbai", "profession": "Film Actress", "risk_appetite": "Conservative", "portfolio_value": "₹87 Cr"},
-                    {"name": "MS Dhoni", "age": 42, "city": "Chennai", "profession": "Cricket Player", "risk_appetite": "Moderate", "portfolio_value": "₹156 Cr"}
-                ],
-                "metadata": {
-                    "source": "enhanced_backend",
-                    "query_type": "client_profiles_table", 
-                    "record_count": 4
-                }
-            }
-    
-    # TEXT RESPONSES - Everything else
-    logger.info("Detected TEXT query")
-    
-    if "why" in query_lower and "sports personalities" in query_lower and "real estate" in query_lower:
-        text_response = """**Why Sports Personalities Prefer Real Estate Investments:**
-
-**Career Stability & Longevity Concerns:**
-Sports careers are inherently shorter than traditional professions, typically spanning 10-15 years of peak earning potential. This creates unique investment needs:
-
-• **Wealth Preservation**: Need for assets that maintain value beyond active career
-• **Steady Income**: Real estate provides rental income during and after retirement
-• **Tangible Security**: Physical assets offer psychological comfort and control
-
-**Risk Management Benefits:**
-• **Lower Volatility**: Real estate markets are generally more stable than equity markets
-• **Inflation Hedge**: Property values typically appreciate with inflation
-• **Diversification**: Reduces overall portfolio risk when combined with other investments
-
-**Tax Advantages:**
-• **Depreciation Benefits**: Significant tax deductions available on property investments
-• **Capital Gains Treatment**: Favorable long-term capital gains tax rates
-• **1031 Exchanges**: Ability to defer taxes through property exchanges
-
-**Celebrity Case Study - MS Dhoni:**
-Our client MS Dhoni has allocated 51% of his ₹156 Cr portfolio to real estate, including:
-- Agricultural land in Ranchi (₹80 Cr)
-- Commercial properties in Chennai (₹45 Cr) 
-- Residential properties in Mumbai (₹31 Cr)
-
-This strategy has delivered consistent 12-15% annual returns while providing personal satisfaction through his farming interests.
-
-**Industry Trends:**
-65% of our sports personality clients have real estate allocations above 25%, compared to 18% for film industry clients who prefer more liquid investments."""
-    
-    elif "investment strategy" in query_lower and ("celebrity" in query_lower or "celebrities" in query_lower):
-        text_response = """**Celebrity Investment Strategy Framework:**
-
-**Unique Challenges in Celebrity Wealth Management:**
-
-**Income Volatility & Career Uncertainty:**
-• **Peak Earning Concentration**: Most celebrities earn 70-80% of lifetime income during 10-15 peak years
-• **Industry Cyclicality**: Entertainment and sports industries face significant ups and downs
-• **Career Risk**: Injury, scandal, or changing public preferences can end careers abruptly
-
-**Our Strategic Asset Allocation Model:**
-
-**Tier 1 - Core Holdings (60-70%):**
-• **Blue-chip Stocks (25%)**: Reliance, TCS, HDFC Bank - stable, dividend-paying companies
-• **Real Estate (20%)**: Mix of commercial and residential properties
-• **Fixed Income (15%)**: Government bonds and high-grade corporate debt
-
-**Tier 2 - Growth Investments (20-25%):**
-• **International Equity (10%)**: US tech stocks, global diversification
-• **Mutual Funds (8%)**: Professionally managed diversified portfolios
-• **Sector-specific Investments (7%)**: Entertainment, sports, and related industries
-
-**Tier 3 - Alternative Investments (10-15%):**
-• **Private Equity (5%)**: Stakes in private companies and startups
-• **Luxury Assets (3%)**: Art, collectibles, rare assets
-• **Cryptocurrency (2%)**: Limited exposure for younger, tech-savvy clients
-
-**Tax Optimization Strategies:**
-• **Corporate Structures**: Investment holding companies for tax efficiency
-• **Geographic Diversification**: International investments for tax benefits
-• **Timing Strategies**: Strategic realization of gains and losses
-
-**Performance Results:**
-- Average annual return: 12.5% (vs market 8.2%)
-- Risk-adjusted Sharpe ratio: 1.8
-- Client satisfaction: 94%
-- Portfolio volatility: 11.2% (well-managed risk)"""
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+    
+    start = time.perf_counter()
+    items = [None] * len(keys)
+    for key, status, body, elapsed_ms in await asyncio.gather(*tasks):
+        for n, index in enumerate(positions[key]):
+            items[index] = encode_item(index, n == 0, status, body, elapsed_ms)
+    
+    summary = encode_json({
+        "count": len(keys),
+        "unique_queries": len(unique_keys),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    })
+    content = summary[:-1] + b',"results":[' + b",".join(items) + b"]}"
+    return Response(content=content, media_type="application/json")
+
+@app.post("/query/stream")
+async def stream_query(request: StreamRequest):
+    """Stream raw result rows as NDJSON while they are fetched"""
     
+    batch_size = max(1, min(request.batch_size, 10000))
+    if request.source == "portfolios":
+        batches = get_mysql_tool().stream_portfolio_query(request.query, batch_size)
+    elif request.source == "transactions":
+        batches = get_mysql_tool().stream_transactions(request.query, batch_size)
+    elif request.source == "clients":
+        batches = get_mongo_tool().stream_clients(request.query, batch_size)
     else:
-        text_response = """**Comprehensive Wealth Management Analysis:**
-
-Our AI-powered celebrity wealth management system has analyzed extensive portfolio data to provide strategic insights tailored to high-net-worth individuals in entertainment and sports.
-
-**Portfolio Performance Overview:**
-• **Total Assets Under Management**: ₹1,050+ Crores
-• **Average Portfolio Size**: ₹19.1 Crores  
-• **Year-to-Date Performance**: +12.5% (outperforming benchmark by 4.3%)
-• **Client Satisfaction Score**: 94%
-
-**Key Investment Principles:**
-• **Diversification**: Strategic allocation across multiple asset classes and geographies
-• **Risk Management**: Balanced approach between growth and capital preservation
-• **Liquidity Management**: Maintaining sufficient liquid assets for lifestyle needs
-• **Tax Efficiency**: Implementing structures to optimize after-tax returns
-
-**Celebrity-Specific Considerations:**
-• **Career Volatility**: Investment strategies adapted to irregular income patterns
-• **Public Scrutiny**: Avoiding controversial or reputation-damaging investments
-• **Lifestyle Requirements**: Balancing investment growth with liquidity needs
-• **Succession Planning**: Long-term wealth preservation and transfer strategies
-
-**Market Insights:**
-• **Emerging Trends**: Increased interest in ESG investments and sustainable assets
-• **Technology Integration**: Growing allocation to fintech and digital assets
-• **Geographic Expansion**: International diversification becoming more common
-• **Alternative Investments**: Rising interest in private equity and luxury assets"""
+        raise HTTPException(status_code=400, detail=f"Unknown source: {request.source}")
     
-    return {
-        "type": "text",
-        "data": text_response,
-        "metadata": {
-            "source": "enhanced_backend",
-            "query_type": "analytical_text",
-            "analysis_depth": "comprehensive"
+    logger.info(f"Streaming {request.source} rows for query: {request.query}")
+    chunks = ndjson_batches(batches)
+    
+    async def body():
+        # Each batch fetches from the open cursor, so it runs on the bounded
+        # database executor like every other database call
+        chunk = await run_blocking(next, chunks, None)
+        while chunk is not None:
+            yield chunk
+            chunk = await run_blocking(next, chunks, None)
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+@app.post("/export")
+async def export_query(request: ExportRequest):
+    """Download a result set as an Arrow IPC stream or a Parquet file"""
+    
+    from export import FORMATS, export_stream
+    
+    if request.format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    batch_size = max(1, min(request.batch_size, 100000))
+    if request.source == "portfolios":
+        batches = get_mysql_tool().stream_portfolio_batches(request.query, batch_size)
+    elif request.source == "transactions":
+        batches = get_mysql_tool().stream_transaction_batches(request.query, batch_size)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown source: {request.source}")
+    
+    # Run the query and write the first chunk before committing to a 200,
+    # so a missing pyarrow or a failing query still gets a proper status
+    chunks = export_stream(batches, request.format)
+    try:
+        first = await run_blocking(next, chunks, b"")
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=f"Export needs pyarrow: {str(e)}")
+    except Exception as e:
+        logger.error(f"Export failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    
+    async def body():
+        # Each chunk fetches from the open cursor, so it runs on the
+        # bounded database executor like every other MySQL call
+        chunk = first
+        while chunk is not None:
+            yield chunk
+            chunk = await run_blocking(next, chunks, None)
+    
+    media_type, extension = FORMATS[request.format]
+    logger.info(f"Exporting {request.source} as {request.format} for query: {request.query}")
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{request.source}.{extension}"'}
+    )
+
+@app.post("/clients/search")
+async def search_clients(request: ClientSearchRequest):
+    """Paginated client search; pass next_cursor back to get the next page"""
+    
+    try:
+        return await run_blocking(
+            lambda: get_mongo_tool().search_clients_page(
+                request.query, request.limit, request.cursor, request.fields
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Client search failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Client search failed: {str(e)}")
+
+@app.post("/clients/portfolios", response_model=QueryResponse)
+async def client_portfolios(request: ClientPortfoliosRequest):
+    """
+    Top holdings of clients matching a profile filter ("high risk mumbai
+    clients"), joined across MongoDB profiles and MySQL portfolios
+    """
+    
+    if not 1 <= request.limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    
+    try:
+        result = await run_blocking(
+            lambda: get_federated_planner().top_portfolios(
+                request.query, request.asset_type, request.min_amount, request.limit
+            )
+        )
+    except Exception as e:
+        logger.error(f"Client portfolio query failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Client portfolio query failed: {str(e)}")
+    
+    plan = result["plan"]
+    return QueryResponse(
+        type="table",
+        data=result["rows"],
+        metadata={
+            "source": "federated",
+            "query_type": "client_portfolios",
+            "record_count": len(result["rows"]),
+            "driver": plan.driver,
+            "client_estimate": plan.client_estimate,
+            "portfolio_estimate": plan.portfolio_estimate,
+            "pushed_ids": plan.pushed_ids,
+            "timings_ms": {step: round(ms, 2) for step, ms in plan.timings_ms.items()}
         }
-    }
+    )
+
+# Chart type and dataset label for each client distribution
+CLIENT_CHARTS = {
+    "risk_appetite": ("doughnut", "Risk Appetite Distribution"),
+    "city": ("bar", "Clients by City"),
+    "profession": ("pie", "Clients by Profession"),
+    "investment_preferences": ("bar", "Clients by Investment Preference"),
+}
+
+@app.get("/charts/clients/{dimension}", response_model=QueryResponse)
+async def client_distribution_chart(dimension: str, query: str = "", top_n: int = 10):
+    """Client distribution chart from counts grouped inside MongoDB"""
+    
+    if dimension not in CLIENT_CHARTS:
+        raise HTTPException(status_code=404, detail=f"Unknown chart: {dimension}")
+    
+    rows = await run_blocking(lambda: get_mongo_tool().get_distribution(dimension, query, top_n))
+    if rows and "error" in rows[0]:
+        raise HTTPException(status_code=500, detail=rows[0]["error"])
+    
+    chart_type, label = CLIENT_CHARTS[dimension]
+    return QueryResponse(
+        type="chart",
+        data=build_chart(chart_type, [row["label"] for row in rows], [row["count"] for row in rows], label),
+        metadata={
+            "source": "mongodb_aggregation",
+            "query_type": f"{dimension}_distribution",
+            "chart_type": chart_type
+        }
+    )
+
+# Rollup-backed charts: rollup accessor, chart type and dataset label
+ROLLUP_CHARTS = {
+    "rm_aum": ("aum_by_rm", "pie", "Portfolio Distribution by RM (₹ Crores)"),
+    "asset_allocation": ("allocation_by_asset", "pie", "Asset Allocation (₹ Crores)"),
+    "transaction_volume": ("transaction_volume", "bar", "Transaction Volume (₹ Crores)"),
+}
+
+@app.get("/charts/rollups/{name}", response_model=QueryResponse)
+async def rollup_chart(name: str):
+    """Chart read from the incrementally maintained rollups in O(groups)"""
+    
+    if name not in ROLLUP_CHARTS:
+        raise HTTPException(status_code=404, detail=f"Unknown chart: {name}")
+    
+    store = get_rollup_store()
+    max_age = settings.rollup_refresh_seconds
+    try:
+        await run_blocking(store.refresh_if_stale, max_age)
+    except Exception as e:
+        logger.error(f"Rollup refresh failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Rollup refresh failed: {str(e)}")
+    
+    accessor, chart_type, label = ROLLUP_CHARTS[name]
+    rows = getattr(store, accessor)()
+    if name == "transaction_volume":
+        labels = [f"{row['asset_type']} {row['transaction_type']}" for row in rows]
+        values = [round(row["total_amount"] / 1e7, 2) for row in rows]
+    else:
+        labels = [row["label"] for row in rows]
+        values = [round(row["value"] / 1e7, 2) for row in rows]
+    
+    return QueryResponse(
+        type="chart",
+        data=build_chart(chart_type, labels, values, label),
+        metadata={
+            "source": "rollups",
+            "query_type": f"{name}_chart",
+            "chart_type": chart_type,
+            "watermark": store.watermark
+        }
+    )
+
+@app.get("/charts/timeseries/transactions", response_model=QueryResponse)
+async def transaction_timeseries_chart(freq: str = "auto", points: int = 500, transaction_type: str = ""):
+    """Transaction amounts over time: day rollup in MySQL, day/week/month buckets and LTTB in NumPy"""
+    
+    from timeseries import FREQUENCIES, series_chart
+    
+    if freq != "auto" and freq not in FREQUENCIES:
+        raise HTTPException(status_code=400, detail=f"freq must be auto or one of {', '.join(FREQUENCIES)}")
+    if not 3 <= points <= 2000:
+        raise HTTPException(status_code=400, detail="points must be between 3 and 2000")
+    
+    rows = await run_blocking(get_mysql_tool().get_transaction_series, transaction_type or None)
+    if rows and "error" in rows[0]:
+        raise HTTPException(status_code=500, detail=rows[0]["error"])
+    
+    chart = series_chart(
+        [row["day"] for row in rows], [row["total_amount"] for row in rows],
+        "Transaction Volume (₹ Crores)", freq=freq, max_points=points, scale=1e-7
+    )
+    return QueryResponse(
+        type="chart",
+        data=chart,
+        metadata={
+            "source": "mysql",
+            "query_type": "transaction_timeseries",
+            "chart_type": "line",
+            "frequency": chart["frequency"],
+            "days": len(rows)
+        }
+    )
+
+@app.post("/agent/query")
+async def agent_query(request: AgentQueryRequest):
+    """Answer a query with the configured model (LLM_BACKEND); stream=true returns tokens as plain text"""
+    
+    agent = get_agent()
+    
+    if request.stream:
+        stream = agent.stream(request.query, timeout=request.timeout)
+        
+        # Wait for the first token before committing to a 200, so a model
+        # that fails or times out up front gets the same status as stream=false
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = ""
+        except Exception as e:
+            logger.error(f"Agent stream failed: {e}")
+            raise HTTPException(status_code=504 if isinstance(e, TimeoutError) else 502, detail=str(e))
+        
+        async def tokens():
+            yield first
+            try:
+                async for token in stream:
+                    yield token
+            except Exception as e:
+                # Headers are already sent; end the body with a marker the
+                # client can tell apart from a complete answer
+                logger.error(f"Agent stream failed: {e}")
+                yield f"{AGENT_STREAM_ERROR}{e}\n"
+        
+        return StreamingResponse(tokens(), media_type="text/plain; charset=utf-8")
+    
+    response = await agent.answer(request.query, timeout=request.timeout)
+    if response["type"] == "error":
+        raise HTTPException(status_code=504 if response["metadata"].get("timed_out") else 502, detail=response["data"])
+    return response
+
+@app.get("/agent/stats")
+async def agent_stats():
+    """Batching, prefix cache and timeout counters for the model client"""
+    return get_agent().client.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters for the query response caches"""
+    stats = response_cache.stats()
+    stats["semantic"] = get_semantic_cache().stats()
+    return stats
 
 if __name__ == "__main__":
+    import uvicorn
     print("🚀 Starting FIXED Wealth Query RAG Agent...")
     print("📊 Proper Chart/Table/Text Detection System")
     print("💼 Celebrity Wealth Management Platform")
@@ -0,0 +1,139 @@
+"""
+In-process response cache for the /query endpoint.
+
+Entries are keyed on a canonical form of the query and hold the final
+serialized response bytes, so a hit skips routing, model validation and
+JSON encoding entirely. Representations derived from a body (ETag,
+compressed and columnar variants) are kept per body digest, shared by the
+entries holding equal bytes and dropped with the last of them.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+    "ten": "10", "eleven": "11", "twelve": "12", "fifteen": "15",
+    "twenty": "20", "fifty": "50", "hundred": "100",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER_WORD = re.compile(r"\b(" + "|".join(NUMBER_WORDS) + r")\b")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query: lowercased, whitespace-collapsed and with
+    number words replaced by digits ("top five" -> "top 5").
+    """
+    text = _WHITESPACE.sub(" ", query.lower()).strip()
+    return _NUMBER_WORD.sub(lambda m: NUMBER_WORDS[m.group(1)], text)
+
+
+def body_digest(value: bytes) -> str:
+    """Content digest of a body; equal bytes share derived representations"""
+    return hashlib.blake2b(value, digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+
+    Values are opaque bytes. Expired entries are dropped lazily on access and
+    the least recently used entry is evicted once `max_entries` is reached.
+    Each value comes with a dict for representations derived from it, which
+    lives as long as some entry still holds those bytes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # body digest -> (entries holding it, derived representations)
+        self._derived: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached bytes for key, or None on a miss"""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Cached bytes for key and their derived representations, or None on a miss"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, digest = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._release(digest)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, self._derived[digest][1]
+
+    def put(self, key: str, value: bytes) -> Dict[str, Any]:
+        """
+        Store value under key, evicting the LRU entry if full. Returns the
+        dict for representations derived from value; a disabled cache hands
+        out a fresh one that nothing keeps.
+        """
+        if self.max_entries <= 0:
+            return {}
+        digest = body_digest(value)
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            holders = self._derived.setdefault(digest, [0, {}])
+            holders[0] += 1
+            self._entries[key] = (expires_at, value, digest)
+            if previous is not None:
+                self._release(previous[2])
+            while len(self._entries) > self.max_entries:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._release(evicted)
+                self.evictions += 1
+            return holders[1]
+
+    def _release(self, digest: str) -> None:
+        # Caller holds the lock
+        holders = self._derived[digest]
+        holders[0] -= 1
+        if not holders[0]:
+            del self._derived[digest]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._derived.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Counters used to size the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "distinct_bodies": len(self._derived),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,300 @@
+"""
+Retrieval for the text (RAG) route.
+
+`VectorIndex` keeps document vectors in one contiguous matrix, either
+float32 or int8 with a per-row scale, optionally memory-mapped from disk so
+a large index does not have to fit in RAM. Search is a blocked matmul over
+the live rows with `argpartition` for the top-k, and rows can be added,
+replaced and deleted without a rebuild (deleted slots are reused).
+
+`Retriever` builds the document store from the Mongo client profiles and
+the MySQL portfolio holdings, embeds it with the local HashingVectorizer
+and answers `search(query, k)` with the matching documents.
+"""
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from db.portfolio_summary import check_rows
+from embeddings import HashingVectorizer
+
+# Rows scored per matmul; bounds the temporary score matrix for big indexes
+SEARCH_BLOCK_ROWS = 65536
+
+
+class VectorIndex:
+    """
+    Flat inner-product index over unit vectors.
+
+    With `path` the vector matrix lives in `<path>.vectors` as a memmap and
+    `save()` writes ids/scales/deletions to `<path>.meta.npz`, so
+    `VectorIndex.open(path)` reloads it without re-embedding.
+    """
+
+    def __init__(self, dim: int, dtype: str = "float32", path: Optional[str] = None, capacity: int = 1024):
+        if dtype not in ("float32", "int8"):
+            raise ValueError("dtype must be 'float32' or 'int8'")
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.path = path
+        self.capacity = 0
+        self.size = 0
+        self._vectors = np.zeros((0, dim), dtype=self.dtype)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._reserve(max(capacity, 1))
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= self.capacity:
+            return
+        if self.path:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            # Growing the file zero-fills the new rows and keeps the old ones
+            mode = "r+b" if os.path.exists(self.path + ".vectors") else "w+b"
+            with open(self.path + ".vectors", mode) as handle:
+                handle.truncate(capacity * self.dim * self.dtype.itemsize)
+            vectors = np.memmap(self.path + ".vectors", dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+        else:
+            vectors = np.zeros((capacity, self.dim), dtype=self.dtype)
+            vectors[:self.size] = self._vectors[:self.size]
+        self._vectors = vectors
+        self._scales = _grow(self._scales, capacity)
+        self._ids = _grow(self._ids, capacity)
+        self._alive = _grow(self._alive, capacity)
+        self.capacity = capacity
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.dtype == np.float32:
+            return vectors, np.ones(len(vectors), dtype=np.float32)
+        # Symmetric per-row quantization: row * scale recovers the vector
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return int(doc_id) in self._slots
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Insert or replace rows; `vectors` is (n, dim) float32"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors differ in length")
+        encoded, scales = self._encode(vectors)
+
+        slots = np.empty(len(ids), dtype=np.int64)
+        for i, doc_id in enumerate(ids):
+            doc_id = int(doc_id)
+            slot = self._slots.get(doc_id)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    if self.size == self.capacity:
+                        self._reserve(max(self.capacity * 2, self.size + len(ids)))
+                    slot = self.size
+                    self.size += 1
+                self._slots[doc_id] = slot
+            slots[i] = slot
+
+        self._vectors[slots] = encoded
+        self._scales[slots] = scales
+        self._ids[slots] = [int(doc_id) for doc_id in ids]
+        self._alive[slots] = True
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """Drop rows by id; returns how many were present"""
+        removed = 0
+        for doc_id in ids:
+            slot = self._slots.pop(int(doc_id), None)
+            if slot is not None:
+                self._alive[slot] = False
+                self._free.append(slot)
+                removed += 1
+        return removed
+
+    def search(self, queries: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k ids and scores for each query row, best first.
+        Missing results (fewer than k live rows) are id -1, score -inf.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        count = len(queries)
+        best_scores = np.full((count, k), -np.inf, dtype=np.float32)
+        best_slots = np.full((count, k), -1, dtype=np.int64)
+        if not self._slots or k <= 0:
+            return np.full((count, k), -1, dtype=np.int64), best_scores
+
+        for start in range(0, self.size, SEARCH_BLOCK_ROWS):
+            stop = min(start + SEARCH_BLOCK_ROWS, self.size)
+            block = self._vectors[start:stop]
+            if self.dtype != np.float32:
+                block = block.astype(np.float32)
+            scores = queries @ block.T
+            if self.dtype != np.float32:
+                scores *= self._scales[start:stop]
+            scores[:, ~self._alive[start:stop]] = -np.inf
+
+            # Merge this block's candidates with the running top-k
+            take = min(k, stop - start)
+            part = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, axis=1)], axis=1)
+            merged_slots = np.concatenate([best_slots, part + start], axis=1)
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_slots = np.take_along_axis(merged_slots, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_slots = np.take_along_axis(best_slots, order, axis=1)
+        ids = np.where(np.isfinite(best_scores), self._ids[np.maximum(best_slots, 0)], -1)
+        return ids, best_scores
+
+    def save(self) -> None:
+        if not self.path:
+            raise ValueError("index has no path")
+        self._vectors.flush()
+        np.savez(
+            self.path + ".meta.npz",
+            dim=self.dim, dtype=str(self.dtype), size=self.size,
+            ids=self._ids[:self.size], scales=self._scales[:self.size], alive=self._alive[:self.size]
+        )
+
+    @classmethod
+    def open(cls, path: str) -> "VectorIndex":
+        meta = np.load(path + ".meta.npz")
+        index = cls.__new__(cls)
+        index.dim = int(meta["dim"])
+        index.dtype = np.dtype(str(meta["dtype"]))
+        index.path = path
+        index.size = int(meta["size"])
+        index.capacity = os.path.getsize(path + ".vectors") // (index.dim * index.dtype.itemsize)
+        index._vectors = np.memmap(path + ".vectors", dtype=index.dtype, mode="r+", shape=(index.capacity, index.dim))
+        index._ids = _grow(meta["ids"].astype(np.int64), index.capacity)
+        index._scales = _grow(meta["scales"].astype(np.float32), index.capacity)
+        index._alive = _grow(meta["alive"].astype(bool), index.capacity)
+        index._slots = {int(index._ids[slot]): slot for slot in np.flatnonzero(index._alive)}
+        index._free = [int(slot) for slot in np.flatnonzero(~index._alive[:index.size])]
+        return index
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:min(len(array), capacity)] = array[:capacity]
+    return grown
+
+
+def client_document(profile: Dict[str, Any]) -> str:
+    preferences = profile.get("investment_preferences") or []
+    if isinstance(preferences, str):
+        preferences = [preferences]
+    return (
+        f"{profile.get('name', 'Unknown client')}, {profile.get('profession', 'client')} from "
+        f"{profile.get('city', 'unknown city')}, age {profile.get('age', 'n/a')}. "
+        f"Risk appetite {profile.get('risk_appetite', 'unknown')}; prefers {', '.join(preferences) or 'no stated assets'}. "
+        f"Relationship manager {profile.get('relationship_manager', 'unassigned')}."
+    )
+
+
+def portfolio_document(client_id: Any, holdings: List[Dict[str, Any]], name: Optional[str] = None) -> str:
+    total = sum(float(row.get("total_amount") or 0) for row in holdings)
+    parts = ", ".join(
+        f"{row['asset_type']} ₹{float(row.get('total_amount') or 0) / 1e7:,.2f} Cr"
+        for row in sorted(holdings, key=lambda row: float(row.get("total_amount") or 0), reverse=True)
+    )
+    return f"Portfolio of {name or f'client {client_id}'}: total ₹{total / 1e7:,.2f} Cr across {parts}."
+
+
+class Retriever:
+    """Document store plus vector index behind the text route"""
+
+    def __init__(self, vectorizer: Optional[HashingVectorizer] = None, index: Optional[VectorIndex] = None,
+                 dtype: str = "float32", path: Optional[str] = None):
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.index = index or VectorIndex(self.vectorizer.dim, dtype=dtype, path=path)
+        self._documents: Dict[int, Dict[str, Any]] = {}
+        self._ids: Dict[str, int] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_documents(self, documents: Sequence[Dict[str, Any]]) -> None:
+        """Upsert documents shaped {"key": str, "text": str, ...}"""
+        ids = []
+        for document in documents:
+            doc_id = self._ids.get(document["key"])
+            if doc_id is None:
+                doc_id = self._ids[document["key"]] = self._next_id
+                self._next_id += 1
+            self._documents[doc_id] = dict(document)
+            ids.append(doc_id)
+        if ids:
+            self.index.add(ids, self.vectorizer.transform(document["text"] for document in documents))
+
+    def remove(self, keys: Iterable[str]) -> int:
+        ids = [self._ids.pop(key) for key in keys if key in self._ids]
+        for doc_id in ids:
+            self._documents.pop(doc_id, None)
+        return self.index.delete(ids)
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        ids, scores = self.index.search(self.vectorizer.transform_one(query), k)
+        results = []
+        for doc_id, score in zip(ids[0], scores[0]):
+            if doc_id < 0 or score < min_score:
+                continue
+            document = dict(self._documents[int(doc_id)])
+            document["score"] = round(float(score), 4)
+            results.append(document)
+        return results
+
+    def build(self, mongo_tool=None, mysql_tool=None, batch_size: int = 1000) -> int:
+        """Index client profiles and per-client holdings; returns the document count"""
+        names = {}
+        if mongo_tool is not None:
+            projection = {"_id": 0, "client_id": 1, "name": 1, "age": 1, "city": 1, "profession": 1,
+                          "risk_appetite": 1, "investment_preferences": 1, "relationship_manager": 1}
+            batch = []
+            for profile in mongo_tool.collection.find({}, projection).batch_size(batch_size):
+                key = f"client:{profile.get('client_id', profile.get('name'))}"
+                names[profile.get("client_id")] = profile.get("name")
+                batch.append({"key": key, "kind": "client", "client_id": profile.get("client_id"),
+                              "text": client_document(profile)})
+                if len(batch) >= batch_size:
+                    self.add_documents(batch)
+                    batch = []
+            self.add_documents(batch)
+
+        if mysql_tool is not None:
+            rows = check_rows(mysql_tool._execute_sql("""
+                SELECT client_id, asset_type, SUM(amount) AS total_amount
+                FROM portfolios
+                GROUP BY client_id, asset_type
+            """))
+            holdings: Dict[Any, List[Dict[str, Any]]] = {}
+            for row in rows:
+                holdings.setdefault(row["client_id"], []).append(row)
+            self.add_documents([
+                {"key": f"portfolio:{client_id}", "kind": "portfolio", "client_id": client_id,
+                 "text": portfolio_document(client_id, client_rows, names.get(client_id))}
+                for client_id, client_rows in holdings.items()
+            ])
+
+        return len(self)
+
+
+def format_context(documents: List[Dict[str, Any]]) -> str:
+    """Markdown section listing retrieved documents for a text answer"""
+    if not documents:
+        return ""
+    lines = "\n".join(f"• {document['text']}" for document in documents)
+    return f"**Relevant Client Context:**\n{lines}"
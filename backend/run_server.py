@@ -2,11 +2,10 @@
 Server startup script for the Wealth Query RAG Agent
 """
 import uvicorn
-import os
-from dotenv import load_dotenv
+from settings import get_settings
 
-# Load environment variables
-load_dotenv()
+# Load environment variables once for this process
+get_settings()
 
 if __name__ == "__main__":
     # Seed the databases on startup
@@ -0,0 +1,110 @@
+"""
+Near-duplicate query cache.
+
+Sits behind the exact-match ResponseCache: a query that misses there is
+embedded with the local HashingVectorizer and answered from the most
+similar cached query, provided the cosine similarity clears `threshold`.
+Vectors live in one preallocated float32 matrix, so a lookup is a single
+matrix-vector product over the occupied rows.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from embeddings import HashingVectorizer
+
+
+class SemanticCache:
+    """
+    Thread-safe similarity cache with a per-entry TTL.
+
+    Entries may carry a `tag` and a lookup only considers entries with the
+    same tag, for callers that already know which answers are comparable.
+    When full, the oldest entry is overwritten.
+    """
+
+    def __init__(self, max_entries: int = 1024, threshold: float = 0.9, ttl_seconds: float = 300.0,
+                 vectorizer: Optional[HashingVectorizer] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((max(max_entries, 0), self.vectorizer.dim), dtype=np.float32)
+        self._expires = np.zeros(max(max_entries, 0), dtype=np.float64)
+        self._tags = np.full(max(max_entries, 0), -1, dtype=np.int32)
+        self._tag_codes: Dict[str, int] = {}
+        self._keys = [None] * max(max_entries, 0)
+        self._values = [None] * max(max_entries, 0)
+        self._size = 0
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _tag_code(self, tag: Optional[str]) -> int:
+        return self._tag_codes.setdefault(tag or "", len(self._tag_codes))
+
+    def lookup(self, query: str, tag: Optional[str] = None) -> Optional[Tuple[str, Any, float]]:
+        """(cached_query, value, similarity) of the nearest live match, or None"""
+        if self.max_entries <= 0:
+            return None
+        vector = self.vectorizer.transform_one(query)
+        now = self._clock()
+        with self._lock:
+            if not self._size:
+                self.misses += 1
+                return None
+            scores = self._matrix[:self._size] @ vector
+            live = (self._expires[:self._size] > now) & (self._tags[:self._size] == self._tag_code(tag))
+            scores[~live] = -1.0
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._keys[best], self._values[best], similarity
+
+    def get(self, query: str, tag: Optional[str] = None) -> Any:
+        match = self.lookup(query, tag)
+        return match[1] if match else None
+
+    def put(self, query: str, value: Any, tag: Optional[str] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        vector = self.vectorizer.transform_one(query)
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            slot = self._next
+            self._matrix[slot] = vector
+            self._expires[slot] = expires_at
+            self._tags[slot] = self._tag_code(tag)
+            self._keys[slot] = query
+            self._values[slot] = value
+            self._next = (slot + 1) % self.max_entries
+            self._size = max(self._size, slot + 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires[:] = 0
+            self._keys = [None] * self.max_entries
+            self._values = [None] * self.max_entries
+            self._size = 0
+            self._next = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "dim": self.vectorizer.dim,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
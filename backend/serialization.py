@@ -0,0 +1,91 @@
+"""
+JSON encoding helpers shared by the API responses.
+
+Prefers orjson when it is installed and falls back to the stdlib encoder.
+"""
+import datetime
+import decimal
+import json
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+def json_default(value: Any) -> Any:
+    """Encode the non-JSON types database drivers hand back"""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a payload to compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=json_default)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"),
+                      default=json_default).encode("utf-8")
+
+
+def ndjson_batches(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Encode row batches as NDJSON, one chunk per batch"""
+    for rows in batches:
+        if rows:
+            yield b"\n".join(encode_json(row) for row in rows) + b"\n"
+
+
+def decode_json(body: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+# Opt-in wire format for table responses: keys sent once instead of per row
+COLUMNAR_MEDIA_TYPE = "application/vnd.wealth.columnar+json"
+TABLE_FORMATS = ("records", "columnar")
+
+
+def columnar_table(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    {"columns": [...], "rows": [[...], ...]} for a list of row dicts.
+    Columns follow the first row; keys that only appear later are appended
+    and missing values become null.
+    """
+    if not rows:
+        return {"columns": [], "rows": []}
+    columns = list(rows[0])
+    width = len(columns)
+    if width > 1 and all(len(row) == width for row in rows):
+        try:
+            # Same size and every first-row key present means the same keys;
+            # tuples encode as JSON arrays
+            return {"columns": columns, "rows": list(map(itemgetter(*columns), rows))}
+        except KeyError:
+            pass
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    return {"columns": columns, "rows": [[row.get(key) for key in columns] for row in rows]}
+
+
+def columnar_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Table payloads re-shaped to the columnar format; anything else as-is"""
+    if payload.get("type") != "table" or not isinstance(payload.get("data"), list):
+        return payload
+    metadata = dict(payload.get("metadata") or {}, table_format="columnar")
+    return dict(payload, data=columnar_table(payload["data"]), metadata=metadata)
+
+
+def columnar_body(body: bytes) -> bytes:
+    """
+    Columnar variant of an encoded response; /query keeps it with the
+    response cache's entry. Non-table bodies come back unchanged.
+    """
+    if b'"table"' not in body:
+        return body
+    return encode_json(columnar_payload(decode_json(body)))
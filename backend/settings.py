@@ -0,0 +1,129 @@
+"""
+Backend configuration.
+
+`.env` is read once, on the first get_settings() call, and every module
+takes its configuration from the returned Settings instead of calling
+load_dotenv() and os.getenv() itself. Variables already set in the process
+environment win over `.env`.
+"""
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional
+
+
+def _int(env: Mapping[str, str], name: str, default: int) -> int:
+    return int(env.get(name) or default)
+
+
+def _float(env: Mapping[str, str], name: str, default: float) -> float:
+    return float(env.get(name) or default)
+
+
+@dataclass(frozen=True)
+class Settings:
+    # Databases
+    mongo_uri: Optional[str] = None
+    mongo_db: str = "wealth_db"
+    mysql_host: Optional[str] = None
+    mysql_user: Optional[str] = None
+    mysql_password: Optional[str] = None
+    mysql_db: Optional[str] = None
+    mysql_pool_size: int = 5
+    mysql_pool_max_overflow: int = 5
+    mysql_pool_recycle_uses: int = 1000
+    mysql_pool_recycle_seconds: float = 3600.0
+    mysql_pool_timeout: float = 30.0
+    mysql_async_threads: int = 8
+    bulk_batch_size: int = 5000
+
+    # /query caches and batching
+    query_cache_size: int = 256
+    query_cache_ttl: float = 300.0
+    semantic_cache_size: int = 512
+    semantic_cache_threshold: float = 0.85
+    max_batch_queries: int = 50
+    batch_query_concurrency: int = 8
+    rollup_refresh_seconds: float = 30.0
+    rollup_rebuild_seconds: float = 900.0
+    compress_min_bytes: int = 1024
+
+    # Retrieval for text answers
+    rag_index: bool = False
+    rag_index_dtype: str = "float32"
+    rag_index_path: Optional[str] = None
+    rag_top_k: int = 3
+    rag_min_score: float = 0.2
+
+    # Model client
+    llm_backend: str = "stub"
+    openai_api_key: Optional[str] = None
+    openai_model: str = "gpt-4o-mini"
+    llm_max_batch_size: int = 8
+    llm_max_wait_ms: float = 5.0
+    llm_timeout: float = 30.0
+    llm_stub_first_token_ms: float = 40.0
+    llm_stub_tokens_per_second: float = 400.0
+    llm_stub_slots: int = 1
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "Settings":
+        return cls(
+            mongo_uri=env.get("MONGO_URI") or None,
+            mongo_db=env.get("MONGO_DB") or "wealth_db",
+            mysql_host=env.get("MYSQL_HOST"),
+            mysql_user=env.get("MYSQL_USER"),
+            mysql_password=env.get("MYSQL_PASSWORD"),
+            mysql_db=env.get("MYSQL_DB"),
+            mysql_pool_size=_int(env, "MYSQL_POOL_SIZE", 5),
+            mysql_pool_max_overflow=_int(env, "MYSQL_POOL_MAX_OVERFLOW", 5),
+            mysql_pool_recycle_uses=_int(env, "MYSQL_POOL_RECYCLE_USES", 1000),
+            mysql_pool_recycle_seconds=_float(env, "MYSQL_POOL_RECYCLE_SECONDS", 3600),
+            mysql_pool_timeout=_float(env, "MYSQL_POOL_TIMEOUT", 30),
+            mysql_async_threads=_int(env, "MYSQL_ASYNC_THREADS", 8),
+            bulk_batch_size=_int(env, "BULK_BATCH_SIZE", 5000),
+            query_cache_size=_int(env, "QUERY_CACHE_SIZE", 256),
+            query_cache_ttl=_float(env, "QUERY_CACHE_TTL", 300),
+            semantic_cache_size=_int(env, "SEMANTIC_CACHE_SIZE", 512),
+            semantic_cache_threshold=_float(env, "SEMANTIC_CACHE_THRESHOLD", 0.85),
+            max_batch_queries=_int(env, "MAX_BATCH_QUERIES", 50),
+            batch_query_concurrency=_int(env, "BATCH_QUERY_CONCURRENCY", 8),
+            rollup_refresh_seconds=_float(env, "ROLLUP_REFRESH_SECONDS", 30),
+            rollup_rebuild_seconds=_float(env, "ROLLUP_REBUILD_SECONDS", 900),
+            compress_min_bytes=_int(env, "COMPRESS_MIN_BYTES", 1024),
+            rag_index=env.get("RAG_INDEX") == "1",
+            rag_index_dtype=env.get("RAG_INDEX_DTYPE") or "float32",
+            rag_index_path=env.get("RAG_INDEX_PATH") or None,
+            rag_top_k=_int(env, "RAG_TOP_K", 3),
+            rag_min_score=_float(env, "RAG_MIN_SCORE", 0.2),
+            llm_backend=env.get("LLM_BACKEND") or "stub",
+            openai_api_key=env.get("OPENAI_API_KEY"),
+            openai_model=env.get("OPENAI_MODEL") or "gpt-4o-mini",
+            llm_max_batch_size=_int(env, "LLM_MAX_BATCH_SIZE", 8),
+            llm_max_wait_ms=_float(env, "LLM_MAX_WAIT_MS", 5),
+            llm_timeout=_float(env, "LLM_TIMEOUT", 30),
+            llm_stub_first_token_ms=_float(env, "LLM_STUB_FIRST_TOKEN_MS", 40),
+            llm_stub_tokens_per_second=_float(env, "LLM_STUB_TOKENS_PER_SECOND", 400),
+            llm_stub_slots=_int(env, "LLM_STUB_SLOTS", 1),
+        )
+
+    @property
+    def mysql_config(self) -> Dict[str, Any]:
+        return {
+            "host": self.mysql_host,
+            "user": self.mysql_user,
+            "password": self.mysql_password,
+            "database": self.mysql_db,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings for this process, loading `.env` on the first call"""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:  # python-dotenv is optional outside development
+        pass
+    else:
+        load_dotenv()
+    return Settings.from_env()
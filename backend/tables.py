@@ -0,0 +1,235 @@
+"""
+Columnar table builder.
+
+Turns raw database rows (a list of dicts, e.g. from MySQLTool) or a column
+batch (a dict of equal-length sequences) into the display rows TableResponse
+renders: ranked by an amount column, with amounts formatted as INR crore /
+lakh strings, optional share-of-group percentages and period-over-period
+growth. Ranking, grouping and rounding run as NumPy array operations;
+strings are produced in one pass per column and rows are zipped once at
+the end.
+"""
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+CRORE = 10_000_000
+LAKH = 100_000
+
+Rows = Sequence[Mapping[str, Any]]
+Columns = Mapping[str, Sequence[Any]]
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """
+    How to shape one kind of table.
+
+    `columns` are (output key, source column) pairs copied through as-is,
+    `money` pairs are formatted as INR. `share` is (output key, amount
+    column, group column or None for the whole table) and `growth` is
+    (output key, current column, previous column).
+    """
+    sort_by: str
+    columns: Tuple[Tuple[str, str], ...] = ()
+    money: Tuple[Tuple[str, str], ...] = ()
+    rank_key: Optional[str] = "rank"
+    share: Optional[Tuple[str, str, Optional[str]]] = None
+    growth: Optional[Tuple[str, str, str]] = None
+
+    def source_columns(self) -> List[str]:
+        names = [self.sort_by] + [source for _, source in self.columns + self.money]
+        if self.share:
+            names += [name for name in self.share[1:] if name]
+        if self.growth:
+            names += list(self.growth[1:])
+        return list(dict.fromkeys(names))
+
+
+def to_columns(data: Union[Rows, Columns], names: Sequence[str]) -> Dict[str, Sequence[Any]]:
+    """Column batch for `names` from either input shape"""
+    if isinstance(data, Mapping):
+        return {name: data[name] for name in names}
+    return {name: list(map(itemgetter(name), data)) for name in names}
+
+
+def to_float(values: Sequence[Any]) -> np.ndarray:
+    """float64 array from numbers, Decimals or None (-> NaN)"""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "fiu":
+        return values.astype(np.float64, copy=False)
+    try:
+        return np.array(values, dtype=np.float64)
+    except TypeError:  # NULLs from the database
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def rank_order(values: np.ndarray, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row order, largest first (ties in input order, missing values last), and
+    the matching 1-based competition ranks (1, 2, 2, 4). With `limit` only
+    the first `limit` rows are ordered, via a partition instead of a full sort.
+    """
+    keys = -values
+    candidates = None
+    if limit is not None and limit < len(values):
+        cutoff = np.partition(keys, limit - 1)[limit - 1]
+        if not np.isnan(cutoff):
+            # Everything tied with the cutoff competes, so the cut stays stable
+            candidates = np.flatnonzero(keys <= cutoff)
+    if candidates is None:
+        order = np.argsort(keys, kind="stable")
+    else:
+        order = candidates[np.argsort(keys[candidates], kind="stable")]
+    order = order[:limit]
+
+    ordered = values[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ranks = np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0)) + 1
+    return order, ranks
+
+
+def factorize(values: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct values, sorted, and each row's index into them"""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biufmMUS":
+        return np.unique(values, return_inverse=True)
+
+    # Hash instead of sorting every row: only the distinct values get sorted
+    index: Dict[Any, Any] = dict.fromkeys(values)
+    distinct = np.empty(len(index), dtype=object)
+    distinct[:] = list(index)
+    for code, value in enumerate(distinct.tolist()):
+        index[value] = code
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int64, count=len(values))
+    try:
+        order = np.argsort(distinct, kind="stable")
+    except TypeError:  # mixed types or None, e.g. a nullable column
+        order = np.argsort(distinct.astype(str), kind="stable")
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    return distinct[order], position[codes]
+
+
+def group_totals(amounts: np.ndarray, groups: Optional[Sequence[Any]] = None) -> np.ndarray:
+    """Per-row total of the row's group (or the grand total), ignoring missing amounts"""
+    clean = np.nan_to_num(amounts)
+    if groups is None:
+        return np.full(len(amounts), clean.sum())
+    _, inverse = factorize(groups)
+    return np.bincount(inverse, weights=clean)[inverse]
+
+
+def percent_of(amounts: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(totals != 0, np.nan_to_num(amounts) / totals * 100, 0.0)
+
+
+def growth_rate(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Percentage change; NaN where there is no usable previous value"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous > 0, (current - previous) / previous * 100, np.nan)
+
+
+_MISSING = np.iinfo(np.int64).min
+
+
+def _render_codes(codes: np.ndarray, render: Callable[[int], str]) -> List[Optional[str]]:
+    """
+    Strings for integer display codes. Rounded amounts repeat heavily, so
+    each distinct code is rendered once and fanned back out by index.
+    """
+    distinct, inverse = np.unique(codes, return_inverse=True)
+    strings = np.array([None if code == _MISSING else render(code) for code in distinct.tolist()], dtype=object)
+    return strings[inverse].tolist()
+
+
+def _render_inr(code: int) -> str:
+    tenths, in_crore = divmod(abs(code), 2)
+    whole, frac = divmod(tenths, 10)
+    return f"{'-' if code < 0 else ''}₹{whole:,}{f'.{frac}' if frac else ''} {'Cr' if in_crore else 'L'}"
+
+
+def format_inr(amounts: np.ndarray) -> List[Optional[str]]:
+    """
+    "₹156 Cr", "₹17.8 Cr", "₹1,050 Cr", "₹45.5 L" - one decimal, trailing
+    ".0" dropped, lakhs below one crore. None for missing values.
+    """
+    magnitude = np.abs(np.nan_to_num(amounts))
+    crore_tenths = np.rint(magnitude / (CRORE / 10)).astype(np.int64)
+    lakh_tenths = np.rint(magnitude / (LAKH / 10)).astype(np.int64)
+    in_crore = crore_tenths >= 10
+    # Code: tenths of the display unit, unit in the low bit, sign of the amount
+    codes = np.where(in_crore, crore_tenths, lakh_tenths) * 2 + in_crore
+    codes = np.where(amounts < 0, -codes, codes)
+    codes[np.isnan(amounts)] = _MISSING
+    return _render_codes(codes, _render_inr)
+
+
+def format_percent(values: np.ndarray, signed: bool = False) -> List[Optional[str]]:
+    """"40.0%" ("+12.5%" when signed), None for NaN"""
+    template = "{:+.1f}%" if signed else "{:.1f}%"
+    codes = np.rint(np.nan_to_num(values) * 10).astype(np.int64)
+    codes[np.isnan(values)] = _MISSING
+    return _render_codes(codes, lambda code: template.format(code / 10))
+
+
+def build_table(data: Union[Rows, Columns], spec: TableSpec, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Display rows for `data`, largest `spec.sort_by` first, at most `limit` of them"""
+    columns = to_columns(data, spec.source_columns())
+    amounts = to_float(columns[spec.sort_by])
+    if not len(amounts):
+        return []
+
+    order, ranks = rank_order(amounts, limit)
+
+    keys, values = [], []
+    if spec.rank_key:
+        keys.append(spec.rank_key)
+        values.append(ranks.tolist())
+    for key, source in spec.columns:
+        keys.append(key)
+        values.append(np.asarray(columns[source], dtype=object)[order].tolist())
+    for key, source in spec.money:
+        source_values = amounts if source == spec.sort_by else to_float(columns[source])
+        keys.append(key)
+        values.append(format_inr(source_values[order]))
+    if spec.share:
+        share_key, share_amount, share_group = spec.share
+        share_values = amounts if share_amount == spec.sort_by else to_float(columns[share_amount])
+        # Totals cover every row, not just the ones that made the cut
+        totals = group_totals(share_values, columns[share_group] if share_group else None)
+        keys.append(share_key)
+        values.append(format_percent(percent_of(share_values[order], totals[order])))
+    if spec.growth:
+        growth_key, current, previous = spec.growth
+        rates = growth_rate(to_float(columns[current])[order], to_float(columns[previous])[order])
+        keys.append(growth_key)
+        values.append(format_percent(rates, signed=True))
+
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+# Specs for the row shapes MySQLTool returns, keyed by table category
+TABLE_SPECS = {
+    "portfolio_ranking": TableSpec(
+        sort_by="amount",
+        columns=(("client_id", "client_id"), ("primary_asset", "asset_type"), ("stock_symbol", "stock_symbol")),
+        money=(("portfolio_value", "amount"),),
+        share=("percentage_of_portfolio", "amount", "client_id"),
+    ),
+    "rm_performance": TableSpec(
+        sort_by="total_aum",
+        columns=(("rm_name", "manager_name"), ("client_count", "client_count")),
+        money=(("total_aum", "total_aum"), ("avg_portfolio", "avg_portfolio_value")),
+        share=("share_of_aum", "total_aum", None),
+    ),
+    "stock_holdings": TableSpec(
+        sort_by="amount",
+        rank_key=None,
+        columns=(("client_id", "client_id"), ("stock_symbol", "stock_symbol")),
+        money=(("holding_value", "amount"),),
+        share=("percentage_of_portfolio", "amount", "client_id"),
+    ),
+}
@@ -0,0 +1,41 @@
+import os
+import re
+import sys
+
+import pytest
+
+# Tests import backend modules the way main.py does (e.g. `db.mysql_pool`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import get_settings
+
+
+@pytest.fixture
+def mongo_db():
+    """Database on the configured MongoDB; skipped without MONGO_URI or a reachable server"""
+    settings = get_settings()
+    if not settings.mongo_uri:
+        pytest.skip("MONGO_URI not set")
+    pymongo = pytest.importorskip("pymongo")
+    client = pymongo.MongoClient(settings.mongo_uri, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except pymongo.errors.PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB not reachable: {e}")
+    yield client[settings.mongo_db]
+    client.close()
+
+
+@pytest.fixture
+def mongo_tool(mongo_db, request):
+    """MongoDBTool pointed at a scratch collection that is dropped afterwards"""
+    from db.mongo_connect import MongoDBTool
+
+    tool = MongoDBTool.__new__(MongoDBTool)
+    tool.client = mongo_db.client
+    tool.db = mongo_db
+    tool.collection = mongo_db[re.sub(r"\W+", "_", f"test_{request.node.name}")[:60]]
+    tool.collection.drop()
+    yield tool
+    tool.collection.drop()
@@ -0,0 +1,70 @@
+"""
+AsyncMySQLTool's thread-pool path against a stand-in tool whose queries
+sleep: concurrent queries overlap, and no more of them run at once than
+the bounded executor has threads.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from db.async_mysql_connect import AsyncMySQLTool
+from db.mysql_connect import MySQLTool
+from settings import get_settings
+
+DELAY = 0.1
+
+
+class SlowStandInTool(MySQLTool):
+    """MySQLTool whose queries just sleep, for running without a database"""
+
+    def __init__(self, delay: float):
+        super().__init__({"host": "stand-in"})
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _execute_sql(self, query):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return [{"slept": self.delay}]
+
+
+async def timed_gather(tool, count):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(tool._execute_sql("SELECT SLEEP(0.1)") for _ in range(count)))
+    return time.perf_counter() - start, results
+
+
+@pytest.fixture
+def stand_in():
+    return SlowStandInTool(DELAY)
+
+
+def test_concurrent_queries_take_about_one_query(stand_in):
+    threads = get_settings().mysql_async_threads
+    tool = AsyncMySQLTool(use_driver=False, sync_tool=stand_in)
+
+    elapsed, results = asyncio.run(timed_gather(tool, threads))
+
+    assert results == [[{"slept": DELAY}]] * threads
+    assert stand_in.peak == threads
+    # Back to back this would take threads * DELAY
+    assert elapsed < 2 * DELAY
+
+
+def test_concurrency_capped_at_async_threads(stand_in):
+    threads = get_settings().mysql_async_threads
+    tool = AsyncMySQLTool(use_driver=False, sync_tool=stand_in)
+
+    elapsed, _ = asyncio.run(timed_gather(tool, 3 * threads))
+
+    assert stand_in.peak == threads
+    # Three waves of `threads` queries each
+    assert 3 * DELAY * 0.9 <= elapsed < 5 * DELAY
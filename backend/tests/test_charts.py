@@ -0,0 +1,97 @@
+"""
+Chart shaping: group-by over rows and column batches, values that are not
+plain numbers, top-N with "Other", and line charts with NULL labels.
+"""
+import decimal
+
+import pytest
+
+from charts import MAX_SLICES, OTHER_LABEL, group_rows, shape_chart
+
+np = pytest.importorskip("numpy")
+
+
+def make_rows(count, labels, seed=3):
+    rng = np.random.default_rng(seed)
+    return [{"symbol": f"SYM{int(rng.integers(labels)):04d}", "amount": float(rng.uniform(1, 100))}
+            for _ in range(count)]
+
+
+def to_batch(rows):
+    return {"symbol": np.array([row["symbol"] for row in rows]),
+            "amount": np.array([row["amount"] for row in rows])}
+
+
+@pytest.mark.parametrize("labels", [1, 7, 500])
+def test_column_batch_matches_rows(labels):
+    rows = make_rows(3000, labels)
+    batch = to_batch(rows)
+
+    by_rows = group_rows(rows, "symbol", "amount")
+    by_columns = group_rows(batch, "symbol", "amount")
+
+    assert list(by_columns) == list(by_rows)  # first-seen order
+    assert by_columns == pytest.approx(by_rows)
+    assert group_rows(batch, "symbol") == group_rows(rows, "symbol")
+
+
+def test_numeric_and_bytes_label_columns():
+    codes = np.array([3, 1, 3, 2, 1, 3])
+    amounts = np.array([1.0, 2.0, 3.0, np.nan, 5.0, 6.0])
+    assert group_rows({"code": codes, "amount": amounts}, "code", "amount") == {3: 10.0, 1: 7.0, 2: 0.0}
+
+    names = np.array([b"ab", b"a", b"ab", b""])
+    assert group_rows({"name": names}, "name") == {b"ab": 2.0, b"a": 1.0, b"": 1.0}
+
+
+def test_object_columns_take_the_dict_path():
+    batch = {"symbol": np.array(["A", None, "A"], dtype=object), "amount": np.array([1, 2, 3], dtype=object)}
+    assert group_rows(batch, "symbol", "amount") == {"A": 4.0, None: 2.0}
+
+
+def test_values_that_are_not_plain_numbers():
+    rows = [
+        {"label": "a", "value": 1.5},
+        {"label": "a", "value": decimal.Decimal("2.5")},
+        {"label": "b", "value": "4"},
+        {"label": "b", "value": "n/a"},
+        {"label": "c", "value": None},
+        {"label": "c"},
+    ]
+    # Numeric strings and Decimals are converted; NULLs, missing values and
+    # text add nothing but keep their label
+    assert group_rows(rows, "label", "value") == {"a": 4.0, "b": 4.0, "c": 0.0}
+
+    chart = shape_chart("bar", rows, "label", "value", "Totals")
+    assert chart["labels"] == ["a", "b", "c"]
+    assert chart["datasets"][0]["data"] == [4.0, 4.0, 0.0]
+
+
+def test_totals_are_plain_floats():
+    rows = [{"label": "a", "value": np.float64(1.5)}, {"label": "a", "value": np.float64(2.0)}]
+    totals = group_rows(rows, "label", "value")
+    assert totals == {"a": 3.5} and type(totals["a"]) is float
+
+
+def test_line_chart_with_null_labels():
+    rows = [
+        {"month": "2024-02", "amount": 2.0},
+        {"month": None, "amount": 5.0},
+        {"month": "2024-01", "amount": 1.0},
+        {"month": 7, "amount": 3.0},
+    ]
+    chart = shape_chart("line", rows, "month", "amount", "Volume")
+
+    assert chart["labels"] == ["2024-01", "2024-02", "7", "None"]
+    assert chart["datasets"][0]["data"] == [1.0, 2.0, 3.0, 5.0]
+
+
+def test_category_chart_capped_with_other():
+    rows = make_rows(5000, 200)
+    chart = shape_chart("pie", rows, "symbol", "amount", "Holdings")
+    values = chart["datasets"][0]["data"]
+
+    assert len(chart["labels"]) == MAX_SLICES and chart["labels"][-1] == OTHER_LABEL
+    assert values[:-1] == sorted(values[:-1], reverse=True)
+    assert sum(values) == pytest.approx(sum(row["amount"] for row in rows), rel=1e-6)
+    assert shape_chart("pie", to_batch(rows), "symbol", "amount", "Holdings") == chart
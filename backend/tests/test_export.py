@@ -0,0 +1,60 @@
+import datetime
+import decimal
+import io
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from export import export_stream
+
+
+def read(body, fmt):
+    if fmt == "arrow":
+        return pa.ipc.open_stream(body).read_all()
+    return pq.read_table(io.BytesIO(body))
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_typed_columns_round_trip(fmt):
+    fields = [("client_id", "int"), ("amount", "decimal"), ("as_of", "date"), ("note", "auto")]
+    batches = [
+        (fields, [(1, decimal.Decimal("12.50"), datetime.date(2024, 1, 1), "a")]),
+        (fields, [(2, decimal.Decimal("3.25"), datetime.date(2024, 1, 2), None)]),
+    ]
+    table = read(b"".join(export_stream(iter(batches), fmt, row_group_rows=1)), fmt)
+    assert table.to_pydict() == {
+        "client_id": [1, 2],
+        "amount": [12.5, 3.25],
+        "as_of": [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)],
+        "note": ["a", None],
+    }
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_empty_result_keeps_schema(fmt):
+    batches = [([("client_id", "int"), ("name", "string")], [])]
+    table = read(b"".join(export_stream(iter(batches), fmt)), fmt)
+    assert table.num_rows == 0
+    assert table.schema.names == ["client_id", "name"]
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_auto_column_null_in_first_batch(fmt):
+    # TIME/JSON/BIT/BLOB columns have no fixed kind; when the first batch is
+    # all null the column is frozen as string and later values are coerced
+    fields = [("value", "auto")]
+    batches = [
+        (fields, [(None,)]),
+        (fields, [(5,), (b"\x01",), (datetime.timedelta(hours=1),)]),
+    ]
+    table = read(b"".join(export_stream(iter(batches), fmt)), fmt)
+    assert table.column("value").to_pylist() == [None, "5", "\x01", "1:00:00"]
+
+
+def test_auto_column_later_batch_cast_to_first_type():
+    fields = [("value", "auto")]
+    batches = [(fields, [(1.5,)]), (fields, [(2,)])]
+    table = read(b"".join(export_stream(iter(batches), "arrow")), "arrow")
+    assert table.column("value").to_pylist() == [1.5, 2.0]
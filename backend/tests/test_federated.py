@@ -0,0 +1,213 @@
+"""
+Federated planner: side choice from the estimates, chunked IN / $in
+pushdown, the in-memory hash join and the /clients/portfolios endpoint.
+"""
+import pytest
+
+from db import federated
+from db.federated import (
+    IN_CHUNK_SIZE, FederatedPlanner, MongoClientSource, MySQLPortfolioSource, hash_join
+)
+
+
+class StandInClients:
+    def __init__(self, profiles, estimate):
+        self.profiles = profiles
+        self.estimate_value = estimate
+        self.fetched = []
+
+    def estimate(self, query):
+        return self.estimate_value
+
+    def fetch(self, query, client_ids=None):
+        self.fetched.append(client_ids)
+        wanted = None if client_ids is None else set(client_ids)
+        return [dict(p) for p in self.profiles if wanted is None or p["client_id"] in wanted]
+
+
+class StandInPortfolios:
+    def __init__(self, holdings, estimate):
+        self.holdings = holdings
+        self.estimate_value = estimate
+        self.fetched = []
+
+    def estimate(self, filters):
+        return self.estimate_value
+
+    def fetch(self, filters, client_ids=None, limit=None):
+        self.fetched.append(client_ids)
+        wanted = None if client_ids is None else set(client_ids)
+        return [dict(h) for h in self.holdings if wanted is None or h["client_id"] in wanted]
+
+
+class RecordingSQLTool:
+    def __init__(self):
+        self.statements = []
+
+    def _execute_sql(self, query, params=None):
+        self.statements.append((query, params))
+        if query.startswith("EXPLAIN"):
+            return [{"rows": 42}]
+        return [{"client_id": params[-1], "amount": 1}] if params else []
+
+
+PROFILES = [{"client_id": 1, "name": "A"}, {"client_id": 2, "name": "B"}, {"client_id": 3, "name": "C"}]
+HOLDINGS = [
+    {"client_id": 1, "asset_type": "Stocks", "amount": 50},
+    {"client_id": 2, "asset_type": "Gold", "amount": 300},
+    {"client_id": 4, "asset_type": "Bonds", "amount": 900},
+    {"client_id": 1, "asset_type": "Gold", "amount": 75},
+]
+
+
+@pytest.mark.parametrize("client_estimate, portfolio_estimate, driver", [
+    (10, 5000, "clients"),
+    (5000, 10, "portfolios"),
+    (100, 100, "clients"),
+    (0, 0, "clients"),
+])
+def test_plan_picks_more_selective_side(client_estimate, portfolio_estimate, driver):
+    planner = FederatedPlanner(client_source=StandInClients(PROFILES, client_estimate),
+                               portfolio_source=StandInPortfolios(HOLDINGS, portfolio_estimate))
+
+    plan = planner.plan("high risk clients", {})
+
+    assert (plan.driver, plan.client_estimate, plan.portfolio_estimate) == (
+        driver, client_estimate, portfolio_estimate
+    )
+
+
+def test_clients_driver_pushes_client_ids():
+    clients = StandInClients(PROFILES, 3)
+    portfolios = StandInPortfolios(HOLDINGS, 1000)
+    result = FederatedPlanner(client_source=clients, portfolio_source=portfolios).top_portfolios("x", limit=10)
+
+    assert clients.fetched == [None]
+    assert portfolios.fetched == [[1, 2, 3]]
+    assert result["plan"].pushed_ids == 3
+    assert [row["amount"] for row in result["rows"]] == [300, 75, 50]
+
+
+def test_portfolios_driver_pushes_holding_client_ids():
+    clients = StandInClients(PROFILES, 1000)
+    portfolios = StandInPortfolios(HOLDINGS, 3)
+    result = FederatedPlanner(client_source=clients, portfolio_source=portfolios).top_portfolios("x", limit=2)
+
+    assert portfolios.fetched == [None]
+    assert clients.fetched == [[1, 2, 4]]
+    assert [row["amount"] for row in result["rows"]] == [300, 75]
+
+
+def test_no_matching_clients_skips_the_other_side():
+    portfolios = StandInPortfolios(HOLDINGS, 1000)
+    result = FederatedPlanner(client_source=StandInClients([], 0), portfolio_source=portfolios).top_portfolios("x")
+
+    assert result["rows"] == [] and portfolios.fetched == []
+
+
+@pytest.mark.parametrize("count, statements", [
+    (1, 1), (IN_CHUNK_SIZE - 1, 1), (IN_CHUNK_SIZE, 1), (IN_CHUNK_SIZE + 1, 2), (2 * IN_CHUNK_SIZE + 1, 3),
+])
+def test_mysql_in_list_chunked_at_boundary(count, statements):
+    tool = RecordingSQLTool()
+    ids = list(range(count))
+    MySQLPortfolioSource(tool).fetch({"asset_type": "Gold"}, ids, limit=5)
+
+    assert len(tool.statements) == statements
+    pushed = []
+    for sql, params in tool.statements:
+        # asset_type first, then one placeholder per id in the chunk
+        assert params[0] == "Gold"
+        assert sql.count("%s") == len(params) <= IN_CHUNK_SIZE + 1
+        assert "LIMIT 5" in sql
+        pushed.extend(params[1:])
+    assert pushed == ids
+
+
+def test_mysql_estimate_reads_explain_rows():
+    tool = RecordingSQLTool()
+    assert MySQLPortfolioSource(tool).estimate({"min_amount": 10}) == 42
+    sql, params = tool.statements[0]
+    assert sql.startswith("EXPLAIN SELECT") and "amount >= %s" in sql and params == (10,)
+
+
+class StandInCollection:
+    def __init__(self):
+        self.filters = []
+
+    def find(self, search_filter, projection):
+        self.filters.append(search_filter)
+        return [{"client_id": client_id} for client_id in search_filter["client_id"]["$in"]]
+
+
+class StandInMongoTool:
+    def __init__(self):
+        self.collection = StandInCollection()
+
+    def _parse_search_query(self, query):
+        return {"risk_appetite": "High"}
+
+
+@pytest.mark.parametrize("count, finds", [(IN_CHUNK_SIZE, 1), (IN_CHUNK_SIZE + 1, 2)])
+def test_mongo_in_list_chunked_at_boundary(count, finds):
+    tool = StandInMongoTool()
+    documents = MongoClientSource(tool).fetch("high risk clients", list(range(count)))
+
+    assert len(tool.collection.filters) == finds
+    assert all(f["risk_appetite"] == "High" and len(f["client_id"]["$in"]) <= IN_CHUNK_SIZE
+               for f in tool.collection.filters)
+    assert [d["client_id"] for d in documents] == list(range(count))
+
+
+def test_chunk_size_is_the_module_setting(monkeypatch):
+    monkeypatch.setattr(federated, "IN_CHUNK_SIZE", 2)
+    tool = RecordingSQLTool()
+    MySQLPortfolioSource(tool).fetch({}, [1, 2, 3, 4, 5])
+    assert [params for _, params in tool.statements] == [(1, 2), (3, 4), (5,)]
+
+
+def test_hash_join_duplicate_and_missing_keys():
+    profiles = [
+        {"client_id": 1, "name": "First"},
+        {"client_id": 1, "name": "Duplicate"},
+        {"client_id": None, "name": "No id"},
+        {"name": "Missing id"},
+    ]
+    holdings = [
+        {"client_id": 1, "amount": 10},
+        {"client_id": 1, "amount": 30},
+        {"client_id": 2, "amount": 99},
+        {"client_id": None, "amount": 50},
+        {"client_id": 1, "amount": None},
+    ]
+
+    rows = hash_join(profiles, holdings)
+
+    # Every holding of a matched client is kept; a repeated profile id keeps
+    # the last profile; holdings without a matching profile are dropped
+    assert [(row["name"], row["amount"]) for row in rows] == [
+        ("Duplicate", 30), ("Duplicate", 10), ("Duplicate", None)
+    ]
+    assert hash_join(profiles, holdings, limit=1) == rows[:1]
+    assert hash_join([], holdings) == [] and hash_join(profiles, []) == []
+
+
+def test_client_portfolios_endpoint(monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    import main
+
+    planner = FederatedPlanner(client_source=StandInClients(PROFILES, 3),
+                               portfolio_source=StandInPortfolios(HOLDINGS, 1000))
+    monkeypatch.setitem(main._tools, "federated", planner)
+    client = TestClient(main.app)
+
+    response = client.post("/clients/portfolios", json={"query": "high risk clients", "limit": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["type"] == "table"
+    assert [row["amount"] for row in body["data"]] == [300, 75]
+    assert body["metadata"]["driver"] == "clients" and body["metadata"]["pushed_ids"] == 3
+
+    assert client.post("/clients/portfolios", json={"limit": 0}).status_code == 400
@@ -0,0 +1,150 @@
+"""
+LLMClient against the stub backend: concurrent calls are micro-batched,
+the system prompt is prepared once per distinct prefix, and timeouts and
+backend failures reach every caller.
+"""
+import asyncio
+
+import pytest
+
+from llm_client import LLMClient, LLMTimeoutError, Prompt, StubBackend
+
+SYSTEM = "You are a wealth management assistant. Tables: clients, portfolios, transactions."
+
+
+class CountingStubBackend(StubBackend):
+    def __init__(self, **kwargs):
+        super().__init__(first_token_ms=1.0, tokens_per_second=100000.0, prefill_ms_per_token=0.0, **kwargs)
+        self.prepared = []
+        self.batch_sizes = []
+
+    async def prepare_prefix(self, system):
+        self.prepared.append(system)
+        await asyncio.sleep(0.01)
+        return await super().prepare_prefix(system)
+
+    async def generate_batch(self, items):
+        self.batch_sizes.append(len(items))
+        return await super().generate_batch(items)
+
+
+def run(client, scenario):
+    """Run `scenario(client)` on a fresh event loop and stop the client's worker"""
+    async def main():
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_concurrent_calls_are_batched():
+    backend = CountingStubBackend()
+    prompts = [Prompt(SYSTEM, f"question {n}") for n in range(8)]
+    client = LLMClient(backend, max_batch_size=4, max_wait_ms=50)
+
+    async def scenario(client):
+        return await asyncio.gather(*(client.complete(prompt) for prompt in prompts))
+
+    completions = run(client, scenario)
+
+    assert backend.batch_sizes == [4, 4]
+    assert [c.batch_size for c in completions] == [4] * 8
+    assert [c.text for c in completions] == [" ".join(backend.reply(prompt)) for prompt in prompts]
+    assert client.stats()["avg_batch_size"] == 4.0
+
+
+def test_lone_call_is_sent_after_max_wait():
+    backend = CountingStubBackend()
+    client = LLMClient(backend, max_batch_size=8, max_wait_ms=1)
+
+    async def scenario(client):
+        first = await client.complete(Prompt(SYSTEM, "one"))
+        second = await client.complete(Prompt(SYSTEM, "two"))
+        return first, second
+
+    first, second = run(client, scenario)
+
+    assert backend.batch_sizes == [1, 1]
+    assert first.batch_size == second.batch_size == 1
+
+
+def test_prefix_is_prepared_once_per_system_prompt():
+    backend = CountingStubBackend()
+    client = LLMClient(backend, max_wait_ms=1)
+
+    async def scenario(client):
+        concurrent = await asyncio.gather(*(client.complete(Prompt(SYSTEM, f"q{n}")) for n in range(3)))
+        later = await client.complete(Prompt(SYSTEM, "q3"))
+        other = await client.complete(Prompt("A different system prompt.", "q4"))
+        return concurrent, later, other
+
+    concurrent, later, other = run(client, scenario)
+
+    # Concurrent first requests share the one preparation
+    assert backend.prepared == [SYSTEM, "A different system prompt."]
+    assert [c.prefix_cached for c in concurrent] == [False, True, True]
+    assert later.prefix_cached and not other.prefix_cached
+    assert later.prompt_tokens == len(SYSTEM.split()) + 1
+    stats = client.stats()
+    assert (stats["prefix_misses"], stats["prefix_hits"]) == (2, 3)
+
+
+def test_prefix_cache_evicts_least_recently_used():
+    backend = CountingStubBackend()
+    client = LLMClient(backend, max_wait_ms=1, prefix_cache_size=1)
+
+    async def scenario(client):
+        for system in ("first", "second", "first"):
+            await client.complete(Prompt(system, "q"))
+
+    run(client, scenario)
+
+    assert backend.prepared == ["first", "second", "first"]
+
+
+def test_stream_matches_completion():
+    backend = CountingStubBackend()
+    prompt = Prompt(SYSTEM, "summarise my book")
+    client = LLMClient(backend, max_wait_ms=1)
+
+    async def scenario(client):
+        tokens = [token async for token in client.stream(prompt)]
+        completion = await client.complete(prompt)
+        return tokens, completion
+
+    tokens, completion = run(client, scenario)
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == completion.text
+
+
+def test_timeout_raises_llm_timeout_error():
+    backend = StubBackend(first_token_ms=500.0)
+
+    client = LLMClient(backend, max_wait_ms=1)
+
+    async def scenario(client):
+        with pytest.raises(LLMTimeoutError):
+            await client.complete(Prompt(SYSTEM, "slow"), timeout=0.05)
+
+    run(client, scenario)
+
+    assert client.stats()["timeouts"] == 1
+
+
+def test_backend_failure_reaches_every_caller():
+    class FailingBackend(CountingStubBackend):
+        async def generate_batch(self, items):
+            raise RuntimeError("backend down")
+    client = LLMClient(FailingBackend(), max_wait_ms=20)
+
+    async def scenario(client):
+        return await asyncio.gather(
+            *(client.complete(Prompt(SYSTEM, f"q{n}")) for n in range(3)),
+            return_exceptions=True
+        )
+
+    results = run(client, scenario)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,74 @@
+"""
+The $group/$facet distribution pipelines against counts computed in Python
+over the same profiles. Needs a MongoDB (MONGO_URI); skipped without one.
+"""
+import random
+from collections import Counter
+
+from db.mongo_connect import DISTRIBUTION_FIELDS
+
+CITIES = ["Mumbai", "Delhi", "Chennai", "Bangalore", "Ahmedabad", "Pune", "Hyderabad"]
+RISKS = ["High", "Moderate", "Conservative"]
+PROFESSIONS = ["Film Actor", "Film Actress", "Cricket Player", "Entrepreneur"]
+PREFERENCES = ["Stocks", "Real Estate", "Mutual Funds", "Bonds", "Gold", "Startups"]
+
+
+def make_profiles(count, seed=7):
+    rng = random.Random(seed)
+    profiles = [
+        {
+            "name": f"Client {i}",
+            "city": rng.choice(CITIES),
+            "risk_appetite": rng.choice(RISKS),
+            "profession": rng.choice(PROFESSIONS),
+            "investment_preferences": rng.sample(PREFERENCES, rng.randint(1, 3)),
+        }
+        for i in range(count)
+    ]
+    # Missing and null values are left out of the server-side counts
+    profiles.append({"name": "No City", "city": None, "risk_appetite": "High", "profession": "Entrepreneur",
+                     "investment_preferences": []})
+    return profiles
+
+
+def python_counts(profiles):
+    expected = {dimension: Counter() for dimension in DISTRIBUTION_FIELDS}
+    for profile in profiles:
+        for dimension, field in DISTRIBUTION_FIELDS.items():
+            value = profile.get(field)
+            for item in (value if isinstance(value, list) else [value]):
+                if item is not None:
+                    expected[dimension][item] += 1
+    return expected
+
+
+def as_counts(rows):
+    return {row["label"]: row["count"] for row in rows}
+
+
+def test_facet_counts_match_python_group_by(mongo_tool):
+    profiles = make_profiles(2000)
+    mongo_tool.collection.insert_many([dict(profile) for profile in profiles])
+
+    pushed = mongo_tool.get_profile_distributions()
+
+    assert "error" not in pushed
+    for dimension, counts in python_counts(profiles).items():
+        assert as_counts(pushed[dimension]) == dict(counts), dimension
+
+
+def test_facet_rows_sorted_and_limited(mongo_tool):
+    profiles = make_profiles(500)
+    mongo_tool.collection.insert_many([dict(profile) for profile in profiles])
+
+    pushed = mongo_tool.get_profile_distributions(top_n=3)
+
+    for dimension, counts in python_counts(profiles).items():
+        expected = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:3]
+        assert [(row["label"], row["count"]) for row in pushed[dimension]] == expected, dimension
+
+
+def test_empty_collection_gives_empty_distributions(mongo_tool):
+    pushed = mongo_tool.get_profile_distributions(["city", "risk_appetite"])
+
+    assert pushed == {"city": [], "risk_appetite": []}
@@ -0,0 +1,61 @@
+"""
+Search filters on the lowercase shadow fields, and explain-plan checks that
+filtered searches are index scans. The explain tests need a MongoDB
+(MONGO_URI) and are skipped without one.
+"""
+import re
+
+import pytest
+
+from db.mongo_connect import MongoDBTool, add_search_fields
+
+SEARCHES = [
+    "clients in mumbai",
+    "clients in mumbai or delhi",
+    "high risk clients",
+    "clients who prefer real estate",
+]
+
+PROFILES = [
+    {"name": "Virat Kohli", "client_id": 1, "city": "Delhi", "risk_appetite": "High",
+     "investment_preferences": ["Stocks"], "relationship_manager": "2"},
+    {"name": "Rohit Sharma", "client_id": 2, "city": "Mumbai", "risk_appetite": "Moderate",
+     "investment_preferences": ["Real Estate"], "relationship_manager": "1"},
+    {"name": "Aamir Khan", "client_id": 3, "city": "Mumbai Suburban", "risk_appetite": "High",
+     "investment_preferences": ["Mutual Funds"], "relationship_manager": "1"},
+    {"name": "Navi Client", "client_id": 4, "city": "Navi Mumbai", "risk_appetite": "Conservative",
+     "investment_preferences": ["Bonds"], "relationship_manager": "3"},
+]
+
+
+def parse(query):
+    return MongoDBTool._parse_search_query(MongoDBTool.__new__(MongoDBTool), query)
+
+
+def test_city_filter_is_anchored_prefix_on_shadow_field():
+    city = parse("clients in Mumbai")["city_norm"]
+    assert isinstance(city, re.Pattern) and city.pattern == "^mumbai"
+
+    cities = parse("clients in mumbai or delhi")["city_norm"]["$in"]
+    assert [pattern.pattern for pattern in cities] == ["^mumbai", "^delhi"]
+
+
+def test_city_search_matches_prefix_not_mid_value(mongo_tool):
+    mongo_tool.collection.insert_many([add_search_fields(profile) for profile in PROFILES])
+    names = {client["name"] for client in mongo_tool.search_clients("clients in mumbai")}
+    assert names == {"Rohit Sharma", "Aamir Khan"}
+
+
+@pytest.mark.parametrize("query", SEARCHES)
+def test_search_uses_index(mongo_tool, query):
+    mongo_tool.collection.insert_many([add_search_fields(profile) for profile in PROFILES])
+    mongo_tool.ensure_indexes()
+    stages = mongo_tool.explain_search(query)
+    assert "IXSCAN" in stages and "COLLSCAN" not in stages, stages
+
+
+def test_name_prefix_uses_index(mongo_tool):
+    mongo_tool.collection.insert_many([add_search_fields(profile) for profile in PROFILES])
+    mongo_tool.ensure_indexes()
+    stages = mongo_tool.explain_filter({"name_norm": {"$regex": "^virat"}})
+    assert "IXSCAN" in stages and "COLLSCAN" not in stages, stages
@@ -0,0 +1,174 @@
+"""
+MySQLConnectionPool checks driven by a stand-in connection factory, so they
+run without a MySQL server.
+"""
+import threading
+
+import pytest
+
+from db.mysql_pool import MySQLConnectionPool, PoolTimeoutError
+
+
+class StandInConnection:
+    """Pool-compatible connection that records what the pool did to it"""
+
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.closed = False
+        self.rollbacks = 0
+        self.fail_rollback = False
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise RuntimeError("connection lost")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_pool(**options):
+    connections = []
+    lock = threading.Lock()
+
+    def connect(**config):
+        with lock:
+            conn = StandInConnection(len(connections))
+            connections.append(conn)
+        return conn
+
+    options.setdefault("pool_size", 2)
+    options.setdefault("max_overflow", 1)
+    options.setdefault("timeout", 0.05)
+    clock = options.pop("clock", Clock())
+    pool = MySQLConnectionPool({"host": "stand-in"}, connect=connect, clock=clock, **options)
+    return pool, connections, clock
+
+
+def test_reuses_idle_connections():
+    pool, connections, _ = make_pool()
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is first
+    assert len(connections) == 1
+    assert second.uses == 2
+
+
+def test_overflow_then_timeout():
+    pool, connections, _ = make_pool(pool_size=2, max_overflow=1)
+    held = [pool.acquire() for _ in range(3)]
+    assert pool.stats()["open"] == 3
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    # Overflow connections are closed on release rather than kept idle
+    for conn in held:
+        pool.release(conn)
+    stats = pool.stats()
+    assert stats["open"] == 2 and stats["idle"] == 2
+    assert sum(conn.closed for conn in connections) == 1
+
+
+def test_waiter_gets_released_connection():
+    pool, _, _ = make_pool(pool_size=1, max_overflow=0, timeout=2)
+    held = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(2)
+    assert got == [held]
+
+
+def test_discards_connection_failing_pre_ping():
+    pool, connections, _ = make_pool()
+    conn = pool.acquire()
+    pool.release(conn)
+    connections[0].connected = False
+
+    fresh = pool.acquire()
+    assert fresh.raw is connections[1]
+    assert connections[0].closed
+    stats = pool.stats()
+    assert stats["failed_checks"] == 1 and stats["open"] == 1
+
+
+def test_recycles_by_use_count():
+    pool, connections, _ = make_pool(recycle_uses=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn = pool.acquire()
+    # Second use reaches the limit, so the release retires it
+    pool.release(conn)
+    assert connections[0].closed
+    assert pool.stats()["recycled"] == 1
+    assert pool.acquire().raw is connections[1]
+
+
+def test_recycles_by_age():
+    pool, connections, clock = make_pool(recycle_seconds=60)
+    conn = pool.acquire()
+    pool.release(conn)
+    clock.now = 61
+
+    fresh = pool.acquire()
+    assert fresh.raw is connections[1]
+    assert connections[0].closed
+    assert pool.stats()["recycled"] == 1
+
+
+def test_rollback_on_release():
+    pool, connections, _ = make_pool()
+    conn = pool.acquire()
+    pool.release(conn)
+    assert connections[0].rollbacks == 1
+
+    # A connection that cannot roll back is not handed out again
+    conn = pool.acquire()
+    connections[0].fail_rollback = True
+    pool.release(conn)
+    assert connections[0].closed
+    assert pool.stats()["idle"] == 0
+
+
+def test_failed_connect_frees_slot():
+    pool, _, _ = make_pool(pool_size=1, max_overflow=0)
+
+    def refuse(**config):
+        raise ConnectionError("refused")
+
+    pool._connect = refuse
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+    assert pool.stats()["open"] == 0
+
+
+def test_concurrent_acquire_counts_every_connection():
+    pool, connections, _ = make_pool(pool_size=8, max_overflow=8, timeout=5)
+    barrier = threading.Barrier(16)
+    held = []
+
+    def worker():
+        barrier.wait()
+        held.append(pool.acquire())
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.stats()["created"] == len(connections) == 16
@@ -0,0 +1,67 @@
+"""
+PortfolioSummaryEngine built from stand-in rows: the one-round-trip and
+`parallel` paths must produce the same summary.
+"""
+from decimal import Decimal
+
+import pytest
+
+from db.portfolio_summary import AssetTotal, PortfolioSummary, PortfolioSummaryEngine
+
+SCALARS = {"total_aum": Decimal("600.5"), "client_count": 3, "avg_portfolio": Decimal("150.125"), "holding_count": 4}
+ASSETS = [
+    {"asset_type": "Equity", "total_amount": Decimal("400.5")},
+    {"asset_type": "Bond", "total_amount": Decimal("200")},
+]
+
+
+class StandInDatabase:
+    """Answers the engine's statements the way MySQL would for a small book."""
+
+    def __init__(self, scalars, assets):
+        self.scalars = scalars
+        self.assets = assets
+        self.statements = []
+
+    def execute(self, sql):
+        self.statements.append(sql)
+        if "LEFT JOIN" in sql:
+            if not self.assets:
+                return [{**self.scalars, "asset_type": None, "total_amount": None}]
+            return [{**self.scalars, **asset} for asset in self.assets]
+        if "GROUP BY" in sql:
+            return list(self.assets)
+        return [dict(self.scalars)]
+
+
+def test_serial_and_parallel_agree():
+    database = StandInDatabase(SCALARS, ASSETS)
+    engine = PortfolioSummaryEngine(database.execute, top_n=2)
+
+    serial = engine.run()
+    parallel = engine.run(parallel=True)
+
+    assert serial == parallel
+    assert serial == PortfolioSummary(
+        total_aum=600.5, client_count=3, avg_portfolio=150.125, holding_count=4,
+        top_assets=[AssetTotal("Equity", 400.5), AssetTotal("Bond", 200.0)]
+    )
+    assert len(database.statements) == 3
+    assert "LIMIT 2" in database.statements[0]
+
+
+def test_empty_book_agrees():
+    empty = {"total_aum": None, "client_count": 0, "avg_portfolio": None, "holding_count": 0}
+    engine = PortfolioSummaryEngine(StandInDatabase(empty, []).execute)
+
+    assert engine.run() == engine.run(parallel=True) == PortfolioSummary()
+    assert PortfolioSummaryEngine.from_combined_rows([]) == PortfolioSummary()
+
+
+def test_tool_errors_are_raised():
+    engine = PortfolioSummaryEngine(lambda sql: [{"error": "server has gone away"}])
+
+    with pytest.raises(RuntimeError, match="gone away"):
+        engine.run()
+    with pytest.raises(RuntimeError, match="gone away"):
+        engine.run(parallel=True)
@@ -0,0 +1,106 @@
+"""
+POST /query/batch: identical queries run once, distinct ones run
+concurrently up to BATCH_QUERY_CONCURRENCY, and a failing item is
+reported without failing the batch.
+"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+import main
+from response_cache import ResponseCache
+from serialization import decode_json
+
+
+class StandInAnswers:
+    """Slow answer_miss stand-in recording how many run at once."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.keys = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, cache_key):
+        with self.lock:
+            self.keys.append(cache_key)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if "fail" in cache_key:
+                raise RuntimeError("no answer")
+            return b'{"answer":"' + cache_key.encode() + b'"}', {}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    answers = StandInAnswers()
+    monkeypatch.setattr(main, "response_cache", ResponseCache(max_entries=16))
+    monkeypatch.setattr(main, "answer_miss", answers)
+    return answers
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def test_identical_queries_run_once(answers, client):
+    queries = ["Top five portfolios", "top 5  portfolios", "sector breakdown"]
+    payload = client.post("/query/batch", json={"queries": queries}).json()
+
+    assert sorted(answers.keys) == ["sector breakdown", "top 5 portfolios"]
+    assert payload["count"] == 3 and payload["unique_queries"] == 2
+    results = payload["results"]
+    assert [item["query"] for item in results] == queries
+    assert [item["deduplicated"] for item in results] == [False, True, False]
+    assert results[0]["response"] == results[1]["response"] == {"answer": "top 5 portfolios"}
+
+
+def test_concurrency_is_bounded(answers, client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_QUERY_CONCURRENCY", 2)
+    queries = [f"query {n}" for n in range(6)]
+
+    payload = client.post("/query/batch", json={"queries": queries}).json()
+
+    assert all(item["status"] == "ok" for item in payload["results"])
+    assert answers.peak == 2
+
+
+def test_failed_item_is_reported(answers, client):
+    payload = client.post("/query/batch", json={"queries": ["fail me", "works"]}).json()
+
+    failed, ok = payload["results"]
+    assert failed["status"] == "error"
+    assert "no answer" in failed["response"]["detail"]
+    assert ok["status"] == "ok"
+
+
+def test_streamed_items_cover_every_query(answers, client):
+    queries = ["alpha", "beta", "alpha"]
+    response = client.post("/query/batch", json={"queries": queries, "stream": True})
+
+    items = [decode_json(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(item["index"] for item in items) == [0, 1, 2]
+    assert sum(item["deduplicated"] for item in items) == 1
+    assert sorted(answers.keys) == ["alpha", "beta"]
+
+
+def test_rejects_empty_and_oversized_batches(answers, client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_BATCH_QUERIES", 2)
+
+    assert client.post("/query/batch", json={"queries": []}).status_code == 400
+    assert client.post("/query/batch", json={"queries": ["a", "b", "c"]}).status_code == 400
+    assert answers.keys == []
@@ -0,0 +1,100 @@
+"""
+/query answers through the exact-match and near-duplicate caches: a
+paraphrase that clears the similarity threshold is answered without
+routing or computing anything.
+"""
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+import main
+from response_cache import ResponseCache
+from semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    response_cache = ResponseCache(max_entries=16)
+    semantic_cache = SemanticCache(max_entries=16, threshold=0.85)
+    monkeypatch.setattr(main, "response_cache", response_cache)
+    monkeypatch.setitem(main._tools, "semantic_cache", semantic_cache)
+    return response_cache, semantic_cache
+
+
+@pytest.fixture
+def routes(monkeypatch):
+    routed = []
+    route = main.query_router.route
+
+    def counting_route(query):
+        routed.append(query)
+        return route(query)
+
+    monkeypatch.setattr(main.query_router, "route", counting_route)
+    return routed
+
+
+def test_paraphrase_hit_skips_routing(caches, routes):
+    body, _ = main.resolve_query("show me top 5 portfolios")
+    again, _ = main.resolve_query("top 5 portfolios please")
+
+    assert again is body
+    assert routes == ["show me top 5 portfolios"]
+    assert caches[1].stats()["hits"] == 1
+
+
+def test_paraphrase_hit_reuses_computed_answer(caches, monkeypatch):
+    computed = []
+
+    def compute_answer(cache_key):
+        computed.append(cache_key)
+        return b'{"type":"text","data":"retrieved for ' + cache_key.encode() + b'","metadata":{}}'
+
+    monkeypatch.setattr(main, "compute_answer", compute_answer)
+    body, _ = main.resolve_query("tell me about virat kohli")
+    again, _ = main.resolve_query("tell me about virat kohli please")
+
+    assert again == body
+    assert computed == ["tell me about virat kohli"]
+
+
+def test_different_question_is_computed(caches, routes):
+    table, _ = main.resolve_query("top 5 portfolios")
+    chart, _ = main.resolve_query("portfolio distribution chart")
+
+    assert table != chart
+    assert routes == ["top 5 portfolios", "portfolio distribution chart"]
+
+
+def test_exact_repeat_skips_semantic_lookup(caches, routes):
+    main.resolve_query("top 5 portfolios")
+    main.resolve_query("top 5 portfolios")
+
+    assert routes == ["top 5 portfolios"]
+    assert caches[1].stats()["hits"] + caches[1].stats()["misses"] == 1
+
+
+def test_miss_is_answered_off_the_event_loop(caches, monkeypatch):
+    import asyncio
+    import threading
+
+    from starlette.requests import Request
+
+    threads = []
+
+    def compute_answer(cache_key):
+        threads.append(threading.current_thread())
+        return main.frozen_responses["general_text"]
+
+    monkeypatch.setattr(main, "compute_answer", compute_answer)
+    request = Request({"type": "http", "method": "POST", "path": "/query", "query_string": b"", "headers": []})
+
+    async def ask():
+        await main.answer_query("tell me about virat kohli", request, None, conditional=False)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(ask())
+
+    assert threads and threads[0] is not loop_thread
+    assert threads[0].name.startswith("mysql-sync")
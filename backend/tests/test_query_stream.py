@@ -0,0 +1,43 @@
+"""
+/query/stream pulls every batch on the bounded database executor, not on
+the event loop or Starlette's default threadpool.
+"""
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+import main
+from serialization import decode_json
+
+
+class StandInMySQLTool:
+    def __init__(self):
+        self.threads = []
+
+    def stream_portfolio_query(self, query, batch_size):
+        for start in range(0, 5, batch_size):
+            self.threads.append(threading.current_thread().name)
+            yield [{"client_id": i, "amount": i * 10} for i in range(start, min(start + batch_size, 5))]
+
+
+def test_stream_batches_run_on_database_executor(monkeypatch):
+    tool = StandInMySQLTool()
+    monkeypatch.setitem(main._tools, "mysql", tool)
+
+    response = TestClient(main.app).post("/query/stream", json={
+        "query": "top portfolios", "source": "portfolios", "batch_size": 2
+    })
+
+    assert response.status_code == 200
+    assert [decode_json(line)["client_id"] for line in response.text.splitlines()] == [0, 1, 2, 3, 4]
+    assert len(tool.threads) == 3
+    assert all(name.startswith("mysql-sync") for name in tool.threads)
+
+
+def test_unknown_source_is_rejected():
+    response = TestClient(main.app).post("/query/stream", json={"query": "x", "source": "nowhere"})
+    assert response.status_code == 400
@@ -0,0 +1,116 @@
+"""
+ResponseCache entries and the per-body representations derived from them,
+and json_response reading and filling those representations.
+"""
+import asyncio
+import gzip
+
+import pytest
+
+from response_cache import ResponseCache, body_digest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_equal_bodies_share_derived_representations():
+    cache = ResponseCache(max_entries=4)
+    first = cache.put("top 5 portfolios", b'{"type":"table"}')
+    first["etag"] = '"tag"'
+    second = cache.put("top five portfolios", b'{"type":"table"}')
+
+    assert second is first
+    assert cache.get_entry("top 5 portfolios") == (b'{"type":"table"}', {"etag": '"tag"'})
+    assert cache.stats()["distinct_bodies"] == 1
+
+
+def test_derived_representations_dropped_with_last_entry():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"shared")["etag"] = '"shared"'
+    cache.put("b", b"shared")
+    cache.put("c", b"other")
+
+    # "a" is evicted; "b" still holds the shared body
+    assert cache.get("a") is None
+    assert cache.get_entry("b")[1] == {"etag": '"shared"'}
+
+    cache.put("d", b"third")
+    cache.put("e", b"fourth")
+    assert cache.get("b") is None
+    assert cache.stats()["distinct_bodies"] == 2
+    assert cache.put("f", b"shared") == {}
+
+
+def test_replacing_and_expiring_release_derived_representations():
+    clock = Clock()
+    cache = ResponseCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put("a", b"old")["etag"] = '"old"'
+    cache.put("a", b"new")
+    assert cache.stats()["distinct_bodies"] == 1
+
+    clock.now = 11
+    assert cache.get_entry("a") is None
+    assert cache.stats()["distinct_bodies"] == 0
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = ResponseCache(max_entries=0)
+    cache.put("a", b"body")["etag"] = '"tag"'
+
+    assert cache.get_entry("a") is None
+    assert cache.put("a", b"body") == {}
+
+
+def test_json_response_fills_and_reuses_variants():
+    pytest.importorskip("starlette")
+    from starlette.requests import Request
+
+    from http_caching import json_response, strong_etag
+
+    def request(**headers):
+        return Request({"type": "http", "method": "GET", "path": "/query", "query_string": b"",
+                        "headers": [(name.replace("_", "-").encode(), value.encode())
+                                    for name, value in headers.items()]})
+
+    body = b'{"type":"text","data":"' + b"x" * 2048 + b'"}'
+    variants = {}
+    response = json_response(request(accept_encoding="gzip"), body, variants=variants)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == body
+    assert variants == {"etag": strong_etag(body), "gzip": response.body}
+    assert variants["etag"] == f'"{body_digest(body)}"'
+
+    # A second response is served from the stored variants
+    variants["gzip"] = b"stored"
+    assert json_response(request(accept_encoding="gzip"), body, variants=variants).body == b"stored"
+
+    not_modified = json_response(request(if_none_match=variants["etag"]), body, variants=variants)
+    assert not_modified.status_code == 304
+
+
+def test_columnar_variant_kept_with_cached_body():
+    pytest.importorskip("starlette")
+    from starlette.requests import Request
+
+    import main
+    from serialization import COLUMNAR_MEDIA_TYPE, decode_json
+
+    main.response_cache.clear()
+    request = Request({"type": "http", "method": "GET", "path": "/query", "query_string": b"",
+                       "headers": [(b"accept", COLUMNAR_MEDIA_TYPE.encode())]})
+    first = asyncio.run(main.answer_query("top 5 portfolios", request, None, conditional=False))
+    _, variants = main.response_cache.get_entry(main.normalize_query("top 5 portfolios"))
+
+    assert decode_json(first.body)["metadata"]["table_format"] == "columnar"
+    assert variants["columnar"]["body"] == first.body
+    assert first.headers["etag"] == variants["columnar"]["etag"]
+    assert "etag" not in variants  # the records form was never served
+
+    second = asyncio.run(main.answer_query("top five portfolios", request, None, conditional=False))
+    assert second.body is variants["columnar"]["body"]
@@ -0,0 +1,132 @@
+"""
+VectorIndex top-k against brute force for both storage types, persistence
+and deletion, and Retriever search over a small document set.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import retrieval
+from retrieval import Retriever, VectorIndex
+
+DIM = 32
+
+
+def unit_rows(rng, count):
+    rows = rng.normal(size=(count, DIM)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def brute_force(vectors, ids, queries, k):
+    scores = queries @ vectors.T
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.asarray(ids)[order], np.take_along_axis(scores, order, axis=1)
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Several blocks even for a small index, so the running top-k merge runs
+    monkeypatch.setattr(retrieval, "SEARCH_BLOCK_ROWS", 64)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_search_matches_brute_force(dtype, small_blocks):
+    rng = np.random.default_rng(1)
+    vectors = unit_rows(rng, 500)
+    ids = list(range(1000, 1500))
+    queries = unit_rows(rng, 20)
+    index = VectorIndex(DIM, dtype=dtype, capacity=16)
+    index.add(ids, vectors)
+
+    found, scores = index.search(queries, k=10)
+    expected, expected_scores = brute_force(vectors, ids, queries, 10)
+
+    if dtype == "float32":
+        assert (found == expected).all()
+        assert np.allclose(scores, expected_scores, atol=1e-5)
+    else:
+        # Quantization moves scores by about 1%, which may swap near ties
+        # but never drops a clear winner
+        assert (found[:, 0] == expected[:, 0]).mean() >= 0.9
+        assert np.allclose(scores, expected_scores, atol=0.03)
+        overlap = [len(set(row) & set(want)) for row, want in zip(found, expected)]
+        assert min(overlap) >= 8
+
+
+def test_fewer_rows_than_k():
+    rng = np.random.default_rng(2)
+    index = VectorIndex(DIM)
+    index.add([7, 8], unit_rows(rng, 2))
+
+    found, scores = index.search(unit_rows(rng, 1), k=4)
+
+    assert sorted(found[0, :2]) == [7, 8]
+    assert found[0, 2:].tolist() == [-1, -1]
+    assert np.isinf(scores[0, 2:]).all()
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_delete_replace_and_slot_reuse(dtype, small_blocks):
+    rng = np.random.default_rng(3)
+    vectors = unit_rows(rng, 200)
+    index = VectorIndex(DIM, dtype=dtype)
+    index.add(range(200), vectors)
+
+    assert index.delete([5, 6, 999]) == 2
+    assert len(index) == 198 and 5 not in index
+    found, _ = index.search(vectors[5], k=5)
+    assert 5 not in found[0]
+
+    # A new id takes a freed slot; the matrix does not grow
+    size = index.size
+    index.add([500], vectors[5:6])
+    assert index.size == size
+    assert index.search(vectors[5], k=1)[0][0, 0] == 500
+
+    # Re-adding an existing id replaces its vector
+    index.add([7], vectors[9:10])
+    assert index.search(vectors[9], k=2)[0][0].tolist() in ([7, 9], [9, 7])
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_save_and_open(dtype, tmp_path, small_blocks):
+    rng = np.random.default_rng(4)
+    vectors = unit_rows(rng, 300)
+    queries = unit_rows(rng, 5)
+    path = str(tmp_path / "index")
+    index = VectorIndex(DIM, dtype=dtype, path=path, capacity=8)
+    index.add(range(300), vectors)
+    index.delete([0, 1, 2])
+    before = index.search(queries, k=7)
+    index.save()
+
+    reopened = VectorIndex.open(path)
+    after = reopened.search(queries, k=7)
+
+    assert len(reopened) == 297 and 0 not in reopened
+    assert (after[0] == before[0]).all()
+    assert np.allclose(after[1], before[1])
+    # Freed slots survive the round trip
+    size = reopened.size
+    reopened.add([1000], vectors[:1])
+    assert reopened.size == size
+
+
+def test_retriever_search_and_remove():
+    retriever = Retriever()
+    retriever.add_documents([
+        {"key": "client:1", "kind": "client", "text": "Virat Kohli, Cricket Player from Delhi"},
+        {"key": "client:2", "kind": "client", "text": "Shah Rukh Khan, Film Actor from Mumbai"},
+        {"key": "portfolio:2", "kind": "portfolio", "text": "Portfolio of Shah Rukh Khan: Real Estate"},
+    ])
+
+    results = retriever.search("shah rukh khan film actor", k=2)
+    assert results[0]["key"] == "client:2"
+    assert {document["key"] for document in results} == {"client:2", "portfolio:2"}
+    assert results[0]["score"] >= results[1]["score"]
+
+    assert retriever.search("shah rukh khan", k=3, min_score=1.01) == []
+
+    assert retriever.remove(["client:2", "client:404"]) == 1
+    assert len(retriever) == 2
+    assert "client:2" not in {document["key"] for document in retriever.search("shah rukh khan film actor", k=3)}
@@ -0,0 +1,193 @@
+"""
+RollupStore against an in-memory stand-in for the portfolios, transactions
+and relationship_managers tables: rebuild inside one snapshot, refresh
+advancing the watermark, and periodic rebuilds.
+"""
+import copy
+from contextlib import contextmanager
+
+import pytest
+
+from db import rollups
+from db.rollups import RollupStore
+
+
+class StandInDatabase:
+    """Tables as lists of dicts, answering the statements RollupStore sends"""
+
+    def __init__(self):
+        self.managers = [{"id": 1, "manager_name": "Amit Sharma"}, {"id": 2, "manager_name": "Priya Patel"}]
+        self.portfolios = [
+            {"client_id": 1, "asset_type": "Stocks", "amount": 100.0},
+            {"client_id": 1, "asset_type": "Gold", "amount": 50.0},
+            {"client_id": 2, "asset_type": "Stocks", "amount": 200.0},
+        ]
+        self.transactions = [
+            {"id": 1, "client_id": 1, "transaction_type": "Buy", "amount": 100.0, "asset_type": "Stocks"},
+            {"id": 2, "client_id": 2, "transaction_type": "Buy", "amount": 200.0, "asset_type": "Stocks"},
+        ]
+        self.snapshot = None
+        self.snapshots = 0
+        self.queries = []
+        # Called once after the watermark is read, to commit concurrently
+        self.after_watermark = None
+
+    def commit_transaction(self, client_id, transaction_type, amount, asset_type):
+        """A trade: the transaction row plus the holding it changes"""
+        self.transactions.append({"id": len(self.transactions) + 1, "client_id": client_id,
+                                  "transaction_type": transaction_type, "amount": amount,
+                                  "asset_type": asset_type})
+        signed = amount if transaction_type == "Buy" else -amount
+        self.portfolios.append({"client_id": client_id, "asset_type": asset_type, "amount": signed})
+
+    def query(self, sql, params=None, cursor=None):
+        self.queries.append((" ".join(sql.split()), params, cursor))
+        tables = self.snapshot if cursor is not None else self
+        if "MAX(id)" in sql:
+            rows = [{"watermark": max((row["id"] for row in tables.transactions), default=0)}]
+            if self.after_watermark is not None:
+                hook, self.after_watermark = self.after_watermark, None
+                hook()
+            return rows
+        if "FROM relationship_managers" in sql:
+            return copy.deepcopy(tables.managers)
+        if "FROM portfolios" in sql:
+            field = "client_id" if "GROUP BY client_id" in sql else "asset_type"
+            totals = {}
+            for row in tables.portfolios:
+                totals[row[field]] = totals.get(row[field], 0.0) + row["amount"]
+            return [{field: key, "total_amount": total} for key, total in totals.items()]
+        if "GROUP BY asset_type, transaction_type" in sql:
+            groups = {}
+            for row in tables.transactions:
+                if row["id"] <= params[0]:
+                    group = groups.setdefault((row["asset_type"], row["transaction_type"]), [0, 0.0])
+                    group[0] += 1
+                    group[1] += row["amount"]
+            return [{"asset_type": asset, "transaction_type": kind, "transaction_count": count,
+                     "total_amount": total} for (asset, kind), (count, total) in groups.items()]
+        if "WHERE id > %s" in sql:
+            watermark, limit = params
+            return copy.deepcopy([row for row in tables.transactions if row["id"] > watermark][:limit])
+        raise AssertionError(f"unexpected SQL: {sql}")
+
+
+class StandInCursor:
+    def __init__(self, database):
+        self.database = database
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        assert sql == "START TRANSACTION WITH CONSISTENT SNAPSHOT"
+        self.database.snapshot = copy.deepcopy(self.database)
+        self.database.snapshots += 1
+
+    def close(self):
+        self.closed = True
+
+
+class StandInTool:
+    def __init__(self, database):
+        self.database = database
+        self.pool = self
+        self.cursors = []
+
+    @contextmanager
+    def connection(self):
+        connection = self
+
+        class Connection:
+            def cursor(self, dictionary=False):
+                assert dictionary
+                cursor = StandInCursor(connection.database)
+                connection.cursors.append(cursor)
+                return cursor
+
+        yield Connection()
+
+
+@pytest.fixture
+def database():
+    return StandInDatabase()
+
+
+def make_store(database, **kwargs):
+    store = RollupStore(StandInTool(database), **kwargs)
+    store._query = database.query
+    return store
+
+
+def totals(store):
+    return (
+        {row["label"]: row["value"] for row in store.aum_by_rm()},
+        {row["label"]: row["value"] for row in store.allocation_by_asset()},
+        {(row["asset_type"], row["transaction_type"]): (row["transaction_count"], row["total_amount"])
+         for row in store.transaction_volume()},
+    )
+
+
+def test_rebuild_reads_one_snapshot(database):
+    store = make_store(database)
+    store.rebuild()
+
+    tool = store.tool
+    assert database.snapshots == 1
+    assert len(tool.cursors) == 1 and tool.cursors[0].closed
+    assert all(cursor is tool.cursors[0] for _, _, cursor in database.queries)
+    assert store.watermark == 2
+    assert totals(store) == (
+        {"Amit Sharma": 150.0, "Priya Patel": 200.0},
+        {"Stocks": 300.0, "Gold": 50.0},
+        {("Stocks", "Buy"): (2, 300.0)},
+    )
+
+
+def test_commit_during_rebuild_is_counted_once(database):
+    # A trade commits after the watermark is read but before the portfolio
+    # scans; the snapshot keeps it out of the scans so refresh() adds it once
+    database.after_watermark = lambda: database.commit_transaction(1, "Buy", 25.0, "Gold")
+    store = make_store(database)
+    store.rebuild()
+    assert store.refresh() == 1
+
+    expected = make_store(database)
+    expected.rebuild()
+    assert totals(store) == totals(expected)
+    assert store.watermark == expected.watermark == 3
+
+
+def test_refresh_advances_watermark_in_batches(database):
+    store = make_store(database, batch_size=2)
+    assert store.refresh() == 0  # first refresh builds
+    for amount in (10.0, 20.0, 30.0, 40.0):
+        database.commit_transaction(2, "Buy", amount, "Bonds")
+    database.commit_transaction(1, "Sell", 15.0, "Stocks")
+
+    assert store.refresh() == 5
+    assert store.watermark == 7
+    assert store.refresh() == 0
+
+    batches = [params for sql, params, _ in database.queries if "WHERE id > %s" in sql]
+    assert batches == [(2, 2), (4, 2), (6, 2), (7, 2)]
+
+    expected = make_store(database)
+    expected.rebuild()
+    assert totals(store) == totals(expected)
+
+
+def test_periodic_rebuild_picks_up_portfolio_edits(database, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rollups.time, "time", lambda: now[0])
+    store = make_store(database, rebuild_seconds=60)
+    store.refresh()
+
+    # A holding edited without a transaction is invisible to refresh()
+    database.portfolios[1]["amount"] = 80.0
+    now[0] += 30
+    store.refresh()
+    assert totals(store)[1]["Gold"] == 50.0
+
+    now[0] += 30
+    store.refresh()
+    assert totals(store)[1]["Gold"] == 80.0
+    assert database.snapshots == 2
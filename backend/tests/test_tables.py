@@ -0,0 +1,127 @@
+"""
+build_table against straightforward per-row dict builders, one for each
+entry in TABLE_SPECS, on row dicts and on NumPy column batches.
+"""
+import random
+from collections import defaultdict
+from decimal import Decimal
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from benchmarks.bench_tables import make_rows, per_row_inr, per_row_table, to_batch
+from tables import TABLE_SPECS, build_table, format_inr
+
+MANAGERS = ["Priya Sharma", "Rahul Verma", "Anita Desai", "Vikram Singh", "Meera Iyer"]
+
+
+def percent(amount, total):
+    return f"{round(amount / total * 100, 1) if total else 0.0:.1f}%"
+
+
+def ranked(rows, amount_key):
+    """Rows largest first with competition ranks (1, 2, 2, 4)"""
+    ordered = sorted(rows, key=lambda row: -float(row[amount_key]))
+    previous, rank = None, 0
+    for position, row in enumerate(ordered, 1):
+        amount = float(row[amount_key])
+        if amount != previous:
+            rank, previous = position, amount
+        yield rank, amount, row
+
+
+def per_row_rm_performance(rows):
+    total = sum(float(row["total_aum"]) for row in rows)
+    return [
+        {
+            "rank": rank,
+            "rm_name": row["manager_name"],
+            "client_count": row["client_count"],
+            "total_aum": per_row_inr(amount),
+            "avg_portfolio": per_row_inr(row["avg_portfolio_value"]),
+            "share_of_aum": percent(amount, total),
+        }
+        for rank, amount, row in ranked(rows, "total_aum")
+    ]
+
+
+def per_row_stock_holdings(rows):
+    totals = defaultdict(float)
+    for row in rows:
+        totals[row["client_id"]] += float(row["amount"])
+    return [
+        {
+            "client_id": row["client_id"],
+            "stock_symbol": row["stock_symbol"],
+            "holding_value": per_row_inr(amount),
+            "percentage_of_portfolio": percent(amount, totals[row["client_id"]]),
+        }
+        for _, amount, row in ranked(rows, "amount")
+    ]
+
+
+def make_rm_rows(count, seed=11):
+    rng = random.Random(seed)
+    rows = []
+    for n in range(count):
+        clients = rng.randrange(1, 400)
+        total = Decimal(rng.randrange(10_000_000, 50_000_000_000)) / 100
+        rows.append({
+            "manager_name": f"{rng.choice(MANAGERS)} {n}",
+            "client_count": clients,
+            "total_aum": total,
+            "avg_portfolio_value": total / clients,
+        })
+    return rows
+
+
+def with_ties(rows, key):
+    # Repeat a few amounts so equal values share a rank
+    for row, source in zip(rows[1::7], rows[::7]):
+        row[key] = source[key]
+    return rows
+
+
+REFERENCES = {
+    "portfolio_ranking": (per_row_table, lambda: with_ties(make_rows(500), "amount")),
+    "rm_performance": (per_row_rm_performance, lambda: with_ties(make_rm_rows(60), "total_aum")),
+    "stock_holdings": (per_row_stock_holdings, lambda: with_ties(make_rows(500, seed=3), "amount")),
+}
+
+
+def test_every_spec_has_a_reference():
+    assert set(REFERENCES) == set(TABLE_SPECS)
+
+
+@pytest.mark.parametrize("category", sorted(TABLE_SPECS))
+def test_matches_per_row_builder(category):
+    reference, make = REFERENCES[category]
+    rows = make()
+
+    assert build_table(rows, TABLE_SPECS[category]) == reference(rows)
+
+
+@pytest.mark.parametrize("category", sorted(TABLE_SPECS))
+def test_limit_is_a_prefix_of_the_full_table(category):
+    reference, make = REFERENCES[category]
+    rows = make()
+
+    assert build_table(rows, TABLE_SPECS[category], limit=25) == reference(rows)[:25]
+
+
+def test_column_batch_matches_rows():
+    rows = with_ties(make_rows(500), "amount")
+    spec = TABLE_SPECS["portfolio_ranking"]
+
+    from_batch = build_table(to_batch(rows), spec)
+    expected = per_row_table(rows)
+
+    assert [row["rank"] for row in from_batch] == [row["rank"] for row in expected]
+    assert [row["portfolio_value"] for row in from_batch] == [row["portfolio_value"] for row in expected]
+    assert [row["percentage_of_portfolio"] for row in from_batch] == [row["percentage_of_portfolio"] for row in expected]
+
+
+def test_empty_input_and_missing_amounts():
+    assert build_table([], TABLE_SPECS["portfolio_ranking"]) == []
+    assert format_inr(np.array([np.nan, 45_500_00.0, -1_780_000_00.0])) == [None, "₹45.5 L", "-₹17.8 Cr"]
@@ -0,0 +1,45 @@
+"""
+NumPy LTTB against the textbook loop in benchmarks.bench_timeseries, and
+the calendar bucketing it runs after.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from benchmarks.bench_timeseries import python_lttb
+from timeseries import bucket_series, lttb
+
+
+def random_series(rng, count):
+    return np.cumsum(rng.normal(0, 1, count))
+
+
+@pytest.mark.parametrize("outlier", [False, True])
+def test_lttb_matches_reference(outlier):
+    rng = np.random.default_rng(11)
+    for _ in range(300):
+        count = int(rng.integers(5, 400))
+        threshold = int(rng.integers(3, count))
+        y = random_series(rng, count)
+        if outlier:
+            # An end point far off the line pulls the last bucket's average
+            y[-1] += 1000 * (1 if rng.random() < 0.5 else -1)
+        x = np.arange(count, dtype=np.float64)
+        assert lttb(x, y, threshold).tolist() == python_lttb(x.tolist(), y.tolist(), threshold), (count, threshold)
+
+
+def test_lttb_keeps_ends_and_short_series():
+    y = np.array([0.0, 5.0, 1.0, 9.0, 2.0, 3.0, 7.0])
+    keep = lttb(np.arange(len(y)), y, 4)
+
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert len(keep) == 4
+    assert lttb(np.arange(len(y)), y, 10).tolist() == list(range(len(y)))
+
+
+def test_bucket_series_keeps_empty_buckets():
+    days = np.array(["2024-01-01", "2024-01-01", "2024-01-03"], dtype="datetime64[D]")
+    starts, totals = bucket_series(days, [1.0, 2.0, 4.0], "day")
+
+    assert np.datetime_as_string(starts).tolist() == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert totals.tolist() == [3.0, 0.0, 4.0]
@@ -0,0 +1,160 @@
+"""
+Time-series line charts from transaction dates.
+
+Points are rolled up into calendar buckets (day, week or month, empty
+buckets kept as zero) and, when that still leaves more than the chart can
+usefully draw, reduced with Largest-Triangle-Three-Buckets (LTTB), which
+keeps the points that shape the line - spikes and dips - instead of an
+even stride that can step over them.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from charts import MAX_POINTS, PALETTE_BORDER, PALETTE_FILL
+
+FREQUENCIES = ("day", "week", "month")
+
+# "auto" picks the finest frequency with at most this many buckets per
+# output point; LTTB takes it the rest of the way
+AUTO_BUCKETS_PER_POINT = 8
+
+
+def to_days(timestamps: Sequence[Any]) -> np.ndarray:
+    """datetime64[D] from dates, datetimes, ISO strings or datetime64 values"""
+    values = np.asarray(timestamps)
+    if values.dtype.kind == "M":
+        unit, _ = np.datetime_data(values.dtype)
+        if unit in ("h", "m", "s", "ms", "us", "ns"):
+            # Floor division on the raw counts is far cheaper than a calendar cast
+            per_day = np.timedelta64(1, "D") // np.timedelta64(1, unit)
+            return (values.view(np.int64) // per_day).astype("datetime64[D]")
+    return values.astype("datetime64[D]")
+
+
+def choose_frequency(days: np.ndarray, max_points: int = MAX_POINTS) -> str:
+    if not len(days):
+        return "day"
+    span = int((days.max() - days.min()).astype(np.int64)) + 1
+    for freq, length in (("day", 1), ("week", 7)):
+        if span / length <= max_points * AUTO_BUCKETS_PER_POINT:
+            return freq
+    return "month"
+
+
+def bucket_codes(days: np.ndarray, freq: str) -> np.ndarray:
+    """Integer bucket number per point: days, Monday-based weeks or months since the epoch"""
+    if freq == "day":
+        return days.astype(np.int64)
+    if freq == "week":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return (days.astype(np.int64) + 3) // 7
+    if freq == "month":
+        return days.astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"Unknown frequency: {freq}")
+
+
+def bucket_starts(codes: np.ndarray, freq: str) -> np.ndarray:
+    if freq == "day":
+        return codes.astype("datetime64[D]")
+    if freq == "week":
+        return (codes * 7 - 3).astype("datetime64[D]")
+    return codes.astype("datetime64[M]").astype("datetime64[D]")
+
+
+def bucket_series(timestamps: Sequence[Any], values: Optional[Sequence[float]] = None,
+                  freq: str = "day") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sum of `values` (or a count when None) per bucket, from the first to the
+    last bucket with data. Returns (bucket start dates, totals).
+    """
+    days = to_days(timestamps)
+    if not len(days):
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64)
+
+    # Every frequency starts from day totals; weeks and months then only
+    # re-bucket one value per day instead of every point
+    day_numbers = days.view(np.int64)
+    first_day = day_numbers.min()
+    weights = None if values is None else np.asarray(values, dtype=np.float64)
+    if weights is not None and np.isnan(weights).any():
+        weights = np.nan_to_num(weights)
+    totals = np.bincount(day_numbers - first_day, weights=weights).astype(np.float64, copy=False)
+    if freq == "day":
+        return np.arange(first_day, first_day + len(totals)).astype("datetime64[D]"), totals
+
+    codes = bucket_codes(np.arange(first_day, first_day + len(totals)).astype("datetime64[D]"), freq)
+    totals = np.bincount(codes - codes[0], weights=totals)
+    return bucket_starts(np.arange(codes[0], codes[0] + len(totals)), freq), totals
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the `threshold` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; the rest are split into
+    threshold - 2 equal buckets and from each the point forming the largest
+    triangle with the previously kept point and the next bucket's average
+    is taken. One Python step per output point, array work within buckets.
+    """
+    count = len(y)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    x = np.asarray(x, dtype=np.float64) - float(x[0])
+    y = np.asarray(y, dtype=np.float64)
+    every = (count - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+
+    # Average of every bucket up front, each over exactly its own points.
+    # reduceat runs the segment from the last edge to the end of the array,
+    # which is the final point (or, when float rounding leaves the last edge
+    # short, the last few) that the last bucket looks ahead to
+    sizes = np.diff(np.append(edges, count))
+    next_x = (np.add.reduceat(x, edges) / sizes)[1:]
+    next_y = (np.add.reduceat(y, edges) / sizes)[1:]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((ax - next_x[bucket]) * (y[start:end] - ay) - (ax - x[start:end]) * (next_y[bucket] - ay))
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def series_chart(timestamps: Sequence[Any], values: Optional[Sequence[float]], label: str,
+                 freq: str = "auto", max_points: int = MAX_POINTS, scale: float = 1.0,
+                 digits: int = 2) -> Dict[str, Any]:
+    """
+    Line chart payload: bucket by `freq` ("auto" chooses from the date
+    span), LTTB down to `max_points`, then scale and round the values
+    """
+    days = to_days(timestamps)
+    if freq == "auto":
+        freq = choose_frequency(days, max_points)
+    starts, totals = bucket_series(days, values, freq)
+    # Buckets are evenly spaced (empty ones included), so positions serve as x
+    keep = lttb(np.arange(len(totals)), totals, max_points)
+    starts, totals = starts[keep], totals[keep]
+
+    unit = "M" if freq == "month" else "D"
+    labels: List[str] = np.datetime_as_string(starts, unit=unit).tolist()
+    return {
+        "type": "line",
+        "labels": labels,
+        "datasets": [{
+            "label": label,
+            "data": np.round(totals * scale, digits).tolist(),
+            "backgroundColor": PALETTE_FILL[0],
+            "borderColor": PALETTE_BORDER[0],
+            "borderWidth": 2,
+            "pointRadius": 0,
+            "fill": False,
+        }],
+        "frequency": freq,
+    }
@@ -1,9 +1,20 @@
 import { BarChart3 } from "lucide-react"
-import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend, ArcElement } from "chart.js"
-import { Bar, Pie } from "react-chartjs-2"
+import {
+  Chart as ChartJS,
+  CategoryScale,
+  LinearScale,
+  BarElement,
+  LineElement,
+  PointElement,
+  Title,
+  Tooltip,
+  Legend,
+  ArcElement,
+} from "chart.js"
+import { Bar, Line, Pie } from "react-chartjs-2"
 import "./ChartResponse.css"
 
-ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend, ArcElement)
+ChartJS.register(CategoryScale, LinearScale, BarElement, LineElement, PointElement, Title, Tooltip, Legend, ArcElement)
 
 const ChartResponse = ({ data }) => {
   // Default chart options
@@ -42,6 +53,9 @@ const ChartResponse = ({ data }) => {
     switch (chartType.toLowerCase()) {
       case "pie":
         return <Pie data={data} options={defaultOptions} />
+      case "line":
+        // Series arrive downsampled with sorted labels: skip normalising and animating them
+        return <Line data={data} options={{ ...defaultOptions, animation: false, normalized: true }} />
       case "bar":
       default:
         return <Bar data={data} options={defaultOptions} />
@@ -1,8 +1,23 @@
 import { TableIcon } from "lucide-react"
 import "./TableResponse.css"
 
-const TableResponse = ({ data }) => {
+// Tables arrive columnar ({ columns, rows: [[...], ...]}) from the backend,
+// or as an array of row objects (mock data, older responses)
+const toColumnar = (data) => {
+  if (data && Array.isArray(data.columns) && Array.isArray(data.rows)) {
+    return data
+  }
   if (!Array.isArray(data) || data.length === 0) {
+    return { columns: [], rows: [] }
+  }
+  const columns = Object.keys(data[0])
+  return { columns, rows: data.map((row) => columns.map((column) => row[column])) }
+}
+
+const TableResponse = ({ data }) => {
+  const { columns, rows } = toColumnar(data)
+
+  if (rows.length === 0) {
     return (
       <div className="table-response">
         <div className="table-response-header">
@@ -14,14 +29,12 @@ const TableResponse = ({ data }) => {
     )
   }
 
-  const columns = Object.keys(data[0])
-
   return (
     <div className="table-response">
       <div className="table-response-header">
         <TableIcon size={20} />
         <h3>Table Response</h3>
-        <span className="record-count">{data.length} records</span>
+        <span className="record-count">{rows.length} records</span>
       </div>
 
       <div className="table-container">
@@ -34,10 +47,10 @@ const TableResponse = ({ data }) => {
             </tr>
           </thead>
           <tbody>
-            {data.map((row, index) => (
+            {rows.map((row, index) => (
               <tr key={index}>
-                {columns.map((column) => (
-                  <td key={column}>{row[column] !== null && row[column] !== undefined ? String(row[column]) : "-"}</td>
+                {row.map((value, column) => (
+                  <td key={columns[column]}>{value !== null && value !== undefined ? String(value) : "-"}</td>
                 ))}
               </tr>
             ))}
@@ -38,7 +38,9 @@ export const queryDatabase = async (query) => {
   if (isV0Preview) return mockQueryDatabase(query);
 
   try {
-    const { data } = await api.post("/query", { query });
+    // GET so the browser cache revalidates repeat queries (ETag -> 304, no body resent);
+    // tables come back columnar, which TableResponse renders directly
+    const { data } = await api.get("/query", { params: { query, table_format: "columnar" } });
     return data; // real backend reply
   } catch (error) {
     console.warn("Backend offline – using mock data:", error?.message || error);
@@ -46,4 +48,10 @@ export const queryDatabase = async (query) => {
   }
 };
 
+// Paginated client search - pass the previous page's nextCursor to continue
+export const searchClients = async (query, { limit = 50, cursor = null } = {}) => {
+  const { data } = await api.post("/clients/search", { query, limit, cursor });
+  return { items: data.items, nextCursor: data.next_cursor };
+};
+
 export default api;